@@ -0,0 +1,405 @@
+"""
+Benchmarks for the page parsers over the saved html fixtures.
+Each benchmark runs in a fresh process so its peak RSS isn't
+polluted by the others. Results are checked against the baseline
+file and any regression past the tolerance exits with an error.
+
+Timings depend on the machine, so every run also times a reference
+parse (bs4's html.parser over the workout pages, code we don't
+change) and the baseline stores each benchmark's speed and latency
+relative to it. A baseline written on one machine can be checked on
+another. Peak RSS doesn't depend on the CPU and is kept in MB.
+
+Run from the root of the project:
+    python -m data_engineering.benchmarks.parser_benchmarks
+    python -m data_engineering.benchmarks.parser_benchmarks --update-baseline
+"""
+
+import argparse
+import json
+import os
+import resource
+import statistics
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import get_context
+from typing import Any, Callable, Dict, List, Sequence, Tuple, TypedDict
+
+BASELINE_PATH = "data_engineering/benchmarks/baseline.json"
+WORKOUT_FILE_PATH = "tests/files/workout_links"
+EXERCISE_FILE_PATH = "tests/files/exercise_pages"
+JEFIT_FILE_PATH = "tests/files/jefit_plans"
+
+
+class BenchmarkResult(TypedDict):
+    """
+    Speed and memory of a single benchmark.
+    """
+
+    pages: int
+    pages_per_sec: float
+    p50_ms: float
+    p99_ms: float
+    peak_rss_mb: float
+
+
+class RelativeResult(TypedDict):
+    """
+    A benchmark relative to the reference parse of the same run,
+    what the baseline stores.
+    """
+
+    # pages_per_sec / the reference's pages_per_sec
+    speed_ratio: float
+    # Latencies / the reference's latencies at the same percentile
+    p50_ratio: float
+    p99_ratio: float
+    peak_rss_mb: float
+
+
+def read_html_files(directory: str) -> List[Tuple[str, str]]:
+    """
+    Read every html file in a fixture folder.
+    Args:
+        directory (str): Folder of html files.
+    Returns:
+        List[Tuple[str, str]]: (file name, html) of each file.
+    """
+    pages = []
+    for name in sorted(os.listdir(directory)):
+        if name.endswith(".html"):
+            with open(
+                os.path.join(directory, name), "r", encoding="utf-8"
+            ) as html_file:
+                pages.append((name, html_file.read()))
+    return pages
+
+
+def workout_pages() -> List[Tuple[str, str]]:
+    """
+    The saved workout pages with the links they were scraped from.
+    Returns:
+        List[Tuple[str, str]]: (url, html) of each workout page.
+    """
+    # pylint: disable=import-outside-toplevel
+    from tests.vars import WORKOUT_VARIANTS
+
+    with open(
+        f"{WORKOUT_FILE_PATH}/html/workouts.json", "r", encoding="utf-8"
+    ) as workouts_file:
+        raw_html = json.load(workouts_file)
+    return [
+        (WORKOUT_VARIANTS[index]["link"], html)
+        for index, html in enumerate(raw_html)
+    ]
+
+
+# Function to benchmark and the arguments of every call to it
+Benchmark = Tuple[Callable[..., Any], Sequence[tuple]]
+
+
+# Each loader returns the function to benchmark and the arguments
+# of every call, a call being one page. Loaders import lazily so
+# a benchmark process only loads what it runs.
+# pylint: disable=import-outside-toplevel
+def load_workout_html() -> Benchmark:
+    """
+    Benchmark of parse_workout_html over the workout pages.
+    Returns:
+        Benchmark: The parser and its calls.
+    """
+    from kuda.scrapers import parse_workout_html
+
+    return parse_workout_html, workout_pages()
+
+
+def load_workout_html_lxml() -> Benchmark:
+    """
+    Benchmark of parse_workout_html_lxml over the workout pages.
+    Returns:
+        Benchmark: The parser and its calls.
+    """
+    from kuda.scrapers import parse_workout_html_lxml
+
+    return parse_workout_html_lxml, workout_pages()
+
+
+def load_exercise_html() -> Benchmark:
+    """
+    Benchmark of parse_exericse_html over the exercise pages.
+    Returns:
+        Benchmark: The parser and its calls.
+    """
+    from kuda.scrapers import parse_exericse_html
+
+    pages = read_html_files(EXERCISE_FILE_PATH)
+    return parse_exericse_html, [
+        (f"https://www.bodybuilding.com/exercises/{name[:-5]}", html)
+        for name, html in pages
+    ]
+
+
+def load_workout_tree() -> Benchmark:
+    """
+    Benchmark of parse_workout_tree, one parsed workout per call.
+    Returns:
+        Benchmark: The parser and its calls.
+    """
+    from kuda.data_pipelining.highrise.file_transformers import (
+        parse_workout_tree,
+    )
+
+    with open(
+        f"{WORKOUT_FILE_PATH}/parsed/workouts.json", "r", encoding="utf-8"
+    ) as workouts_file:
+        workouts = [workout for workout in json.load(workouts_file) if workout]
+    return parse_workout_tree, [([workout],) for workout in workouts]
+
+
+def load_jefit_plan() -> Benchmark:
+    """
+    Benchmark of the jefit parse_plan over the plan pages.
+    Returns:
+        Benchmark: The parser and its calls.
+    """
+    from kuda.scrapers.scrapyard.scrape_workout import parse_plan
+
+    pages = read_html_files(JEFIT_FILE_PATH)
+    return parse_plan, [(html,) for _, html in pages]
+
+
+def reference_parse(html: str) -> None:
+    """
+    The reference parse the other benchmarks are measured against.
+    Args:
+        html (str): Html of a page.
+    """
+    from bs4 import BeautifulSoup
+
+    BeautifulSoup(html, "html.parser")
+
+
+def load_reference() -> Benchmark:
+    """
+    Benchmark of reference_parse over the workout pages.
+    Returns:
+        Benchmark: The parser and its calls.
+    """
+    return reference_parse, [(html,) for _, html in workout_pages()]
+
+
+# pylint: enable=import-outside-toplevel
+
+REFERENCE = "reference"
+BENCHMARKS: Dict[str, Callable[[], Benchmark]] = {
+    "parse_workout_html": load_workout_html,
+    "parse_workout_html_lxml": load_workout_html_lxml,
+    "parse_exericse_html": load_exercise_html,
+    "parse_workout_tree": load_workout_tree,
+    "jefit_parse_plan": load_jefit_plan,
+}
+LOADERS = {REFERENCE: load_reference, **BENCHMARKS}
+
+
+def run_benchmark(name: str, min_pages: int) -> BenchmarkResult:
+    """
+    Run a single benchmark, meant to be called in its own process.
+    Args:
+        name (str): Name of the benchmark in LOADERS.
+        min_pages (int): Pages to parse at least, the fixtures are
+            cycled through until this many have been parsed.
+    Returns:
+        BenchmarkResult: Speed and memory of the benchmark.
+    """
+    function, calls = LOADERS[name]()
+
+    # Warm up so imports and caches aren't timed
+    for call_args in calls:
+        function(*call_args)
+
+    latencies: List[float] = []
+    while len(latencies) < min_pages:
+        for call_args in calls:
+            start = time.perf_counter()
+            function(*call_args)
+            latencies.append(time.perf_counter() - start)
+
+    percentiles = statistics.quantiles(latencies, n=100)
+    return BenchmarkResult(
+        pages=len(latencies),
+        pages_per_sec=round(len(latencies) / sum(latencies), 2),
+        p50_ms=round(percentiles[49] * 1000, 3),
+        p99_ms=round(percentiles[98] * 1000, 3),
+        # ru_maxrss is in KiB on linux
+        peak_rss_mb=round(
+            resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1
+        ),
+    )
+
+
+def run_benchmarks(
+    names: List[str], min_pages: int
+) -> Dict[str, BenchmarkResult]:
+    """
+    Run the reference and then the benchmarks one after another,
+    each in a fresh process.
+    Args:
+        names (List[str]): Names of the benchmarks to run.
+        min_pages (int): Pages each benchmark parses at least.
+    Returns:
+        Dict[str, BenchmarkResult]: Results keyed by benchmark name,
+            including the REFERENCE.
+    """
+    results = {}
+    for name in [REFERENCE, *names]:
+        with ProcessPoolExecutor(1, mp_context=get_context("spawn")) as pool:
+            results[name] = pool.submit(
+                run_benchmark, name, min_pages
+            ).result()
+    return results
+
+
+def relative_results(
+    results: Dict[str, BenchmarkResult]
+) -> Dict[str, RelativeResult]:
+    """
+    Express every benchmark relative to the reference of the run.
+    Args:
+        results (Dict[str, BenchmarkResult]): Results of a run,
+            including the REFERENCE.
+    Returns:
+        Dict[str, RelativeResult]: The benchmarks, without the
+            reference, keyed by name.
+    """
+    reference = results[REFERENCE]
+    return {
+        name: RelativeResult(
+            speed_ratio=round(
+                result["pages_per_sec"] / reference["pages_per_sec"], 3
+            ),
+            p50_ratio=round(result["p50_ms"] / reference["p50_ms"], 3),
+            p99_ratio=round(result["p99_ms"] / reference["p99_ms"], 3),
+            peak_rss_mb=result["peak_rss_mb"],
+        )
+        for name, result in results.items()
+        if name != REFERENCE
+    }
+
+
+def compare_to_baseline(
+    results: Dict[str, RelativeResult],
+    baseline: Dict[str, RelativeResult],
+    tolerance: float,
+    p99_tolerance: float,
+) -> List[str]:
+    """
+    Find the benchmarks that are slower, relative to the reference,
+    or use more memory than the baseline by more than the tolerance.
+    Args:
+        results (Dict[str, RelativeResult]): Results of this run.
+        baseline (Dict[str, RelativeResult]): Baseline results.
+        tolerance (float): Fraction the results can be worse by,
+            leaves room for noise between runs.
+        p99_tolerance (float): Tolerance for the p99 latency, which
+            is a lot noisier than the other metrics.
+    Returns:
+        List[str]: A message for every regression.
+    """
+    regressions = []
+    for name, result in results.items():
+        if name not in baseline:
+            continue
+        expected = baseline[name]
+        if result["speed_ratio"] < expected["speed_ratio"] * (1 - tolerance):
+            regressions.append(
+                f"{name}: {result['speed_ratio']}x the reference speed, "
+                f"baseline {expected['speed_ratio']}x"
+            )
+        for metric, metric_tolerance in (
+            ("p50_ratio", tolerance),
+            ("p99_ratio", p99_tolerance),
+            ("peak_rss_mb", tolerance),
+        ):
+            value = result[metric]  # type: ignore
+            expected_value = expected[metric]  # type: ignore
+            if value > expected_value * (1 + metric_tolerance):
+                regressions.append(
+                    f"{name}: {metric} {value}, baseline {expected_value}"
+                )
+    return regressions
+
+
+def print_results(
+    results: Dict[str, BenchmarkResult],
+    relative: Dict[str, RelativeResult],
+) -> None:
+    """
+    Print the results as a table.
+    Args:
+        results (Dict[str, BenchmarkResult]): Results keyed by
+            benchmark name.
+        relative (Dict[str, RelativeResult]): The same results
+            relative to the reference.
+    """
+    print(
+        f"{'benchmark':<28}{'pages/sec':>12}{'x ref':>8}{'p50 ms':>10}"
+        f"{'p99 ms':>10}{'peak MB':>10}"
+    )
+    for name, result in results.items():
+        speed_ratio = relative[name]["speed_ratio"] if name in relative else 1
+        print(
+            f"{name:<28}{result['pages_per_sec']:>12}{speed_ratio:>8}"
+            f"{result['p50_ms']:>10}{result['p99_ms']:>10}"
+            f"{result['peak_rss_mb']:>10}"
+        )
+
+
+if __name__ == "__main__":
+    arg_parser = argparse.ArgumentParser(
+        description="Benchmark the page parsers against a baseline."
+    )
+    arg_parser.add_argument(
+        "--benchmarks", nargs="+", choices=list(BENCHMARKS), default=None
+    )
+    arg_parser.add_argument("--min-pages", type=int, default=200)
+    arg_parser.add_argument("--tolerance", type=float, default=0.25)
+    arg_parser.add_argument("--p99-tolerance", type=float, default=1.0)
+    arg_parser.add_argument("--baseline", default=BASELINE_PATH)
+    arg_parser.add_argument(
+        "--update-baseline",
+        action="store_true",
+        help="Write this run's results as the new baseline",
+    )
+    args = arg_parser.parse_args()
+
+    benchmark_results = run_benchmarks(
+        names=args.benchmarks or list(BENCHMARKS), min_pages=args.min_pages
+    )
+    run_relative = relative_results(benchmark_results)
+    print_results(benchmark_results, run_relative)
+
+    if args.update_baseline:
+        baseline_results = {}
+        if os.path.exists(args.baseline):
+            with open(args.baseline, "r", encoding="utf-8") as baseline_file:
+                baseline_results = json.load(baseline_file)
+        baseline_results.update(run_relative)
+        with open(args.baseline, "w", encoding="utf-8") as baseline_file:
+            baseline_file.write(json.dumps(baseline_results, indent=4) + "\n")
+        print(f"Baseline written to {args.baseline}")
+        sys.exit(0)
+
+    with open(args.baseline, "r", encoding="utf-8") as baseline_file:
+        baseline_results = json.load(baseline_file)
+    found_regressions = compare_to_baseline(
+        results=run_relative,
+        baseline=baseline_results,
+        tolerance=args.tolerance,
+        p99_tolerance=args.p99_tolerance,
+    )
+    for regression in found_regressions:
+        print(f"REGRESSION {regression}")
+    if found_regressions:
+        sys.exit(1)
+    print("No regressions against the baseline.")
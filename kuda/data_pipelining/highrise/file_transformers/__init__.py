@@ -1,4 +1,7 @@
 # pylint: disable=line-too-long
+from kuda.data_pipelining.highrise.file_transformers.columnar import (
+    flatten_workout_tree,
+)
 from kuda.data_pipelining.highrise.file_transformers.workout_tree_parser import (
     parse_workout_tree,
 )
@@ -0,0 +1,269 @@
+# pylint: disable=line-too-long
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from kuda.data_pipelining.highrise.file_transformers import functions
+from kuda.data_pipelining.highrise.file_transformers.ids import (
+    IdGenerator,
+    IdStrategies,
+    hash_id,
+)
+from kuda.data_pipelining.highrise.file_transformers.workout_tree_parser import (
+    WorkoutTreeComponentPrimaryKeys,
+    WorkoutTreeLevels,
+)
+
+# Raw fields of each level, in the order of the
+# components built by parse_workout_tree.
+WORKOUT_FIELDS = [
+    "name",
+    "month",
+    "month_date",
+    "year",
+    "duration",
+    "username",
+    "url",
+    "muscles_used",
+    "energy_level",
+    "self_rating",
+    "cardio_duration",
+]
+WORKOUT_COMPONENT_FIELDS = ["rest_time"]
+SET_FIELDS = ["sequence", "rest_time", "type"]
+SET_COMPONENT_FIELDS = [
+    "sequence",
+    "weight_metric",
+    "weight",
+    "reps",
+    "rest_time",
+    "exercise_link",
+]
+
+# Fields converted with parse_int, except on workouts
+INT_FIELDS = {"weight", "reps", "rest_time"}
+
+
+def uuid4_column(length: int) -> np.ndarray:
+    """
+    Random version 4 uuid strings, the same as str(uuid4())
+    but generated for the whole column at once.
+    Args:
+        length (int): Number of uuids.
+    Returns:
+        np.ndarray: Array of uuid strings.
+    """
+    random = np.frombuffer(np.random.bytes(16 * length), dtype=np.uint8)
+    random = random.reshape(length, 16).copy()
+    random[:, 6] = (random[:, 6] & 0x0F) | 0x40  # version 4
+    random[:, 8] = (random[:, 8] & 0x3F) | 0x80  # RFC 4122 variant
+    hex_digits = np.frombuffer(b"0123456789abcdef", dtype=np.uint8)
+    characters = np.empty((length, 32), dtype=np.uint8)
+    characters[:, 0::2] = hex_digits[random >> 4]
+    characters[:, 1::2] = hex_digits[random & 0x0F]
+    characters = np.insert(characters, [8, 12, 16, 20], ord("-"), axis=1)
+    return characters.view("S36").ravel().astype(str)
+
+
+def parse_int_column(values: pd.Series) -> pd.Series:
+    """
+    functions.parse_int over a whole column.
+    Args:
+        values (pd.Series): Strings or None.
+    Returns:
+        pd.Series: Nullable Int64 column, NA where parse_int is None.
+    """
+    values = values.to_numpy(dtype=object)
+    numeric = np.fromiter(
+        (isinstance(value, str) and value.isnumeric() for value in values),
+        dtype=bool,
+        count=len(values),
+    )
+    ints = np.zeros(len(values), dtype=np.int64)
+    ints[numeric] = values[numeric].astype(np.int64)
+    return pd.Series(pd.arrays.IntegerArray(ints, ~numeric))
+
+
+def created_at_column(workouts: pd.DataFrame) -> pd.Series:
+    """
+    WorkoutParser.parse_created_at over a whole column.
+    Args:
+        workouts (pd.DataFrame): Raw month, month_date and year columns.
+    Returns:
+        pd.Series: Dates in the PostgreSQL format 'YYYY-MM-DD HH:MM:SS'
+    """
+    return pd.Series(
+        functions.postgres_timestamps(
+            workouts["month"],
+            workouts["month_date"].astype(str),
+            workouts["year"],
+        ),
+        index=workouts.index,
+        dtype=object,
+    )
+
+
+def id_column(
+    id_generator: IdGenerator,
+    level_name: str,
+    length: int,
+    paths: Optional[List[str]],
+) -> np.ndarray:
+    """
+    Primary keys of a whole level with one of the IdStrategies.
+    Args:
+        id_generator (IdGenerator): How the ids are generated, sequence
+            ids carry on from the generator's last id of the level.
+        level_name (str): The workout tree level.
+        length (int): Number of ids.
+        paths (Optional[List[str]]): Path of each row in the tree,
+            needed for IdStrategies.hashed.
+    Returns:
+        np.ndarray: Array of ids.
+    Raises:
+        ValueError: If the ids are hashed and there are no paths.
+    """
+    if id_generator.strategy == IdStrategies.hashed:
+        if paths is None:
+            raise ValueError("Hashed ids need the path of every row")
+        return np.fromiter(map(hash_id, paths), dtype=np.int64, count=length)
+    if id_generator.strategy == IdStrategies.sequence:
+        first_id = id_generator.reserve(level_name, length)
+        return np.arange(first_id, first_id + length, dtype=np.int64)
+    return uuid4_column(length)
+
+
+def _children(
+    nodes: List[Dict], child_key: WorkoutTreeLevels
+) -> Tuple[List[Dict], np.ndarray, np.ndarray]:
+    # The children of every node, the row of each child's
+    # parent and each child's position under its parent.
+    key = child_key.value
+    children = [child for node in nodes for child in node[key]]
+    counts = np.array([len(node[key]) for node in nodes], dtype=np.int64)
+    parents = np.repeat(np.arange(len(nodes)), counts)
+    first_child = np.cumsum(counts) - counts
+    positions = np.arange(len(children)) - first_child[parents]
+    return children, parents, positions
+
+
+def _columns(nodes: List[Dict], fields: List[str]) -> pd.DataFrame:
+    return pd.DataFrame(
+        {
+            field: pd.Series([node.get(field) for node in nodes], dtype=object)
+            for field in fields
+        }
+    ).infer_objects()
+
+
+# pylint: disable=too-many-locals
+def flatten_workout_tree(
+    workouts: List[Dict],
+    pseudonym_mode: functions.PseudonymModes = (
+        functions.PseudonymModes.encrypted
+    ),
+    id_strategy: IdStrategies = IdStrategies.uuid4,
+    id_generator: Optional[IdGenerator] = None,
+) -> Dict[str, pd.DataFrame]:
+    """
+    Columnar version of parse_workout_tree. Flattens a batch of
+    workouts into a table per tree level, with the same columns
+    and primary:foreign key linkage as parse_workout_tree, but
+    with the conversions done a column at a time. Int columns are
+    nullable Int64.
+    Args:
+        workouts (List[Dict]): Parsed workouts.
+        pseudonym_mode (functions.PseudonymModes): How usernames are
+            pseudonymized for created_by.
+        id_strategy (IdStrategies): How the primary keys are generated,
+            hashed ids are made from the same paths as parse_workout_tree.
+        id_generator (Optional[IdGenerator]): Generator shared between
+            batches so sequence ids keep counting up, overrides
+            id_strategy.
+    Returns:
+        Dict[str, pd.DataFrame]: Tables keyed by WorkoutTreeLevels.
+    """
+
+    tables: Dict[str, pd.DataFrame] = {}
+    id_generator = id_generator or IdGenerator(id_strategy)
+
+    raw = _columns(workouts, WORKOUT_FIELDS)
+    paths = list(raw["url"]) if id_generator.uses_path else None
+    pseudonyms = {
+        username: functions.pseudonymize(username, pseudonym_mode)
+        for username in raw["username"].unique()
+    }
+    tables[WorkoutTreeLevels.workouts.value] = pd.DataFrame(
+        {
+            "workout_id": id_column(
+                id_generator,
+                WorkoutTreeLevels.workouts.value,
+                len(raw),
+                paths,
+            ),
+            "name": raw["name"],
+            "created_at": created_at_column(raw),
+            "duration": parse_int_column(raw["duration"]),
+            "created_by": raw["username"].map(pseudonyms),
+            "url": raw["url"],
+            "muscles_used": raw["muscles_used"].str.join(";"),
+            "energy_level": raw["energy_level"],
+            "self_rating": parse_int_column(raw["self_rating"]),
+            "cardio_duration": parse_int_column(raw["cardio_duration"]),
+        }
+    )
+
+    nodes = workouts
+    parent_table = tables[WorkoutTreeLevels.workouts.value]
+    parent_key = WorkoutTreeComponentPrimaryKeys.workout
+    for level, primary_key, fields in (
+        (
+            WorkoutTreeLevels.workout_components,
+            WorkoutTreeComponentPrimaryKeys.workout_component,
+            WORKOUT_COMPONENT_FIELDS,
+        ),
+        (
+            WorkoutTreeLevels.sets,
+            WorkoutTreeComponentPrimaryKeys.set,
+            SET_FIELDS,
+        ),
+        (
+            WorkoutTreeLevels.set_components,
+            WorkoutTreeComponentPrimaryKeys.set_component,
+            SET_COMPONENT_FIELDS,
+        ),
+    ):
+        nodes, parents, positions = _children(nodes, level)
+        raw = _columns(nodes, fields)
+        if paths is not None:
+            paths = [
+                f"{paths[parent]}/{position}"
+                for parent, position in zip(
+                    parents.tolist(), positions.tolist()
+                )
+            ]
+        table = pd.DataFrame(
+            {
+                primary_key.value: id_column(
+                    id_generator, level.value, len(raw), paths
+                )
+            }
+        )
+        for field in fields:
+            table[field] = (
+                parse_int_column(raw[field])
+                if field in INT_FIELDS
+                else raw[field]
+            )
+
+        # Children take the created_at and primary key of their parent
+        table["created_at"] = parent_table["created_at"].to_numpy()[parents]
+        table[parent_key.value] = parent_table[parent_key.value].to_numpy()[
+            parents
+        ]
+        tables[level.value] = table
+        parent_table = table
+        parent_key = primary_key
+
+    return tables
@@ -1,28 +1,78 @@
-import datetime as dt
-from typing import Dict
+from collections.abc import Mapping
+from dataclasses import dataclass
+from typing import Any, Dict, Iterator, Optional, Tuple, Union
 from uuid import uuid4
 
 from kuda.data_pipelining.highrise.file_transformers import functions
 
 
+class ComponentRecord(Mapping):
+    """
+    Base of the component parsers. Each parser is a slotted
+    dataclass, so a parsed component has no dict of its own,
+    and reads like a dict of its set fields, e.g.
+    record["rest_time"] or dict(record). Once every field
+    is set, as parse_workout_tree does with the created_at
+    and foreign key, pd.DataFrame takes a list of records
+    with its columns in the field order.
+    """
+
+    __slots__: Tuple[str, ...] = ()
+
+    def __getitem__(self, key: str) -> Any:
+        if key in self.__slots__:
+            try:
+                return getattr(self, key)
+            except AttributeError:
+                pass
+        raise KeyError(key)
+
+    def __iter__(self) -> Iterator[str]:
+        return (field for field in self.__slots__ if hasattr(self, field))
+
+    def __len__(self) -> int:
+        return sum(1 for _ in self)
+
+
 # pylint: disable=too-many-instance-attributes
-class WorkoutParser:
+@dataclass(init=False, repr=False, eq=False, slots=True)
+class WorkoutParser(ComponentRecord):
     """
     Parses a workout from the raw
     scraped highrise data.
     """
 
-    def __init__(self, raw_dict: Dict) -> None:
+    workout_id: Union[str, int]
+    name: str
+    created_at: str
+    duration: Optional[int]
+    created_by: str
+    url: str
+    muscles_used: str
+    energy_level: int
+    self_rating: Optional[int]
+    cardio_duration: Optional[int]
+
+    def __init__(
+        self,
+        raw_dict: Dict,
+        pseudonym_mode: functions.PseudonymModes = (
+            functions.PseudonymModes.encrypted
+        ),
+        workout_id: Optional[Union[str, int]] = None,
+    ) -> None:
         # ORM fields
-        self.workout_id = str(uuid4())
+        self.workout_id = (
+            workout_id if workout_id is not None else str(uuid4())
+        )
         self.name = raw_dict["name"]
         self.created_at = self.parse_created_at(
             raw_dict["month"], raw_dict["month_date"], raw_dict["year"]
         )
         self.duration = functions.parse_int(raw_dict["duration"])
-        self.created_by = functions.encrypt_string(
-            raw_dict["username"]
-        ).decode()
+        self.created_by = functions.pseudonymize(
+            raw_dict["username"], pseudonym_mode
+        )
 
         # Non ORM fields
         self.url = raw_dict["url"]
@@ -43,53 +93,89 @@ class WorkoutParser:
                 str: The date in the PostgreSQL format
                         'YYYY-MM-DD HH:MM:SS'
         """
-        month_num = functions.MONTH_STR_TO_NUM[month.lower()]
-        month_date = month_date.zfill(2)
-        date_string = f"{month_date}{month_num}{year}"
-        return dt.datetime.strptime(date_string, "%d%m%Y").strftime(
-            "%Y-%m-%d %H:%M:%S"
-        )
+        return functions.postgres_timestamp(month, month_date, year)
 
 
-class WorkoutComponentParser:
+@dataclass(init=False, repr=False, eq=False, slots=True)
+class WorkoutComponentParser(ComponentRecord):
     """
     Parses a workout component from the raw
     scraped highrise data.
     """
 
-    def __init__(self, raw_dict: Dict) -> None:
+    workout_component_id: Union[str, int]
+    rest_time: Optional[int]
+    created_at: str
+    workout_id: Union[str, int]
+
+    def __init__(
+        self,
+        raw_dict: Dict,
+        workout_component_id: Optional[Union[str, int]] = None,
+    ) -> None:
         # ORM fields
-        self.workout_component_id = str(uuid4())
+        self.workout_component_id = (
+            workout_component_id
+            if workout_component_id is not None
+            else str(uuid4())
+        )
         self.rest_time = functions.parse_int(raw_dict.get("rest_time"))
 
 
-class SetParser:
+@dataclass(init=False, repr=False, eq=False, slots=True)
+class SetParser(ComponentRecord):
     """
     Parses a set from the raw
     scraped highrise data.
     """
 
-    def __init__(self, raw_dict: Dict) -> None:
+    set_id: Union[str, int]
+    sequence: int
+    rest_time: Optional[int]
+    type: Optional[str]
+    created_at: str
+    workout_component_id: Union[str, int]
+
+    def __init__(
+        self, raw_dict: Dict, set_id: Optional[Union[str, int]] = None
+    ) -> None:
         # ORM fields
-        self.set_id = str(uuid4())
+        self.set_id = set_id if set_id is not None else str(uuid4())
         self.sequence = raw_dict["sequence"]  # already an int
         self.rest_time = functions.parse_int(raw_dict.get("rest_time"))
         # Non ORM fields
-        self.type = raw_dict["type"]
+        self.type = functions.intern_string(raw_dict["type"])
 
 
-class SetComponentParser:
+@dataclass(init=False, repr=False, eq=False, slots=True)
+class SetComponentParser(ComponentRecord):
     """
     Parses a set component from the raw
     scraped highrise data.
     """
 
-    def __init__(self, raw_dict: Dict) -> None:
+    set_component_id: Union[str, int]
+    sequence: Optional[int]
+    weight_metric: Optional[str]
+    weight: Optional[int]
+    reps: Optional[int]
+    rest_time: Optional[int]
+    exercise_link: Optional[str]
+    created_at: str
+    set_id: Union[str, int]
+
+    def __init__(
+        self,
+        raw_dict: Dict,
+        set_component_id: Optional[Union[str, int]] = None,
+    ) -> None:
         # ORM fields
-        self.set_component_id = str(uuid4())
+        self.set_component_id = (
+            set_component_id if set_component_id is not None else str(uuid4())
+        )
         self.sequence = raw_dict.get("sequence")
-        self.weight_metric = raw_dict["weight_metric"]
+        self.weight_metric = functions.intern_string(raw_dict["weight_metric"])
         self.weight = functions.parse_int(raw_dict.get("weight"))
         self.reps = functions.parse_int(raw_dict.get("reps"))
         self.rest_time = functions.parse_int(raw_dict.get("rest_time"))
-        self.exercise_link = raw_dict["exercise_link"]
+        self.exercise_link = functions.intern_string(raw_dict["exercise_link"])
@@ -1,8 +1,21 @@
-from typing import Optional
+import base64
+import datetime as dt
+import hashlib
+import hmac
+import sys
+from enum import Enum
+from functools import lru_cache
+from typing import Iterable, List, Optional
 
 from cryptography.fernet import Fernet
 
 ENCRYPTION_KEY = "5Zs50S4Cbd909UfP-HT-q0OIsFOV0pniGqEGh2XwEZU="
+# The hashed pseudonyms are keyed with an HMAC of this label
+# under the ENCRYPTION_KEY, so the Fernet key itself is only
+# ever used for encryption.
+HASH_KEY_LABEL = b"kuda:pseudonym-hash:v1"
+# Usernames whose pseudonyms are memoized
+PSEUDONYM_CACHE_SIZE = 2**16
 
 MONTH_STR_TO_NUM = {
     "jan": "01",
@@ -20,6 +33,27 @@ MONTH_STR_TO_NUM = {
 }
 
 
+class PseudonymModes(Enum):
+    """
+    Enums denoting how usernames are pseudonymized.
+    encrypted can be decrypted back to the username,
+    hashed is a keyed hash that can't be reversed.
+    """
+
+    encrypted = "encrypted"
+    hashed = "hashed"
+
+
+@lru_cache(maxsize=1)
+def get_fernet() -> Fernet:
+    """
+    The Fernet for the ENCRYPTION_KEY, built once
+    Returns:
+        Fernet: The Fernet instance
+    """
+    return Fernet(ENCRYPTION_KEY)
+
+
 def encrypt_string(string: str) -> bytes:
     """
     Encrypts a string using the ENCRYPTION_KEY
@@ -28,7 +62,7 @@ def encrypt_string(string: str) -> bytes:
     Returns:
         str: The encrypted string
     """
-    return Fernet(ENCRYPTION_KEY).encrypt(string.encode("utf-8"))
+    return get_fernet().encrypt(string.encode("utf-8"))
 
 
 def decrypt_string(string: str) -> str:
@@ -39,7 +73,88 @@ def decrypt_string(string: str) -> str:
     Returns:
         str: The decrypted string
     """
-    return Fernet(ENCRYPTION_KEY).decrypt(string.encode("utf-8")).decode()
+    return get_fernet().decrypt(string.encode("utf-8")).decode()
+
+
+@lru_cache(maxsize=1)
+def get_hash_key() -> bytes:
+    """
+    The key for hash_string, derived once from the ENCRYPTION_KEY
+    Returns:
+        bytes: The key
+    """
+    return hmac.digest(
+        base64.urlsafe_b64decode(ENCRYPTION_KEY), HASH_KEY_LABEL, "sha256"
+    )
+
+
+def hash_string(string: str) -> str:
+    """
+    Deterministic HMAC-SHA256 of a string, keyed with a key derived
+    from the ENCRYPTION_KEY
+    Args:
+        string (str): The string to hash
+    Returns:
+        str: The hex digest
+    """
+    return hmac.new(
+        get_hash_key(), string.encode("utf-8"), hashlib.sha256
+    ).hexdigest()
+
+
+@lru_cache(maxsize=PSEUDONYM_CACHE_SIZE)
+def pseudonymize(
+    string: str, mode: PseudonymModes = PseudonymModes.encrypted
+) -> str:
+    """
+    Pseudonymizes a string, e.g. a username. The most recent
+    usernames are memoized, so a username seen again costs a dict
+    lookup and gets the same pseudonym while it's cached (always in
+    the hashed mode, encryption is randomized).
+    Args:
+        string (str): The string to pseudonymize
+        mode (PseudonymModes): Encrypt or hash the string
+    Returns:
+        str: The pseudonym
+    """
+    if mode == PseudonymModes.hashed:
+        return hash_string(string)
+    return encrypt_string(string).decode()
+
+
+@lru_cache(maxsize=None)
+def postgres_timestamp(month: str, month_date: str, year: str) -> str:
+    """
+    Combines the three scraped date fields into a timestamp
+    in the PostgreSQL format. Results are memoized, there are
+    only a few thousand distinct dates in the scraped data.
+    Args:
+        month (str): The month in string format e.g. "sep"
+        month_date (str): The date of the month
+        year (str): The year
+    Returns:
+        str: The date in the PostgreSQL format 'YYYY-MM-DD HH:MM:SS'
+    """
+    month_num = MONTH_STR_TO_NUM[month.lower()]
+    date_string = f"{month_date.zfill(2)}{month_num}{year}"
+    return dt.datetime.strptime(date_string, "%d%m%Y").strftime(
+        "%Y-%m-%d %H:%M:%S"
+    )
+
+
+def postgres_timestamps(
+    months: Iterable[str], month_dates: Iterable[str], years: Iterable[str]
+) -> List[str]:
+    """
+    postgres_timestamp over whole columns of dates
+    Args:
+        months (Iterable[str]): The months in string format
+        month_dates (Iterable[str]): The dates of the months
+        years (Iterable[str]): The years
+    Returns:
+        List[str]: The dates in the PostgreSQL format
+    """
+    return list(map(postgres_timestamp, months, month_dates, years))
 
 
 def parse_int(string: Optional[str]) -> Optional[int]:
@@ -66,3 +181,17 @@ def parse_float(string: Optional[str]) -> Optional[float]:
     if string and string.isdecimal():
         return float(string)
     return None
+
+
+def intern_string(string: Optional[str]) -> Optional[str]:
+    """
+    Interns a string so every copy of a repeated value,
+    e.g. a set type or exercise link, shares one object
+    Args:
+        string (str): The string to intern
+    Returns:
+        str: The interned string
+    """
+    if string is None:
+        return None
+    return sys.intern(string)
@@ -0,0 +1,92 @@
+import hashlib
+from enum import Enum
+from typing import Dict, Optional, Union
+from uuid import uuid4
+
+
+class IdStrategies(Enum):
+    """
+    Enums denoting how the primary keys of the
+    workout tree components are generated.
+    uuid4: Random uuid strings, different on every run.
+    hashed: 64 bit int hash of the workout url and the
+        component's position in the tree, the same on every run.
+    sequence: 64 bit int counting up per tree level, from the
+        IdGenerator's start. Reuse the generator across batches
+        to keep the ids unique.
+    """
+
+    uuid4 = "uuid4"
+    hashed = "hashed"
+    sequence = "sequence"
+
+
+def hash_id(path: str) -> int:
+    """
+    Signed 64 bit int hash of a path, fits a PostgreSQL BIGINT.
+    Args:
+        path (str): Workout url and tree position, e.g. "{url}/0/2"
+    Returns:
+        int: The id
+    """
+    digest = hashlib.blake2b(path.encode("utf-8"), digest_size=8).digest()
+    return int.from_bytes(digest, "big", signed=True)
+
+
+class IdGenerator:
+    """
+    Generates the primary keys of the workout tree
+    components with one of the IdStrategies. Sequence
+    ids carry on from the last id of each level.
+    """
+
+    def __init__(
+        self, strategy: IdStrategies = IdStrategies.uuid4, start: int = 1
+    ) -> None:
+        """
+        Args:
+            strategy (IdStrategies): How the ids are generated.
+            start (int): First sequence id of each level, e.g. one
+                past the largest id already in the database.
+        """
+        self.strategy = strategy
+        self.start = start
+        self._next_ids: Dict[str, int] = {}
+
+    @property
+    def uses_path(self) -> bool:
+        """
+        Whether ids are made from the component's path in the tree.
+        """
+        return self.strategy == IdStrategies.hashed
+
+    def reserve(self, level_name: str, length: int) -> int:
+        """
+        Reserve a block of sequence ids of a level.
+        Args:
+            level_name (str): The workout tree level.
+            length (int): Number of ids.
+        Returns:
+            int: The first id of the block.
+        """
+        first_id = self._next_ids.get(level_name, self.start)
+        self._next_ids[level_name] = first_id + length
+        return first_id
+
+    def __call__(
+        self, level_name: str, path: Optional[str] = None
+    ) -> Union[str, int]:
+        """
+        Generate the next id.
+        Args:
+            level_name (str): The workout tree level.
+            path (Optional[str]): The component's path, needed
+                when uses_path is True.
+        Returns:
+            Union[str, int]: The id.
+        """
+        if self.strategy == IdStrategies.hashed:
+            return hash_id(path)  # type: ignore
+        if self.strategy == IdStrategies.sequence:
+            return self.reserve(level_name, 1)
+        return str(uuid4())
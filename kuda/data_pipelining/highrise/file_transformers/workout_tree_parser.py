@@ -1,13 +1,21 @@
 from collections import defaultdict
 from enum import Enum
-from typing import Dict, List, Optional, TypedDict, Union
+from typing import Dict, List, Optional, TypedDict, Union, cast
 
 from kuda.data_pipelining.highrise.file_transformers.components import (
+    ComponentRecord,
     SetComponentParser,
     SetParser,
     WorkoutComponentParser,
     WorkoutParser,
 )
+from kuda.data_pipelining.highrise.file_transformers.functions import (
+    PseudonymModes,
+)
+from kuda.data_pipelining.highrise.file_transformers.ids import (
+    IdGenerator,
+    IdStrategies,
+)
 
 
 class WorkoutTreeLevels(Enum):
@@ -34,23 +42,38 @@ class WorkoutTreeComponentPrimaryKeys(Enum):
     set_component = "set_component_id"
 
 
+# Parsers of the levels below workouts, which take
+# the raw node and its primary key
+ChildParser = Union[
+    type[WorkoutComponentParser],
+    type[SetParser],
+    type[SetComponentParser],
+]
+
+
 class TreeLevelMap(TypedDict):
     """
     Dictionary for traversing and storing
     the workout tree levels.
     """
 
-    parser: Union[
-        type[WorkoutParser],
-        type[WorkoutComponentParser],
-        type[SetParser],
-        type[SetComponentParser],
-    ]
+    parser: Union[type[WorkoutParser], ChildParser]
     primary_key: WorkoutTreeComponentPrimaryKeys
     components: List
     child_key: Optional[WorkoutTreeLevels]
 
 
+class TreeIds(TypedDict):
+    """
+    How the primary keys of a tree level are generated.
+    """
+
+    generator: IdGenerator
+    # Path of the parent node, None for workouts or
+    # if the generator doesn't use paths
+    path: Optional[str]
+
+
 TREE_TRAVERSE_MAP = {
     WorkoutTreeLevels.workouts.value: TreeLevelMap(
         {
@@ -87,33 +110,57 @@ TREE_TRAVERSE_MAP = {
 }
 
 
+# pylint: disable=too-many-arguments, too-many-locals
 def parse_workout_tree_level(
     nodes: List,
     level_name: str,
     components: Dict[str, List],
     foreign_key: Optional[Dict] = None,
     created_at: Optional[str] = None,
+    pseudonym_mode: PseudonymModes = PseudonymModes.encrypted,
+    ids: Optional[TreeIds] = None,
 ) -> Dict[str, List]:
     """
     Function for traversing the Workout Tree
     and storing all it's levels in seperate
     list whilst maintain the primary:foreign
-    key linkage.
+    key linkage. Nodes are identified by their
+    path, the workout url and their position
+    in each level e.g. "{url}/0/2". Components
+    are ComponentRecords, read like dicts and
+    turned into dicts by pd.DataFrame.
     """
 
-    for node in nodes:
+    ids = ids or TreeIds(generator=IdGenerator(), path=None)
+    id_generator = ids["generator"]
+    for index, node in enumerate(nodes):
         level_info = TREE_TRAVERSE_MAP[level_name]
-        parsed_node = level_info["parser"](node).__dict__
         child_key = level_info["child_key"]
         primary_key = level_info["primary_key"].value
 
+        node_path = None
+        if id_generator.uses_path:
+            node_path = (
+                node["url"]
+                if level_name == WorkoutTreeLevels.workouts.value
+                else f"{ids['path']}/{index}"
+            )
+        node_id = id_generator(level_name, node_path)
+
+        # Children share their parent's created_at and key objects
+        parsed_node: ComponentRecord
         if level_name == WorkoutTreeLevels.workouts.value:
+            parsed_node = WorkoutParser(
+                node, pseudonym_mode, workout_id=node_id
+            )
             created_at = parsed_node["created_at"]
         else:
-            parsed_node["created_at"] = created_at
+            child_parser = cast(ChildParser, level_info["parser"])
+            parsed_node = child_parser(node, node_id)
+            setattr(parsed_node, "created_at", created_at)
 
-        if foreign_key:
-            parsed_node.update(foreign_key)
+        for key, value in (foreign_key or {}).items():
+            setattr(parsed_node, key, value)
 
         components[level_name].append(parsed_node)
 
@@ -124,14 +171,25 @@ def parse_workout_tree_level(
                 components=components,
                 created_at=created_at,
                 foreign_key={primary_key: parsed_node[primary_key]},
+                ids=TreeIds(generator=id_generator, path=node_path),
             )
 
     return components
 
 
-def parse_workout_tree(workouts: List[Dict]):
+def parse_workout_tree(
+    workouts: List[Dict],
+    pseudonym_mode: PseudonymModes = PseudonymModes.encrypted,
+    id_strategy: IdStrategies = IdStrategies.uuid4,
+    id_generator: Optional[IdGenerator] = None,
+):
     """
-    Function for parsing the Workout Tree
+    Function for parsing the Workout Tree,
+    pseudonym_mode sets how usernames are
+    pseudonymized and id_strategy how the
+    primary keys are generated. Pass the
+    same id_generator to every batch to keep
+    sequence ids counting up across them.
     """
 
     components: Dict[str, List] = defaultdict(list)
@@ -140,6 +198,10 @@ def parse_workout_tree(workouts: List[Dict]):
         nodes=workouts,
         level_name=WorkoutTreeLevels.workouts.value,
         components=components,
+        pseudonym_mode=pseudonym_mode,
+        ids=TreeIds(
+            generator=id_generator or IdGenerator(id_strategy), path=None
+        ),
     )
 
     return components
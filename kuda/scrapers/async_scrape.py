@@ -1,11 +1,295 @@
 import asyncio
-from typing import Callable, Dict, List, Union
+import random
+import time
+from concurrent.futures import Executor
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import (
+    AsyncGenerator,
+    Callable,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Tuple,
+    TypedDict,
+    Union,
+)
 
 import aiohttp
 
+from kuda.scrapers.crawl_state import CrawlState, CrawlStatuses
+from kuda.scrapers.http_cache import ResponseCache
+from kuda.scrapers.page_archive import PageArchive
+from kuda.scrapers.rate_limiter import AdaptiveRateLimiter
+
+# Put on the results queue by a stream worker once it runs out of urls.
+_WORKER_DONE = object()
+
+
+class ConnectorConfig(TypedDict, total=False):
+    """
+    Connection pool settings for the shared aiohttp session.
+    Any keys left out fall back to DEFAULT_CONNECTOR_CONFIG.
+    """
+
+    # Total number of open connections, 0 for no limit
+    limit: int
+    # Open connections per host, 0 for no limit
+    limit_per_host: int
+    # Seconds an idle connection is kept open for reuse
+    keepalive_timeout: float
+    use_dns_cache: bool
+    # Seconds a resolved host is cached for, None to cache forever
+    ttl_dns_cache: Optional[int]
+    # Ask for compressed responses and decompress them
+    compress: bool
+
+
+DEFAULT_CONNECTOR_CONFIG: ConnectorConfig = {
+    "limit": 100,
+    "limit_per_host": 0,
+    "keepalive_timeout": 30,
+    "use_dns_cache": True,
+    "ttl_dns_cache": 300,
+    "compress": True,
+}
+
+
+def create_session(
+    connector_config: Optional[ConnectorConfig] = None,
+) -> aiohttp.ClientSession:
+    """
+    Create the session shared by all the requests of a scrape.
+    Connections are pooled and kept alive so repeated requests to
+    the same host skip the TCP/TLS handshake.
+    Args:
+        connector_config: (Optional[ConnectorConfig]) Overrides for
+            DEFAULT_CONNECTOR_CONFIG.
+    Returns:
+        aiohttp.ClientSession: The session, to be used as a context
+            manager so the pool is closed at the end.
+    """
+
+    config: ConnectorConfig = {
+        **DEFAULT_CONNECTOR_CONFIG,
+        **(connector_config or {}),  # type: ignore
+    }
+    connector = aiohttp.TCPConnector(
+        limit=config["limit"],
+        limit_per_host=config["limit_per_host"],
+        keepalive_timeout=config["keepalive_timeout"],
+        use_dns_cache=config["use_dns_cache"],
+        ttl_dns_cache=config["ttl_dns_cache"],
+    )
+    # aiohttp asks for gzip/deflate by default
+    headers = {} if config["compress"] else {"Accept-Encoding": "identity"}
+    return aiohttp.ClientSession(
+        connector=connector,
+        headers=headers,
+        auto_decompress=config["compress"],
+    )
+
+
+class RetryConfig(TypedDict, total=False):
+    """
+    Timeout and retry settings for each request.
+    Any keys left out fall back to DEFAULT_RETRY_CONFIG.
+    """
+
+    # Total number of attempts, including the first request
+    attempts: int
+    # The backoff before retry n is random between 0 and
+    # min(backoff_max, backoff_base * 2 ** n) seconds
+    backoff_base: float
+    backoff_max: float
+    # Response statuses worth retrying, any other
+    # error status fails the url straight away
+    retry_statuses: Tuple[int, ...]
+    total_timeout: Optional[float]
+    connect_timeout: Optional[float]
+    read_timeout: Optional[float]
+
+
+DEFAULT_RETRY_CONFIG: RetryConfig = {
+    "attempts": 4,
+    "backoff_base": 0.5,
+    "backoff_max": 30,
+    "retry_statuses": (429, 500, 502, 503, 504),
+    "total_timeout": 60,
+    "connect_timeout": 10,
+    "read_timeout": 30,
+}
+
+
+# pylint: disable=too-many-instance-attributes
+@dataclass
+class ScrapeOptions:
+    """
+    Optional settings of a scrape, passed as one object through
+    the scrape functions down to each request.
+    """
+
+    # Parse the html in this executor instead of on the event loop,
+    # e.g. a ProcessPoolExecutor to parse on all cores. With a process
+    # pool the html_parser must be picklable (a module level function)
+    executor: Optional[Executor] = None
+    # Overrides for DEFAULT_RETRY_CONFIG, urls that still fail after
+    # the retries are returned instead of being parsed
+    retry_config: Optional[RetryConfig] = None
+    # Paces the requests to each host, adapting the rate to the
+    # responses, so the concurrency can be high without throttling
+    rate_limiter: Optional[AdaptiveRateLimiter] = None
+    # Cached pages are replayed from disk, or revalidated with the
+    # server if the cache was created with revalidate=True
+    cache: Optional[ResponseCache] = None
+    # Journal every url is recorded in as it finishes. Urls already
+    # in it are skipped, so a crashed crawl resumes where it stopped
+    # and only the pending urls are scraped and returned
+    crawl_state: Optional[CrawlState] = None
+    # Scrape the urls that failed in an earlier run of the
+    # crawl_state again instead of skipping them
+    retry_failed: bool = False
+    # The raw html of every page fetched from the network is
+    # appended to it, to be re-parsed later without crawling again
+    archive: Optional[PageArchive] = None
+    # Overrides for DEFAULT_CONNECTOR_CONFIG
+    connector_config: Optional[ConnectorConfig] = None
+
+
+def get_retry_delay(
+    attempt: int, retry_config: RetryConfig, retry_after: Optional[str]
+) -> float:
+    """
+    Seconds to wait before the next attempt. Uses the server's
+    Retry-After header if there is one, otherwise exponential
+    backoff with full jitter so throttled requests don't all
+    come back at the same time.
+    Args:
+        attempt: (int) Zero based number of the failed attempt.
+        retry_config: (RetryConfig) Backoff settings.
+        retry_after: (Optional[str]) Retry-After header, either
+            seconds or an http date.
+    Returns:
+        float: Seconds to wait, never more than backoff_max.
+    """
+
+    backoff_max = retry_config["backoff_max"]
+    if retry_after:
+        try:
+            if retry_after.isdigit():
+                delay = float(retry_after)
+            else:
+                delay = (
+                    parsedate_to_datetime(retry_after)
+                    - datetime.now(timezone.utc)
+                ).total_seconds()
+            return min(max(delay, 0), backoff_max)
+        except (TypeError, ValueError):
+            pass
+    return random.uniform(
+        0, min(backoff_max, retry_config["backoff_base"] * 2**attempt)
+    )
+
+
+# pylint: disable=too-many-locals, too-many-branches
+async def fetch_page(
+    session: aiohttp.ClientSession,
+    url: str,
+    options: ScrapeOptions,
+) -> Optional[str]:
+    """
+    Fetch the html of a page, retrying connection errors, timeouts
+    and the retry_statuses with backoff.
+    Args:
+        session: (aiohttp.ClientSession) Session to use for the request.
+        url: (str) Url to fetch.
+        options: (ScrapeOptions) Uses the retry_config, rate_limiter,
+            cache and archive. Pages replayed from the cache or
+            revalidated aren't archived again.
+    Returns:
+        Optional[str]: The html, None if the page couldn't be fetched.
+    """
+
+    rate_limiter = options.rate_limiter
+    cache = options.cache
+    archive = options.archive
+    config: RetryConfig = {
+        **DEFAULT_RETRY_CONFIG,
+        **(options.retry_config or {}),  # type: ignore
+    }
+    timeout = aiohttp.ClientTimeout(
+        total=config["total_timeout"],
+        connect=config["connect_timeout"],
+        sock_read=config["read_timeout"],
+    )
+    cached = None
+    headers = {}
+    if cache:
+        cached = cache.get(url)
+    if cache and cached:
+        if not cache.revalidate:
+            return cached["html"]
+        if cached["etag"]:
+            headers["If-None-Match"] = cached["etag"]
+        if cached["last_modified"]:
+            headers["If-Modified-Since"] = cached["last_modified"]
+
+    error = ""
+    for attempt in range(config["attempts"]):
+        retry_after = None
+        status = None
+        html = None
+        if rate_limiter:
+            await rate_limiter.acquire(url)
+        start = time.monotonic()
+        try:
+            async with session.get(
+                url, timeout=timeout, headers=headers
+            ) as response:
+                status = response.status
+                if status == 304 and cached:
+                    html = cached["html"]
+                elif status < 400:
+                    html = await response.text()
+                    if archive:
+                        archive.write(url, html)
+                    if cache:
+                        cache.put(
+                            url,
+                            html,
+                            etag=response.headers.get("ETag"),
+                            last_modified=response.headers.get(
+                                "Last-Modified"
+                            ),
+                        )
+                else:
+                    error = f"Status {status}"
+                    retry_after = response.headers.get("Retry-After")
+        except (aiohttp.ClientError, asyncio.TimeoutError) as exp:
+            status = None
+            error = repr(exp)
+        if rate_limiter:
+            rate_limiter.record(
+                url, status, time.monotonic() - start, html=html
+            )
+        if html is not None:
+            return html
+        if status is not None and status not in config["retry_statuses"]:
+            break
+        if attempt < config["attempts"] - 1:
+            await asyncio.sleep(get_retry_delay(attempt, config, retry_after))
+    print(f"Error fetching {url}. {error}")
+    return None
+
 
 async def scrape_page(
-    session: aiohttp.ClientSession, url: str, html_parser: Callable
+    session: aiohttp.ClientSession,
+    url: str,
+    html_parser: Callable,
+    options: ScrapeOptions,
 ) -> Union[Dict, str]:
     """
     Scrape a single page and return the parsed data.
@@ -13,23 +297,56 @@ async def scrape_page(
         session: (aiohttp.ClientSession) Session to use for the request.
         url: (str) Url to scrape.
         html_parser: (Callable) Function to parse the data.
+        options: (ScrapeOptions) Settings of the scrape, the url is
+            recorded in the crawl_state once it's finished.
     Returns:
         Dict: Parsed data.
     """
 
-    async with session.get(url) as response:
-        data = await response.text()
-        # We include the url for tracking purposes.
+    data = await fetch_page(session=session, url=url, options=options)
+    # We include the url for tracking purposes.
+    result: Union[Dict, str] = url
+    if data is not None:
         try:
-            return html_parser(url, data)
-        # pylint: disable=broad-except
-        except Exception as exp:
+            if options.executor:
+                result = await asyncio.get_running_loop().run_in_executor(
+                    options.executor, html_parser, url, data
+                )
+            else:
+                result = html_parser(url, data)
+        except Exception as exp:  # pylint: disable=broad-except
             print(f"Error parsing {url}. {exp}")
-            return url
+    if options.crawl_state:
+        options.crawl_state.mark(
+            url,
+            CrawlStatuses.failed
+            if isinstance(result, str)
+            else CrawlStatuses.completed,
+        )
+    return result
+
+
+def pending_urls(urls: Iterable[str], options: ScrapeOptions) -> Iterable[str]:
+    """
+    The urls still to be scraped according to the crawl_state.
+    Args:
+        urls: (Iterable[str]) Urls of the scrape.
+        options: (ScrapeOptions) Settings of the scrape.
+    Returns:
+        Iterable[str]: The pending urls, all of them if there's
+            no crawl_state.
+    """
+
+    if options.crawl_state:
+        return options.crawl_state.pending(urls, options.retry_failed)
+    return urls
 
 
 async def scrape_in_batches(
-    urls: List[str], batch_size: int, html_parser: Callable
+    urls: List[str],
+    batch_size: int,
+    html_parser: Callable,
+    options: Optional[ScrapeOptions] = None,
 ) -> List[Dict]:
     """
     Scrape a list of pages in batches and return the parsed data.
@@ -39,25 +356,183 @@ async def scrape_in_batches(
         urls: (List[str]) List of urls to scrape.
         batch_size: (int) Number of urls to scrape in each batch.
         html_parser: (Callable) Function to parse the data.
+        options: (Optional[ScrapeOptions]) Settings of the scrape.
     Returns:
         List[Dict]: List of parsed data.
     """
 
-    async with aiohttp.ClientSession() as session:
+    scrape_options = options or ScrapeOptions()
+    urls = list(pending_urls(urls, scrape_options))
+    async with create_session(scrape_options.connector_config) as session:
         scraped_data = []
         for i in range(0, len(urls), batch_size):
             batch = urls[i : i + batch_size]
             tasks = [
-                scrape_page(session=session, url=url, html_parser=html_parser)
+                scrape_page(
+                    session=session,
+                    url=url,
+                    html_parser=html_parser,
+                    options=scrape_options,
+                )
                 for url in batch
             ]
             batch_data = await asyncio.gather(*tasks)
             scraped_data.extend(batch_data)
-        return scraped_data
+    if scrape_options.crawl_state:
+        scrape_options.crawl_state.commit()
+    return scraped_data
+
+
+async def scrape_in_window(
+    urls: List[str],
+    window_size: int,
+    html_parser: Callable,
+    options: Optional[ScrapeOptions] = None,
+) -> List[Union[Dict, str]]:
+    """
+    Scrape a list of pages keeping a sliding window of requests
+    in flight and return the parsed data in the same order as the urls.
+    Unlike scrape_in_batches a slow page only holds up its own slot,
+    as soon as any request finishes the next url is started.
+    Args:
+        urls: (List[str]) List of urls to scrape.
+        window_size: (int) Maximum number of requests in flight.
+        html_parser: (Callable) Function to parse the data.
+        options: (Optional[ScrapeOptions]) Settings of the scrape.
+    Returns:
+        List[Union[Dict, str]]: List of parsed data.
+    """
+
+    scrape_options = options or ScrapeOptions()
+    urls = list(pending_urls(urls, scrape_options))
+    scraped_data: List[Union[Dict, str]] = [""] * len(urls)
+    # Shared by all the workers, each worker pulls the next url
+    # off it as soon as its previous request has finished.
+    url_queue = iter(enumerate(urls))
+
+    async def worker(session: aiohttp.ClientSession) -> None:
+        for index, url in url_queue:
+            scraped_data[index] = await scrape_page(
+                session=session,
+                url=url,
+                html_parser=html_parser,
+                options=scrape_options,
+            )
+
+    async with create_session(scrape_options.connector_config) as session:
+        await asyncio.gather(
+            *[worker(session) for _ in range(min(window_size, len(urls)))]
+        )
+    if scrape_options.crawl_state:
+        scrape_options.crawl_state.commit()
+    return scraped_data
+
+
+async def stream_scrape(
+    urls: Iterable[str],
+    html_parser: Callable,
+    concurrency: int = 1,
+    options: Optional[ScrapeOptions] = None,
+) -> AsyncGenerator[Union[Dict, str], None]:
+    """
+    Scrape pages keeping concurrency requests in flight and yield
+    each parsed page as soon as it completes, so results can be
+    written out as they arrive instead of being held in memory.
+    Results are yielded in completion order, not url order.
+    Args:
+        urls: (Iterable[str]) Urls to scrape, consumed lazily.
+        html_parser: (Callable) Function to parse the data.
+        concurrency: (int) Maximum number of requests in flight.
+        options: (Optional[ScrapeOptions]) Settings of the scrape.
+    Yields:
+        Union[Dict, str]: Parsed data, or the url if parsing failed.
+    """
+
+    scrape_options = options or ScrapeOptions()
+    # Bounded so the workers can't run ahead of a slow consumer.
+    results: asyncio.Queue = asyncio.Queue(maxsize=concurrency)
+    url_queue = iter(pending_urls(urls, scrape_options))
+
+    async def worker(session: aiohttp.ClientSession) -> None:
+        try:
+            for url in url_queue:
+                await results.put(
+                    await scrape_page(
+                        session=session,
+                        url=url,
+                        html_parser=html_parser,
+                        options=scrape_options,
+                    )
+                )
+        except Exception as exp:  # pylint: disable=broad-except
+            # Handed to the consumer to re-raise.
+            await results.put(exp)
+        await results.put(_WORKER_DONE)
+
+    async with create_session(scrape_options.connector_config) as session:
+        workers = [
+            asyncio.create_task(worker(session)) for _ in range(concurrency)
+        ]
+        try:
+            running = len(workers)
+            while running:
+                result = await results.get()
+                if result is _WORKER_DONE:
+                    running -= 1
+                elif isinstance(result, Exception):
+                    raise result
+                else:
+                    yield result
+        finally:
+            for task in workers:
+                task.cancel()
+            await asyncio.gather(*workers, return_exceptions=True)
+            if scrape_options.crawl_state:
+                scrape_options.crawl_state.commit()
+
+
+def iter_scrape_urls(
+    urls: Iterable[str],
+    html_parser: Callable,
+    concurrency: int = 1,
+    options: Optional[ScrapeOptions] = None,
+) -> Iterator[Union[Dict, str]]:
+    """
+    Synchronous version of stream_scrape for scripts that
+    aren't running an event loop themselves.
+    Args:
+        urls: (Iterable[str]) Urls to scrape, consumed lazily.
+        html_parser: (Callable) Function to parse the data.
+        concurrency: (int) Maximum number of requests in flight.
+        options: (Optional[ScrapeOptions]) Settings of the scrape.
+    Yields:
+        Union[Dict, str]: Parsed data, or the url if parsing failed.
+    """
+
+    loop = asyncio.new_event_loop()
+    stream = stream_scrape(
+        urls=urls,
+        html_parser=html_parser,
+        concurrency=concurrency,
+        options=options,
+    )
+    try:
+        while True:
+            try:
+                yield loop.run_until_complete(anext(stream))
+            except StopAsyncIteration:
+                return
+    finally:
+        loop.run_until_complete(stream.aclose())
+        loop.close()
 
 
 def scrape_urls(
-    urls: List[str], html_parser: Callable, batch_size: int = 1
+    urls: List[str],
+    html_parser: Callable,
+    batch_size: int = 1,
+    concurrency: Optional[int] = None,
+    options: Optional[ScrapeOptions] = None,
 ) -> List[Union[Dict, str]]:
     """
     Scrape a list of urls and return the parsed data.
@@ -65,14 +540,30 @@ def scrape_urls(
         urls: (List[str]) List of urls to scrape.
         html_parser: (Callable) Function to parse the data.
         batch_size: (int) Number of urls to scrape in each batch.
+        concurrency: (Optional[int]) If given, keep this many requests
+            in flight at all times (sliding window) instead of
+            scraping in lock-step batches of batch_size.
+        options: (Optional[ScrapeOptions]) Parsing executor, retries,
+            rate limiting, caching, crawl state, archiving and
+            connection pool settings, see ScrapeOptions.
     Returns:
         List[Union[Dict, str]]: List of parsed data.
     """
 
+    if concurrency:
+        return asyncio.run(
+            scrape_in_window(
+                urls=urls,
+                window_size=concurrency,
+                html_parser=html_parser,
+                options=options,
+            )
+        )
     return asyncio.run(
         scrape_in_batches(  # type: ignore
             urls=urls,
             batch_size=batch_size,
             html_parser=html_parser,
+            options=options,
         )
     )
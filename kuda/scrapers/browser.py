@@ -0,0 +1,362 @@
+"""
+Module for creating selenium browsers and for waiting on and
+interacting with their pages. Browsers share a profile tuned for
+scraping, that doesn't download anything the scrapers don't read.
+Every wait polls a WebDriverWait condition with a timeout, so an
+action takes as long as the page needs instead of a fixed sleep,
+and gives up instead of retrying forever.
+"""
+
+import os
+import tempfile
+from typing import Any, Callable, List, Optional, Tuple, TypeVar, cast
+
+from selenium import webdriver
+from selenium.common.exceptions import (
+    ElementClickInterceptedException,
+    ElementNotInteractableException,
+    NoSuchElementException,
+    StaleElementReferenceException,
+    TimeoutException,
+)
+from selenium.webdriver.remote.webdriver import WebDriver
+from selenium.webdriver.remote.webelement import WebElement
+from selenium.webdriver.support import expected_conditions as EC
+from selenium.webdriver.support.wait import WebDriverWait
+
+# (By, value) of an element e.g. (By.ID, "next"),
+# the By constants are plain strings
+Locator = Tuple[str, str]
+
+DEFAULT_TIMEOUT = 10.0
+POLL_FREQUENCY = 0.1
+
+# Raised by a click when the element is covered, e.g. by a modal
+# still fading out, or was re-rendered between finding and clicking
+CLICK_EXCEPTIONS = (
+    ElementClickInterceptedException,
+    ElementNotInteractableException,
+    StaleElementReferenceException,
+)
+
+T = TypeVar("T")
+
+# Called with the driver until it returns something truthy. Typed
+# with Any since expected_conditions are typed against the union of
+# the concrete browsers instead of the remote WebDriver
+Condition = Callable[[Any], T]
+
+# Requests blocked by every browser, the scrapers only read the html
+BLOCKED_URL_PATTERNS = [
+    # Images
+    "*.png",
+    "*.jpg",
+    "*.jpeg",
+    "*.gif",
+    "*.webp",
+    "*.svg",
+    "*.ico",
+    # Fonts
+    "*.woff",
+    "*.woff2",
+    "*.ttf",
+    "*.otf",
+    # Media
+    "*.mp4",
+    "*.webm",
+    # Ads and analytics
+    "*doubleclick.net*",
+    "*googlesyndication.com*",
+    "*googletagmanager.com*",
+    "*googletagservices.com*",
+    "*google-analytics.com*",
+    "*adservice.google.*",
+    "*amazon-adsystem.com*",
+    "*connect.facebook.net*",
+    "*hotjar.com*",
+    "*newrelic.com*",
+    "*nr-data.net*",
+    "*optimizely.com*",
+    "*quantserve.com*",
+    "*scorecardresearch.com*",
+    "*taboola.com*",
+    "*outbrain.com*",
+]
+STYLESHEET_URL_PATTERNS = ["*.css"]
+
+# Shared by the browsers of a process, so static files
+# fetched for one page are reused by the next
+DEFAULT_CACHE_DIR = os.path.join(tempfile.gettempdir(), "kuda-chrome-cache")
+
+
+def chrome_options(
+    headless: bool = True,
+    block_stylesheets: bool = True,
+    cache_dir: Optional[str] = None,
+    performance_log: bool = False,
+) -> webdriver.ChromeOptions:
+    """
+    Options of the scraping profile.
+    Args:
+        headless (bool): Run without a window.
+        block_stylesheets (bool): Don't load css, only safe for pages
+            that are used without waiting on their layout.
+        cache_dir (Optional[str]): Disk cache folder, defaults to a
+            folder per process under DEFAULT_CACHE_DIR since chrome
+            can't share a cache between running browsers.
+        performance_log (bool): Record the network events so they
+            can be read with driver.get_log("performance").
+    Returns:
+        webdriver.ChromeOptions: The options.
+    """
+    options = webdriver.ChromeOptions()
+    # Don't wait for images and subframes, only the DOM
+    options.page_load_strategy = "eager"
+    if headless:
+        options.add_argument("--headless=new")
+    options.add_argument("--window-size=1920,1080")
+    cache_dir = cache_dir or os.path.join(DEFAULT_CACHE_DIR, str(os.getpid()))
+    options.add_argument(f"--disk-cache-dir={cache_dir}")
+    for argument in (
+        "--disable-extensions",
+        "--disable-notifications",
+        "--disable-infobars",
+        "--mute-audio",
+        "--no-first-run",
+        "--disable-background-networking",
+    ):
+        options.add_argument(argument)
+
+    # All the prefs have to go in one dict, setting the
+    # option again replaces the previous one
+    prefs = {"profile.managed_default_content_settings.images": 2}
+    if block_stylesheets:
+        prefs["profile.managed_default_content_settings.stylesheets"] = 2
+    options.add_experimental_option("prefs", prefs)
+
+    if performance_log:
+        options.set_capability("goog:loggingPrefs", {"performance": "ALL"})
+    return options
+
+
+def blocked_url_patterns(block_stylesheets: bool = True) -> List[str]:
+    """
+    Url patterns blocked by the scraping profile.
+    Args:
+        block_stylesheets (bool): Also block css.
+    Returns:
+        List[str]: Patterns for Network.setBlockedURLs.
+    """
+    if block_stylesheets:
+        return BLOCKED_URL_PATTERNS + STYLESHEET_URL_PATTERNS
+    return list(BLOCKED_URL_PATTERNS)
+
+
+def create_driver(
+    headless: bool = True,
+    block_stylesheets: bool = True,
+    cache_dir: Optional[str] = None,
+    performance_log: bool = False,
+) -> webdriver.Chrome:
+    """
+    Start a chrome browser with the scraping profile. Images, fonts,
+    media, ads and analytics are blocked before they're requested.
+    Args:
+        headless (bool): Run without a window.
+        block_stylesheets (bool): Don't load css.
+        cache_dir (Optional[str]): Disk cache folder.
+        performance_log (bool): Record the network events.
+    Returns:
+        webdriver.Chrome: The browser.
+    """
+    driver = webdriver.Chrome(
+        options=chrome_options(
+            headless, block_stylesheets, cache_dir, performance_log
+        )
+    )
+    driver.execute_cdp_cmd("Network.enable", {})
+    driver.execute_cdp_cmd(
+        "Network.setBlockedURLs",
+        {"urls": blocked_url_patterns(block_stylesheets)},
+    )
+    return driver
+
+
+def wait_for(
+    driver: WebDriver,
+    condition: Condition[T],
+    timeout: float = DEFAULT_TIMEOUT,
+) -> T:
+    """
+    Wait for a condition to be truthy, e.g. an expected_conditions.
+    Elements going missing or stale count as not ready yet.
+    Args:
+        driver (WebDriver): Selenium webdriver.
+        condition (Condition[T]): Condition to wait for.
+        timeout (float): Seconds to wait for.
+    Returns:
+        T: The first truthy result of the condition.
+    Raises:
+        TimeoutException: If the condition isn't met in time.
+    """
+    return WebDriverWait(
+        driver,
+        timeout,
+        poll_frequency=POLL_FREQUENCY,
+        ignored_exceptions=(
+            NoSuchElementException,
+            StaleElementReferenceException,
+        ),
+    ).until(condition)
+
+
+def click(
+    driver: WebDriver,
+    locator: Locator,
+    timeout: float = DEFAULT_TIMEOUT,
+    attempts: int = 3,
+) -> WebElement:
+    """
+    Wait for an element to be clickable and click it.
+    Args:
+        driver (WebDriver): Selenium webdriver.
+        locator (Locator): Element to click.
+        timeout (float): Seconds to wait for the element on each attempt.
+        attempts (int): Clicks to try, a click can fail if the element
+            is covered or re-rendered right after it became clickable.
+    Returns:
+        WebElement: The clicked element.
+    Raises:
+        TimeoutException: If the element isn't clickable in time.
+        ElementClickInterceptedException: If the last attempt
+            clicked a covered element.
+        ElementNotInteractableException: If the last attempt
+            clicked an element that can't be clicked.
+        StaleElementReferenceException: If the element was
+            re-rendered before the last attempt clicked it.
+        ValueError: If attempts is less than 1.
+    """
+    for attempt in range(1, attempts + 1):
+        # The condition returns False until the element is clickable
+        element = cast(
+            WebElement,
+            wait_for(driver, EC.element_to_be_clickable(locator), timeout),
+        )
+        try:
+            element.click()
+            return element
+        except CLICK_EXCEPTIONS:
+            if attempt == attempts:
+                raise
+    raise ValueError("attempts must be at least 1")
+
+
+def scroll_to_and_click(
+    driver: WebDriver,
+    locator: Locator,
+    timeout: float = DEFAULT_TIMEOUT,
+    attempts: int = 3,
+) -> WebElement:
+    """
+    Scroll an element to the middle of the window and click it.
+    Args:
+        driver (WebDriver): Selenium webdriver.
+        locator (Locator): Element to click.
+        timeout (float): Seconds to wait for the element on each attempt.
+        attempts (int): Clicks to try.
+    Returns:
+        WebElement: The clicked element.
+    """
+    element = wait_for(
+        driver, EC.presence_of_element_located(locator), timeout
+    )
+    driver.execute_script(
+        "arguments[0].scrollIntoView({block: 'center'});", element
+    )
+    return click(driver, locator, timeout, attempts)
+
+
+def switch_to_frame(
+    driver: WebDriver, locator: Locator, timeout: float = DEFAULT_TIMEOUT
+) -> None:
+    """
+    Wait for an iframe to load and switch to it.
+    Args:
+        driver (WebDriver): Selenium webdriver.
+        locator (Locator): The iframe.
+        timeout (float): Seconds to wait for.
+    """
+    wait_for(
+        driver, EC.frame_to_be_available_and_switch_to_it(locator), timeout
+    )
+
+
+def count_elements(driver: WebDriver, locator: Locator) -> int:
+    """
+    Number of elements matching a locator right now.
+    """
+    return len(driver.find_elements(*locator))
+
+
+def wait_for_more(
+    driver: WebDriver,
+    locator: Locator,
+    count: int,
+    timeout: float = DEFAULT_TIMEOUT,
+) -> int:
+    """
+    Wait for more than count elements to match a locator,
+    e.g. results added to a page by a "load more" button.
+    Args:
+        driver (WebDriver): Selenium webdriver.
+        locator (Locator): Elements to count.
+        count (int): Number of elements before the page changed.
+        timeout (float): Seconds to wait for.
+    Returns:
+        int: The new number of elements.
+    Raises:
+        TimeoutException: If no elements are added in time.
+    """
+
+    def more_elements(driver: WebDriver) -> int:
+        new_count = count_elements(driver, locator)
+        return new_count if new_count > count else 0
+
+    return wait_for(driver, more_elements, timeout)
+
+
+def wait_for_refresh(
+    driver: WebDriver,
+    locator: Locator,
+    old_element: Optional[WebElement],
+    timeout: float = DEFAULT_TIMEOUT,
+) -> bool:
+    """
+    Wait for an element to be re-rendered, e.g. search results
+    after a filter changed. Waits for the old element to be
+    removed from the page, then for the new one to be present.
+    Args:
+        driver (WebDriver): Selenium webdriver.
+        locator (Locator): The element.
+        old_element (Optional[WebElement]): The element before the
+            page changed, None if there wasn't one.
+        timeout (float): Seconds to wait for each step.
+    Returns:
+        bool: True if the element was refreshed, False if it timed out,
+            e.g. because the change didn't cause a reload.
+    """
+    try:
+        if old_element is not None:
+            wait_for(driver, EC.staleness_of(old_element), timeout)
+        wait_for(driver, EC.presence_of_element_located(locator), timeout)
+    except TimeoutException:
+        return False
+    return True
+
+
+def find_optional(driver: WebDriver, locator: Locator) -> Optional[WebElement]:
+    """
+    The first element matching a locator, None if there isn't one.
+    """
+    elements = driver.find_elements(*locator)
+    return elements[0] if elements else None
@@ -0,0 +1,129 @@
+"""
+Module for recording which urls a crawl has finished
+so it can be resumed after a crash or restart.
+"""
+
+import sqlite3
+from enum import Enum
+from typing import Dict, Iterable, Iterator, Optional, Set
+
+
+class CrawlStatuses(Enum):
+    """
+    Enums denoting how a url finished.
+    """
+
+    completed = "completed"
+    failed = "failed"
+
+
+class CrawlState:
+    """
+    Journal of finished urls kept in a SQLite file. Writes are
+    committed every commit_every urls, so a crash loses at most
+    that many (they're simply scraped again on resume). The
+    finished urls are also held in memory so filtering a crawl
+    down to the pending urls is a set lookup per url.
+    """
+
+    def __init__(self, path: str, commit_every: int = 100) -> None:
+        """
+        Args:
+            path (str): SQLite file to keep the state in, created if
+                it doesn't exist.
+            commit_every (int): Number of urls to mark between commits.
+        """
+        self.commit_every = commit_every
+        self._uncommitted = 0
+        self.connection = sqlite3.connect(path)
+        # Write ahead logging makes the frequent small commits cheap
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        self.connection.execute("PRAGMA synchronous=NORMAL")
+        self.connection.execute(
+            "CREATE TABLE IF NOT EXISTS urls "
+            "(url TEXT PRIMARY KEY, status TEXT NOT NULL) WITHOUT ROWID"
+        )
+        self._statuses: Dict[str, Set[str]] = {
+            status.value: set() for status in CrawlStatuses
+        }
+        for url, status in self.connection.execute(
+            "SELECT url, status FROM urls"
+        ):
+            self._statuses[status].add(url)
+
+    def __enter__(self) -> "CrawlState":
+        return self
+
+    def __exit__(self, *_) -> None:
+        self.close()
+
+    def get_status(self, url: str) -> Optional[CrawlStatuses]:
+        """
+        How the url finished, if it has.
+        Args:
+            url (str): The url.
+        Returns:
+            Optional[CrawlStatuses]: The status, None if it's pending.
+        """
+        for status in CrawlStatuses:
+            if url in self._statuses[status.value]:
+                return status
+        return None
+
+    def mark(self, url: str, status: CrawlStatuses) -> None:
+        """
+        Record that a url has finished.
+        Args:
+            url (str): The url.
+            status (CrawlStatuses): How it finished.
+        """
+        for urls in self._statuses.values():
+            urls.discard(url)
+        self._statuses[status.value].add(url)
+        self.connection.execute(
+            "INSERT OR REPLACE INTO urls (url, status) VALUES (?, ?)",
+            (url, status.value),
+        )
+        self._uncommitted += 1
+        if self._uncommitted >= self.commit_every:
+            self.commit()
+
+    def pending(
+        self, urls: Iterable[str], retry_failed: bool = False
+    ) -> Iterator[str]:
+        """
+        Filter out the urls that have already finished.
+        Args:
+            urls (Iterable[str]): All the urls of the crawl.
+            retry_failed (bool): If True, failed urls are kept.
+        Yields:
+            str: Urls still to be scraped.
+        """
+        completed = self._statuses[CrawlStatuses.completed.value]
+        failed = self._statuses[CrawlStatuses.failed.value]
+        for url in urls:
+            if url in completed or (not retry_failed and url in failed):
+                continue
+            yield url
+
+    def counts(self) -> Dict[str, int]:
+        """
+        Number of urls finished with each status.
+        Returns:
+            Dict[str, int]: Counts keyed by status.
+        """
+        return {status: len(urls) for status, urls in self._statuses.items()}
+
+    def commit(self) -> None:
+        """
+        Commit the marked urls to disk.
+        """
+        self.connection.commit()
+        self._uncommitted = 0
+
+    def close(self) -> None:
+        """
+        Commit and close the SQLite file.
+        """
+        self.commit()
+        self.connection.close()
@@ -3,6 +3,8 @@ from typing import List, Optional, TypedDict
 
 from bs4 import BeautifulSoup, element
 
+from kuda.scrapers.strainers import class_strainer
+
 
 class Exercise(TypedDict):
     """
@@ -21,15 +23,41 @@ class Exercise(TypedDict):
     instructions: List[str]
 
 
-# pylint: disable=too-many-locals, anomalous-backslash-in-string
-def parse_exericse_html(url: str, html: str) -> Exercise:
+# The only sections of the page the parser reads
+EXERCISE_STRAINER = class_strainer(
+    "ExHeading",
+    "ExDetail-benefits",
+    "bb-list--plain",
+    "ExRating-badge",
+    "ExDetail-guide",
+)
+
+# Removes the label, newlines and whitespace from each detail
+DETAIL_PATTERNS = {
+    label: re.compile(rf"\n|{label}|\s")
+    for label in ("Type:", "Main Muscle Worked:", "Equipment:", "Level:")
+}
+
+
+def clean_detail(label: str, text: str) -> str:
+    """
+    Value of an exercise detail like "Type: Strength".
+    """
+    return DETAIL_PATTERNS[label].sub("", text).lower()
+
+
+def parse_exericse_html(
+    url: str, html: str, parser_backend: str = "lxml"
+) -> Exercise:
     """
     Parse the html of a single exercise page.
+    Only the sections in EXERCISE_STRAINER are parsed.
     """
 
     html_tree: element.Tag = BeautifulSoup(
         html,
-        "lxml",
+        parser_backend,
+        parse_only=EXERCISE_STRAINER,
     )
     exercise: Exercise = {"exercise_link": url}  # type: ignore
 
@@ -50,40 +78,27 @@ def parse_exericse_html(url: str, html: str) -> Exercise:
     detail_list = exercise_detail_section.find_all("li")
 
     for exercise_detail in detail_list:
-        if "Type:" in exercise_detail.text:
-            exercise_type = exercise_detail.text
-            exercise["exercise_type"] = re.sub(
-                pattern="\n|Type:|\s", repl="", string=exercise_type
-            ).lower()
-        elif "Main Muscle Worked:" in exercise_detail.text:
-            main_muscle_worked = exercise_detail.text
-            exercise["main_muscle_worked"] = re.sub(
-                pattern="\n|Main Muscle Worked:|\s",
-                repl="",
-                string=main_muscle_worked,
-            ).lower()
-        elif "Equipment:" in exercise_detail.text:
-            equipment = exercise_detail.text
-            exercise["equipment"] = re.sub(
-                pattern="\n|Equipment:|\s", repl="", string=equipment
-            ).lower()
+        detail_text = exercise_detail.text
+        if "Type:" in detail_text:
+            exercise["exercise_type"] = clean_detail("Type:", detail_text)
+        elif "Main Muscle Worked:" in detail_text:
+            exercise["main_muscle_worked"] = clean_detail(
+                "Main Muscle Worked:", detail_text
+            )
+        elif "Equipment:" in detail_text:
+            exercise["equipment"] = clean_detail("Equipment:", detail_text)
             equipment_link = exercise_detail.find("a")
             exercise["equipment_link"] = (
                 equipment_link["href"] if equipment_link else None
             )
-        elif "Level:" in exercise_detail.text:
-            level = exercise_detail.text.strip()
-            exercise["level"] = re.sub(
-                pattern="\n|Level:|\s", repl="", string=level
-            ).lower()
+        elif "Level:" in detail_text:
+            exercise["level"] = clean_detail("Level:", detail_text.strip())
         else:
             raise ValueError(f"Unexpected exercise detail: {exercise_detail}")
 
     rating = html_tree.find("div", {"class": "ExRating-badge"})
     exercise["rating"] = (
-        re.sub(pattern="\n|Level:|\s", repl="", string=rating.text).lower()
-        if rating
-        else None
+        clean_detail("Level:", rating.text) if rating else None
     )
 
     exercise_instructions = html_tree.find(
@@ -6,18 +6,22 @@ highrise's exercise db
 import json
 import os
 import time
-from typing import Tuple
 
 from selenium import webdriver
-from selenium.common.exceptions import NoSuchElementException
+from selenium.common.exceptions import TimeoutException
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support import expected_conditions as EC
 from selenium.webdriver.support.ui import WebDriverWait
 
+from kuda.scrapers import browser
+
 current_script_path = os.path.abspath(__file__)
 current_script_path = "/".join(current_script_path.split("/")[:-1])
 script_start = time.time()
 
+# An exercise in the finder results
+RESULT_LOCATOR: browser.Locator = (By.CSS_SELECTOR, ".ExCategory-results a")
+
 
 def create_chrome_driver() -> webdriver.Chrome:
     """
@@ -27,21 +31,9 @@ def create_chrome_driver() -> webdriver.Chrome:
             webdriver.Chrome: The chrome driver
     """
 
-    options = webdriver.ChromeOptions()
-    options.add_argument("--start-maximized")
-    options.add_argument("--disable-notifications")
-    options.add_argument("--disable-infobars")
-    options.add_argument("--mute-audio")
-    options.add_argument("--disable-popup-blocking")
-    options.add_argument("--disable-extensions")
-    options.add_argument("--log-level=3")
-    options.add_argument("--ignore-certificate-errors")
-    options.add_argument("--allow-running-insecure-content")
-    options.add_argument("--disable-web-security")
-    # headless mode
-    options.add_experimental_option("detach", True)
-
-    return webdriver.Chrome(options=options)
+    # The finder is scrolled and its buttons waited on until
+    # they're clickable, which needs the page's layout
+    return browser.create_driver(block_stylesheets=False)
 
 
 def pass_cookies_and_email_opt(driver: webdriver.Chrome) -> None:
@@ -91,21 +83,26 @@ def pass_cookies_and_email_opt(driver: webdriver.Chrome) -> None:
 
 
 def find_and_click_btn(
-    driver: webdriver.Chrome, button_locator: Tuple[By, str]
+    driver: webdriver.Chrome,
+    button_locator: browser.Locator,
+    timeout: float = browser.DEFAULT_TIMEOUT,
 ) -> None:
     """
-    Finds and clicks a button
+    Finds and clicks a load more button, then waits
+    for the new results to be added to the page
     Args:
         driver (webdriver.Chrome): The chrome driver
-        button_locator (Tuple[By, str]): The button locator
+        button_locator (browser.Locator): The button locator
+        timeout (float): Seconds to wait for the button
+            and for the new results
+    Raises:
+        TimeoutException: If the button or new results
+            don't show up in time
     """
 
-    button = driver.find_element(*button_locator)
-    scroll_position = button.location["y"] - 100
-    driver.execute_script(f"window.scrollTo(0, {scroll_position});")
-    time.sleep(2)
-    button.click()
-    time.sleep(2)
+    result_count = browser.count_elements(driver, RESULT_LOCATOR)
+    browser.scroll_to_and_click(driver, button_locator, timeout)
+    browser.wait_for_more(driver, RESULT_LOCATOR, result_count, timeout)
 
 
 if __name__ == "__main__":
@@ -114,7 +111,7 @@ if __name__ == "__main__":
 
     pass_cookies_and_email_opt(driver=chrome_driver)
 
-    locator = (By.CLASS_NAME, "ExLoadMore-btn")
+    locator: browser.Locator = (By.CLASS_NAME, "ExLoadMore-btn")
     exercise_count = 0
     retry_count = 0
     while True:
@@ -123,11 +120,11 @@ if __name__ == "__main__":
             exercise_count += 15
             if exercise_count % 100 == 0:
                 print(f"Scrolled past {exercise_count} workouts.")
-        except NoSuchElementException:
+        except TimeoutException:
+            # The wait is the delay between retries
             retry_count += 1
             if retry_count < 4:
                 print("Button not found. Retrying.")
-                time.sleep(5)
                 continue
             print("Button no longer exists. Exiting.")
             break
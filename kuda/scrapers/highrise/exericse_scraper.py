@@ -1,10 +1,9 @@
+import csv
 import json
 import os
 
-import pandas as pd
-
-from kuda.scrapers import parse_exericse_html
-from kuda.scrapers.async_scrape import scrape_urls
+from kuda.scrapers import iter_scrape_urls, parse_exericse_html
+from kuda.scrapers.highrise.exercise_html_parser import Exercise
 
 current_script_path = os.path.abspath(__file__)
 current_script_path = "/".join(current_script_path.split("/")[:-1])
@@ -18,25 +17,27 @@ with open(
 
 
 print(f"Scraping {len(exercise_links)} exercise pages...")
-results = scrape_urls(
-    urls=exercise_links,
-    html_parser=parse_exericse_html,
-    batch_size=10,
-)
-print("Done!")
-
-successful_results = []
 failed_results = []
-for res in results:
-    if isinstance(res, dict):
-        successful_results.append(res)
-    else:
-        failed_results.append(res)
-
-df = pd.DataFrame(successful_results)
-df.to_csv(
-    os.path.join(current_script_path, "files/exercises.csv"), index=False
-)
+with open(
+    os.path.join(current_script_path, "files/exercises.csv"),
+    "w",
+    encoding="utf-8",
+    newline="",
+) as f:
+    # Rows are written as they're scraped rather than
+    # holding every exercise in memory until the end.
+    writer = csv.DictWriter(f, fieldnames=list(Exercise.__annotations__))
+    writer.writeheader()
+    for res in iter_scrape_urls(
+        urls=exercise_links,
+        html_parser=parse_exericse_html,
+        concurrency=10,
+    ):
+        if isinstance(res, dict):
+            writer.writerow(res)
+        else:
+            failed_results.append(res)
+print("Done!")
 
 with open(
     os.path.join(current_script_path, "files/failed_exercises.json"),
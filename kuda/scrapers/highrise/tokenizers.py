@@ -0,0 +1,81 @@
+"""
+Precompiled tokenizers for the durations, weights and reps
+found in the text of the highrise pages. The parsers call
+these once per field instead of compiling and chaining string
+operations in every set and set component.
+"""
+
+import re
+from typing import Optional, Tuple
+
+REST_LABELS = re.compile(r"Rest Between Exercises|Rest Between Sets|\s|\n")
+TIME_UNITS = re.compile("hr|min|sec")
+# Also removes the character after the unit, e.g. "lbs "
+LBS = re.compile("lbs.")
+KG = re.compile("kg.")
+REPS = re.compile(r"reps|\.")
+SPACES_AND_NEWLINES = re.compile("\n| ")
+
+
+def clean(string: str) -> str:
+    """
+    Strip, remove newlines from and lowercase a field.
+    """
+    return string.strip().replace("\n", "").lower()
+
+
+def rest_seconds(string: Optional[str]) -> Optional[str]:
+    """
+    Seconds of a rest like "Rest Between Sets 1 min 30 sec".
+    """
+    if string is None:
+        return None
+    string = REST_LABELS.sub("", string).lower()
+    minutes, seconds = string.split("min")[:2]
+    return str(int(minutes) * 60 + int(seconds.split("sec")[0]))
+
+
+def time_seconds(string: str) -> str:
+    """
+    Seconds of a time like "00 hr : 05 min : 00 sec" or "00:05:00".
+    """
+    hrs, mins, secs = TIME_UNITS.sub("", string).split(":")
+    return str(int(hrs) * 3600 + int(mins) * 60 + int(secs))
+
+
+def weight(string: str) -> Tuple[Optional[str], Optional[str]]:
+    """
+    Metric and value of a cleaned weight like "135 lbs".
+    Returns:
+        Tuple[Optional[str], Optional[str]]: (metric, weight),
+            both None if there's no lbs or kg metric.
+    """
+    if "lbs" in string:
+        return "lbs", LBS.sub("", string)
+    if "kg" in string:
+        return "kg", KG.sub("", string)
+    return None, None
+
+
+def reps(string: str) -> str:
+    """
+    Reps of a cleaned field like "10 reps.".
+    """
+    return REPS.sub("", string)
+
+
+def weight_reps(string: str) -> Tuple[Optional[str], Optional[str], str]:
+    """
+    Metric, weight and reps of a field like "135 lbs x 10 reps".
+    The weight is optional, e.g. "10 reps" has no weight.
+    """
+    parts = clean(string).split("x")
+    if len(parts) == 1:
+        return None, None, reps(parts[0])
+    if len(parts) != 2:
+        raise ValueError("Weight and Reps not found")
+
+    weight_metric, weight_value = weight(parts[0])
+    if weight_metric is None:
+        raise ValueError("Weight Metric not found")
+    return weight_metric, weight_value, reps(parts[1])
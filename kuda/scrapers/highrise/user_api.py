@@ -0,0 +1,309 @@
+"""
+Module for scraping the member search through the json requests
+the search page makes, instead of rendering and parsing every
+results page. A browser is only used once per search, to accept
+the cookies, set the filters and capture the search request from
+Chrome's performance log. The pages are then requested directly
+with aiohttp, many at a time.
+"""
+
+import asyncio
+import itertools
+import json
+import os
+import re
+from typing import Any, Dict, Iterable, List, Optional, Pattern, TypedDict
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+from selenium import webdriver
+
+from kuda.scrapers.async_scrape import (
+    ScrapeOptions,
+    create_session,
+    fetch_page,
+)
+from kuda.scrapers.highrise.user_scraper import (
+    LOGGER,
+    gender_name,
+    init_webdriver,
+    open_search,
+)
+
+# Json requests that could be the member search
+SEARCH_URL_PATTERN = re.compile(r"search|member", re.IGNORECASE)
+
+# Request headers that are tied to the browser's connection
+# and shouldn't be replayed, aiohttp sets its own
+SKIPPED_HEADERS = {"host", "content-length", "accept-encoding", "connection"}
+
+# Pages requested at most per search, in case the server
+# never returns an empty page
+MAX_PAGES = 10000
+
+
+class SearchRequest(TypedDict):
+    """
+    A json request captured from the performance log.
+    """
+
+    url: str
+    headers: Dict[str, str]
+
+
+class MemberSearchApi(TypedDict):
+    """
+    Everything needed to request the search pages directly.
+    """
+
+    url: str
+    headers: Dict[str, str]
+    cookies: Dict[str, str]
+    # Query param holding the page number
+    page_param: str
+
+
+def find_json_requests(
+    performance_log: Iterable[Dict],
+    url_pattern: Pattern = SEARCH_URL_PATTERN,
+) -> List[SearchRequest]:
+    """
+    Find the requests answered with json in a performance log.
+    Args:
+        performance_log (Iterable[Dict]): Entries from
+            driver.get_log("performance").
+        url_pattern (Pattern): Only requests with a matching url
+            are kept.
+    Returns:
+        List[SearchRequest]: Matching requests, in the order
+            their responses were received.
+    """
+    request_headers: Dict[str, Dict[str, str]] = {}
+    requests: List[SearchRequest] = []
+    for entry in performance_log:
+        message = json.loads(entry["message"])["message"]
+        params = message.get("params", {})
+        if message["method"] == "Network.requestWillBeSent":
+            request_headers[params["requestId"]] = params["request"].get(
+                "headers", {}
+            )
+        elif message["method"] == "Network.responseReceived":
+            response = params["response"]
+            if "json" in response.get("mimeType", "") and url_pattern.search(
+                response["url"]
+            ):
+                requests.append(
+                    SearchRequest(
+                        url=response["url"],
+                        headers={
+                            name: value
+                            for name, value in request_headers.get(
+                                params["requestId"], {}
+                            ).items()
+                            if name.lower() not in SKIPPED_HEADERS
+                            and not name.startswith(":")
+                        },
+                    )
+                )
+    return requests
+
+
+def find_page_param(url: str) -> str:
+    """
+    The query param of a search url that holds the page number.
+    Args:
+        url (str): Search url.
+    Returns:
+        str: The first param named like a page.
+    Raises:
+        ValueError: If no param is named like a page.
+    """
+    for name, _ in parse_qsl(urlsplit(url).query):
+        if "page" in name.lower() and "size" not in name.lower():
+            return name
+    raise ValueError(f"No page param found in {url}")
+
+
+def page_url(api: MemberSearchApi, page: int) -> str:
+    """
+    The url of a page of the search.
+    Args:
+        api (MemberSearchApi): The search.
+        page (int): Page number.
+    Returns:
+        str: The captured url with its page param set to page.
+    """
+    parts = urlsplit(api["url"])
+    query = dict(parse_qsl(parts.query, keep_blank_values=True))
+    query[api["page_param"]] = str(page)
+    return urlunsplit(parts._replace(query=urlencode(query)))
+
+
+def find_records(data: Any) -> List[Dict]:
+    """
+    The first list of objects in a json response, depth first,
+    e.g. the members of {"data": {"results": [...], "total": 2}}.
+    Args:
+        data (Any): Parsed json.
+    Returns:
+        List[Dict]: The records, empty if there aren't any.
+    """
+    if isinstance(data, list):
+        if data and all(isinstance(item, dict) for item in data):
+            return data
+        return []
+    if isinstance(data, dict):
+        for value in data.values():
+            records = find_records(value)
+            if records:
+                return records
+    return []
+
+
+def capture_search_api(
+    driver: webdriver.Chrome,
+    gender_id: int,
+    min_age: int,
+    max_age: int,
+    url_pattern: Pattern = SEARCH_URL_PATTERN,
+) -> MemberSearchApi:
+    """
+    Run a member search in the browser and capture its json request.
+    Args:
+        driver (webdriver.Chrome): Driver with the performance log on.
+        gender_id (int): Id for target gender
+        min_age (int): Minimum age.
+        max_age (int): Maximum age.
+        url_pattern (Pattern): Pattern of the search request url.
+    Returns:
+        MemberSearchApi: The last matching request with the browser's
+            cookies, i.e. the search with every filter applied.
+    Raises:
+        ValueError: If no json request matched or it has no page param.
+    """
+    open_search(driver, gender_id, min_age, max_age)
+
+    requests = find_json_requests(driver.get_log("performance"), url_pattern)
+    if not requests:
+        raise ValueError("No json search request found in the log")
+    request = requests[-1]
+    LOGGER.info("Captured search request %s", request["url"])
+    return MemberSearchApi(
+        url=request["url"],
+        headers=request["headers"],
+        cookies={
+            cookie["name"]: cookie["value"] for cookie in driver.get_cookies()
+        },
+        page_param=find_page_param(request["url"]),
+    )
+
+
+# pylint: disable=too-many-locals
+async def scrape_search_api(
+    api: MemberSearchApi,
+    concurrency: int = 10,
+    first_page: int = 1,
+    max_pages: int = MAX_PAGES,
+    options: Optional[ScrapeOptions] = None,
+) -> List[Dict]:
+    """
+    Request the pages of a search, concurrency pages at a time,
+    until a page has no records or repeats the records of the
+    page before it, i.e. the server ignored the page param. Pages
+    that can't be fetched are logged and skipped, the scrape stops
+    if a whole batch fails or a page isn't json.
+    Args:
+        api (MemberSearchApi): The search, from capture_search_api.
+        concurrency (int): Pages requested at once.
+        first_page (int): Number of the first page, 0 or 1.
+        max_pages (int): Stop after this many pages.
+        options (Optional[ScrapeOptions]): Retry, rate limiting and
+            connection pool settings of the requests, see fetch_page.
+    Returns:
+        List[Dict]: Records of every page, in page order.
+    """
+    records: List[Dict] = []
+    previous_records: List[Dict] = []
+    end_page = first_page + max_pages
+    options = options or ScrapeOptions()
+    async with create_session(options.connector_config) as session:
+        session.headers.update(api["headers"])
+        session.cookie_jar.update_cookies(api["cookies"])
+        for page in itertools.count(first_page, concurrency):
+            pages = range(page, min(page + concurrency, end_page))
+            if not pages:
+                break
+            responses = await asyncio.gather(
+                *(
+                    fetch_page(session, page_url(api, page_number), options)
+                    for page_number in pages
+                )
+            )
+            if all(response is None for response in responses):
+                LOGGER.error("Pages %s to %s all failed", page, pages[-1])
+                break
+            for page_number, response in zip(pages, responses):
+                if response is None:
+                    LOGGER.warning("Skipping page %s", page_number)
+                    continue
+                try:
+                    page_records = find_records(json.loads(response))
+                except json.JSONDecodeError as exp:
+                    LOGGER.error("Page %s isn't json. %s", page_number, exp)
+                    return records
+                if not page_records:
+                    LOGGER.info("No records on page %s", page_number)
+                    return records
+                if page_records == previous_records:
+                    LOGGER.warning(
+                        "Page %s repeats the page before it", page_number
+                    )
+                    return records
+                records.extend(page_records)
+                previous_records = page_records
+            LOGGER.info(
+                "Fetched pages up to %s (Results so far: %s)",
+                pages[-1],
+                len(records),
+            )
+    return records
+
+
+def execute(
+    gender_id: int,
+    min_age: int,
+    max_age: int,
+    output_path: str,
+    concurrency: int = 10,
+) -> None:
+    """
+    Scrapes users from Bodybuilding.com through the search requests.
+    The records are saved as returned, to a json lines file.
+    Args:
+        gender_id (int): Id for target gender
+        min_age (int): Minimum age.
+        max_age (int): Maximum age.
+        output_path (str): Folder to save the json lines file to.
+        concurrency (int): Pages requested at once.
+    """
+    driver = init_webdriver(performance_log=True)
+    try:
+        api = capture_search_api(driver, gender_id, min_age, max_age)
+    finally:
+        driver.quit()
+    records = asyncio.run(scrape_search_api(api, concurrency=concurrency))
+    LOGGER.info("Scraped %s users", len(records))
+
+    with open(
+        os.path.join(
+            output_path,
+            f"users_{gender_name(gender_id)}_{min_age}_{max_age}.jsonl",
+        ),
+        "w",
+        encoding="utf-8",
+    ) as f:
+        for record in records:
+            f.write(json.dumps(record) + "\n")
+
+
+if __name__ == "__main__":
+    execute(gender_id=2, min_age=18, max_age=25, output_path="users")
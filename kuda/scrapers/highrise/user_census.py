@@ -0,0 +1,202 @@
+"""
+Module for running the member search scraper over every gender
+and age range at once. The census is split into
+(gender_id, min_age, max_age) shards which are fanned out to a
+pool of processes, each driving its own reusable browser.
+"""
+
+import argparse
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from contextlib import suppress
+from multiprocessing.util import Finalize
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from selenium import webdriver
+from selenium.common.exceptions import WebDriverException
+
+from kuda.scrapers.highrise.user_scraper import (
+    LOGGER,
+    init_webdriver,
+    save_users,
+    scrape_users,
+)
+
+# Male = 1, Female = 2
+GENDER_IDS = (1, 2)
+
+# (gender_id, min_age, max_age) of a member search
+Shard = Tuple[int, int, int]
+
+# The browser of the current worker process, reused across shards
+_DRIVER: Optional[webdriver.Chrome] = None
+
+
+def make_shards(
+    min_age: int,
+    max_age: int,
+    ages_per_shard: int = 1,
+    gender_ids: Iterable[int] = GENDER_IDS,
+) -> List[Shard]:
+    """
+    Split a census into member searches.
+
+    Args:
+        min_age (int): Minimum age.
+        max_age (int): Maximum age.
+        ages_per_shard (int): Ages covered by each search, smaller
+            shards spread the work more evenly.
+        gender_ids (Iterable[int]): Ids for the target genders.
+
+    Returns:
+        List[Shard]: (gender_id, min_age, max_age) of each search.
+    """
+    return [
+        (gender_id, age, min(age + ages_per_shard - 1, max_age))
+        for gender_id in gender_ids
+        for age in range(min_age, max_age + 1, ages_per_shard)
+    ]
+
+
+def _close_driver() -> None:
+    global _DRIVER  # pylint: disable=global-statement
+    driver, _DRIVER = _DRIVER, None
+    if driver is not None:
+        with suppress(WebDriverException):
+            driver.quit()
+
+
+def _get_driver() -> webdriver.Chrome:
+    global _DRIVER  # pylint: disable=global-statement
+    if _DRIVER is None:
+        _DRIVER = init_webdriver()
+    return _DRIVER
+
+
+def _init_worker() -> None:
+    # Pool workers leave through os._exit, which skips atexit
+    # handlers, but multiprocessing runs its finalizers first
+    Finalize(None, _close_driver, exitpriority=10)
+
+
+def scrape_shard(shard: Shard) -> Tuple[Shard, Optional[List[Dict]]]:
+    """
+    Scrape a single shard with the browser of the current process,
+    meant to be called in a pool worker.
+
+    Args:
+        shard (Shard): (gender_id, min_age, max_age) of the search.
+
+    Returns:
+        Tuple[Shard, Optional[List[Dict]]]: The shard and its users,
+            None if the search failed.
+    """
+    gender_id, min_age, max_age = shard
+    try:
+        driver = _get_driver()
+        # Start from a fresh session so the search page shows
+        # the same cookie banners and modal as a new browser
+        driver.delete_all_cookies()
+        users = scrape_users(driver, gender_id, min_age, max_age)
+    # Any error only fails this shard, which is returned to be run
+    # again, instead of taking down the pool
+    except Exception as exp:  # pylint: disable=broad-except
+        LOGGER.error("Error scraping shard %s. %s", shard, exp)
+        # The browser may be in a bad state, start a new one next time
+        _close_driver()
+        return shard, None
+    return shard, users
+
+
+def merge_users(results: Iterable[List[Dict]]) -> List[Dict]:
+    """
+    Merge the users of every shard, dropping users found by more
+    than one search.
+
+    Args:
+        results (Iterable[List[Dict]]): Users of each shard.
+
+    Returns:
+        List[Dict]: Unique users, in the order they were found.
+    """
+    users: Dict[str, Dict] = {}
+    for shard_users in results:
+        for user in shard_users:
+            users.setdefault(user["url"], user)
+    return list(users.values())
+
+
+def run_census(
+    shards: List[Shard],
+    output_path: str,
+    processes: int = 4,
+) -> List[Shard]:
+    """
+    Scrape shards across a pool of browsers, then save the merged
+    users of each gender the same way execute does.
+
+    Args:
+        shards (List[Shard]): Member searches to run, e.g. from
+            make_shards.
+        output_path (str): Path to save csv files.
+        processes (int): Number of browsers run at once.
+
+    Returns:
+        List[Shard]: Shards that failed, to be run again.
+    """
+    failed: List[Shard] = []
+    results: Dict[Shard, List[Dict]] = {}
+    with ProcessPoolExecutor(processes, initializer=_init_worker) as pool:
+        futures = [pool.submit(scrape_shard, shard) for shard in shards]
+        for future in as_completed(futures):
+            shard, users = future.result()
+            if users is None:
+                failed.append(shard)
+                continue
+            LOGGER.info("Shard %s scraped %s users", shard, len(users))
+            results[shard] = users
+
+    # Merged in shard order so the output doesn't depend on timing
+    for gender_id in sorted({shard[0] for shard in results}):
+        gender_shards = [
+            shard
+            for shard in shards
+            if shard in results and shard[0] == gender_id
+        ]
+        users = merge_users(results[shard] for shard in gender_shards)
+        LOGGER.info("Saving %s users of gender %s", len(users), gender_id)
+        save_users(
+            users,
+            min(shard[1] for shard in gender_shards),
+            max(shard[2] for shard in gender_shards),
+            gender_id,
+            output_path,
+        )
+    LOGGER.info("%s shards failed", len(failed))
+    return failed
+
+
+if __name__ == "__main__":
+    arg_parser = argparse.ArgumentParser(
+        description="Scrape every gender and age range of the members."
+    )
+    arg_parser.add_argument("output_path", help="Folder to save csvs to")
+    arg_parser.add_argument("--min-age", type=int, default=18)
+    arg_parser.add_argument("--max-age", type=int, default=80)
+    arg_parser.add_argument("--ages-per-shard", type=int, default=1)
+    arg_parser.add_argument(
+        "--genders", type=int, nargs="+", choices=GENDER_IDS
+    )
+    arg_parser.add_argument("--processes", type=int, default=4)
+    args = arg_parser.parse_args()
+
+    failed_shards = run_census(
+        shards=make_shards(
+            args.min_age,
+            args.max_age,
+            args.ages_per_shard,
+            args.genders or GENDER_IDS,
+        ),
+        output_path=args.output_path,
+        processes=args.processes,
+    )
+    print(f"Done! {len(failed_shards)} shards failed: {failed_shards}")
@@ -1,19 +1,17 @@
+import csv
+import json
 import logging
-import time
-from typing import Dict, List
+import os
+from typing import Dict, Iterator, List, Optional, Set, Tuple, TypedDict
 
 import pandas as pd
 from bs4 import BeautifulSoup
 from selenium import webdriver
-from selenium.common.exceptions import (
-    ElementNotInteractableException,
-    NoSuchElementException,
-    StaleElementReferenceException,
-)
-from selenium.webdriver.chrome.options import Options
+from selenium.common.exceptions import TimeoutException
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support import expected_conditions as EC
-from selenium.webdriver.support.wait import WebDriverWait
+
+from kuda.scrapers import browser
 
 # Configure logging
 logging.basicConfig(
@@ -21,29 +19,41 @@ logging.basicConfig(
 )
 LOGGER = logging.getLogger(__name__)
 
+# A user card in the search results
+RESULT_LOCATOR: browser.Locator = (By.CSS_SELECTOR, "div.bbcContainer")
+
+# The columns and user urls of each csv file appended to, by path
+SavedUsers = Dict[str, Tuple[List[str], Set[str]]]
+
+
+class Progress(TypedDict):
+    """
+    Pages of a search saved so far by execute.
+    """
+
+    pages_done: int
+    completed: bool
+
 
-def click_element(  # pylint: disable=inconsistent-return-statements
+def click_element(
     driver: webdriver,
     dropdown_id: str,
-    by: By,
-):
+    by: str,
+    timeout: float = browser.DEFAULT_TIMEOUT,
+) -> None:
     """Clicks on an element with the given id and by type.
 
     Args:
         driver (webdriver): Selenium webdriver
         dropdown_id (str): Id of the element to click
-        by (By): Type of the element to click
+        by (str): Type of the element to click, one of the By
+            constants
+        timeout (float): Seconds to wait for the element to be clickable
+
+    Raises:
+        TimeoutException: If the element isn't clickable in time.
     """
-    try:
-        element = driver.find_element(by, dropdown_id)
-        element.click()
-    except (
-        NoSuchElementException,
-        ElementNotInteractableException,
-        StaleElementReferenceException,
-    ):
-        time.sleep(0.1)
-        return click_element(driver, dropdown_id, by)
+    browser.click(driver, (by, dropdown_id), timeout)
 
 
 def agree_cookie(driver: webdriver) -> None:
@@ -77,23 +87,16 @@ def remove_modal(driver: webdriver) -> None:
     driver.switch_to.default_content()
 
 
-def close_modal_iframe(  # pylint: disable=inconsistent-return-statements
-    driver: webdriver,
-):
+def close_modal_iframe(driver: webdriver) -> None:
     """
     Close modal iframe.
 
     Args:
         driver (webdriver): Selenium webdriver.
     """
-    try:
-        iframe_element = driver.find_element(
-            By.XPATH, '//iframe[@title="Single Page Modal"]'
-        )
-    except NoSuchElementException:
-        time.sleep(0.1)
-        return close_modal_iframe(driver)
-    driver.switch_to.frame(iframe_element)
+    browser.switch_to_frame(
+        driver, (By.XPATH, '//iframe[@title="Single Page Modal"]')
+    )
     remove_modal(driver)
 
 
@@ -242,7 +245,7 @@ def scrape_page(driver: webdriver) -> List[Dict[str, str]]:
 
 
 def go_to_next_page(
-    driver: webdriver, next_page_number: int, attempts: int = 0
+    driver: webdriver, next_page_number: int, timeout: float = 3
 ) -> bool:
     """
     Clicks on the next page button.
@@ -250,32 +253,65 @@ def go_to_next_page(
     Args:
         driver (webdriver): Selenium webdriver.
         next_page_number (int): Page number to go to.
-        attempts (int): Number of attempts to click on the next page button.
+        timeout (float): Seconds to wait for the next page button,
+            there isn't one on the last page.
 
     Returns:
         bool: True if successful, False otherwise.
     """
     try:
-        next_page = driver.find_element(
-            By.XPATH, '//a[@title="Go to next page"]'
+        click_element(
+            driver, '//a[@title="Go to next page"]', By.XPATH, timeout
         )
-    except NoSuchElementException:
-        time.sleep(0.5)
-        if attempts < 5:
-            return go_to_next_page(driver, next_page_number, attempts + 1)
+    except TimeoutException:
         return False
 
-    # Check that the next page button is clickable
-    next_page.click()
-    wait = WebDriverWait(driver, 10)
-    wait.until(
+    browser.wait_for(
+        driver,
         EC.text_to_be_present_in_element(
             (By.CSS_SELECTOR, "span.button.active span"), str(next_page_number)
-        )
+        ),
     )
     return True
 
 
+def gender_name(gender_id: int) -> str:
+    """
+    Name of a gender id, used in the file names.
+
+    Args:
+        gender_id (int): ID for target gender.
+
+    Returns:
+        str: "male" or "female".
+    """
+    return "female" if gender_id == 2 else "male"
+
+
+def partition_users(
+    users: List[Dict], min_age: int, max_age: int
+) -> Iterator[Tuple[str, pd.DataFrame]]:
+    """
+    Splits users by age with a single groupby, dropping
+    users without an age or outside the age range.
+
+    Args:
+        users (List[Dict[str, str]]): List of user information.
+        min_age (int): Minimum age.
+        max_age (int): Maximum age.
+
+    Yields:
+        Tuple[str, pd.DataFrame]: Each age and its users.
+    """
+    df = pd.DataFrame(users)
+    if "age" not in df:
+        return
+    df = df[~df.age.isnull()]
+    ages = pd.to_numeric(df.age, errors="coerce")
+    df = df[ages.between(min_age, max_age)]
+    yield from df.groupby("age", sort=True)
+
+
 def save_users(
     users: List[Dict],
     min_age: int,
@@ -293,42 +329,126 @@ def save_users(
         gender_id (int): ID for target gender.
         output_path (str): Path to save csv file.
     """
-    gender_name = "male"
-    if gender_id == 2:
-        gender_name = "female"
-
-    df = pd.DataFrame(users)
-    unique_ages = df.age.unique()
-    df = df[~df.age.isnull()]
-    valid_ages = [age for age in unique_ages if min_age <= int(age) <= max_age]
-    for age in valid_ages:
-        age_df = df[df.age == age]
+    for age, age_df in partition_users(users, min_age, max_age):
         LOGGER.info("Saving %s users with age %s", len(age_df), age)
         age_df.to_csv(
-            f"{output_path}/users_{gender_name}_{age}.csv", index=False
+            f"{output_path}/users_{gender_name(gender_id)}_{age}.csv",
+            index=False,
+        )
+
+
+def read_saved_users(path: str) -> Tuple[List[str], Set[str]]:
+    """
+    Reads the header and user urls of a csv file written by
+    save_users or append_users.
+
+    Args:
+        path (str): Path of the csv file.
+
+    Returns:
+        Tuple[List[str], Set[str]]: The columns and the urls.
+    """
+    with open(path, "r", encoding="utf-8", newline="") as f:
+        reader = csv.reader(f)
+        columns = next(reader)
+        url_index = columns.index("url")
+        return columns, {row[url_index] for row in reader if row}
+
+
+# pylint: disable=too-many-arguments
+def append_users(
+    users: List[Dict],
+    min_age: int,
+    max_age: int,
+    gender_id: int,
+    output_path: str,
+    saved_users: Optional[SavedUsers] = None,
+) -> None:
+    """
+    Appends a page of users to the csv file of each age, the same
+    files save_users writes. The header is only written when a file
+    is created, later pages are written in the columns of the header.
+    Users already in a file are skipped, so a page saved before its
+    progress was written isn't duplicated when it's scraped again.
+
+    Args:
+        users (List[Dict[str, str]]): List of user information.
+        min_age (int): Minimum age.
+        max_age (int): Maximum age.
+        gender_id (int): ID for target gender.
+        output_path (str): Path to save csv file.
+        saved_users (Optional[SavedUsers]): What's in the files so
+            far, pass the same dict for every page of a run so each
+            file is only read once. It's kept up to date with the
+            users appended.
+    """
+    saved_users = {} if saved_users is None else saved_users
+    for age, age_df in partition_users(users, min_age, max_age):
+        path = f"{output_path}/users_{gender_name(gender_id)}_{age}.csv"
+        age_df = age_df.drop_duplicates("url")
+        if path not in saved_users and os.path.exists(path):
+            saved_users[path] = read_saved_users(path)
+        if path not in saved_users:
+            age_df.to_csv(path, index=False)
+            saved_users[path] = (list(age_df.columns), set(age_df.url))
+            continue
+        columns, saved_urls = saved_users[path]
+        age_df = age_df[~age_df.url.isin(saved_urls)]
+        if age_df.empty:
+            continue
+        new_columns = set(age_df.columns) - set(columns)
+        if new_columns:
+            LOGGER.warning("Dropping columns %s not in %s", new_columns, path)
+        age_df.reindex(columns=columns).to_csv(
+            path, mode="a", header=False, index=False
         )
+        saved_urls.update(age_df.url)
 
 
-def init_webdriver() -> webdriver.Chrome:
+def read_progress(progress_path: str) -> Progress:
+    """
+    Reads the progress of a search, no pages done if there isn't any.
+
+    Args:
+        progress_path (str): Path of the progress file.
+
+    Returns:
+        Progress: The pages saved so far.
+    """
+    if not os.path.exists(progress_path):
+        return Progress(pages_done=0, completed=False)
+    with open(progress_path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def write_progress(progress_path: str, progress: Progress) -> None:
+    """
+    Replaces the progress file, written to a temporary
+    file first so a crash can't leave it half written.
+
+    Args:
+        progress_path (str): Path of the progress file.
+        progress (Progress): The pages saved so far.
+    """
+    with open(f"{progress_path}.tmp", "w", encoding="utf-8") as f:
+        json.dump(progress, f)
+    os.replace(f"{progress_path}.tmp", progress_path)
+
+
+def init_webdriver(performance_log: bool = False) -> webdriver.Chrome:
     """
     Initializes the webdriver.
 
+    Args:
+        performance_log (bool): Record the network events so they
+            can be read with driver.get_log("performance").
+
     Returns:
         Selenium webdriver.
     """
     try:
         LOGGER.info("Initializing the webdriver...")
-
-        chrome_options = Options()
-        chrome_options.add_argument("--headless")  # Run in headless mode
-        chrome_options.add_experimental_option(
-            "prefs", {"profile.managed_default_content_settings.images": 2}
-        )  # Disable images
-        chrome_options.add_experimental_option(
-            "prefs",
-            {"profile.managed_default_content_settings.stylesheets": 2},
-        )  # Disable CSS
-        driver = webdriver.Chrome(options=chrome_options)
+        driver = browser.create_driver(performance_log=performance_log)
         LOGGER.info("Webdriver initialized successfully.")
         return driver
     except Exception as exc:
@@ -336,40 +456,135 @@ def init_webdriver() -> webdriver.Chrome:
         raise
 
 
-def execute(
-    gender_id: int, min_age: int, max_age: int, output_path: str
+def open_search(
+    driver: webdriver, gender_id: int, min_age: int, max_age: int
 ) -> None:
     """
-    Scrapes users from Bodybuilding.com.
+    Opens the members page and runs a search,
+    leaving the browser on the first results page.
 
     Args:
-        gender_id (gender_id): Id for target gender
+        driver (webdriver): Selenium webdriver.
+        gender_id (int): Id for target gender
         min_age (int): Minimum age.
         max_age (int): Maximum age.
-        output_path (str): Path to save csv file.
     """
-    driver = init_webdriver()
     open_members_page(driver)
     LOGGER.info("Members page opened")
+
+    # Each change reloads the results, wait for the
+    # current results to be replaced before the next one
+    results = browser.find_optional(driver, RESULT_LOCATOR)
     set_filters(driver, gender_id, min_age, max_age)
-    time.sleep(6)
+    if not browser.wait_for_refresh(driver, RESULT_LOCATOR, results):
+        LOGGER.warning("Results didn't reload after setting the filters")
+    results = browser.find_optional(driver, RESULT_LOCATOR)
     select_num_results(driver, 100)
-    time.sleep(2)
+    if not browser.wait_for_refresh(driver, RESULT_LOCATOR, results):
+        LOGGER.warning("Results didn't reload after setting the page size")
+
+
+def iter_user_pages(
+    driver: webdriver,
+    gender_id: int,
+    min_age: int,
+    max_age: int,
+    skip_pages: int = 0,
+) -> Iterator[List[Dict[str, str]]]:
+    """
+    Scrapes the results pages of a member search one at a time.
+
+    Args:
+        driver (webdriver): Selenium webdriver.
+        gender_id (int): Id for target gender
+        min_age (int): Minimum age.
+        max_age (int): Maximum age.
+        skip_pages (int): Pages to go past without scraping them,
+            e.g. the ones saved before a restart.
+
+    Yields:
+        List[Dict[str, str]]: User information of each page.
+    """
+    open_search(driver, gender_id, min_age, max_age)
 
-    users: List = []
     page_num = 1
+    while page_num <= skip_pages:
+        page_num += 1
+        if not go_to_next_page(driver, page_num):
+            return
+    if skip_pages:
+        LOGGER.info("Skipped %s pages", skip_pages)
+
     while True:
-        LOGGER.info(
-            "Scraping page %s (Results so far: %s)", page_num, len(users)
-        )
-        results = scrape_page(driver)
-        users.extend(results)
+        LOGGER.info("Scraping page %s", page_num)
+        yield scrape_page(driver)
         page_num += 1
         if not go_to_next_page(driver, page_num):
             break
+
+
+def scrape_users(
+    driver: webdriver, gender_id: int, min_age: int, max_age: int
+) -> List[Dict[str, str]]:
+    """
+    Scrapes every results page of a member search.
+
+    Args:
+        driver (webdriver): Selenium webdriver.
+        gender_id (int): Id for target gender
+        min_age (int): Minimum age.
+        max_age (int): Maximum age.
+
+    Returns:
+        List[Dict[str, str]]: List of user information.
+    """
+    users: List = []
+    for results in iter_user_pages(driver, gender_id, min_age, max_age):
+        users.extend(results)
     LOGGER.info("Scraped %s users", len(users))
-    save_users(users, min_age, max_age, gender_id, output_path)
-    driver.close()
+    return users
+
+
+def execute(
+    gender_id: int, min_age: int, max_age: int, output_path: str
+) -> None:
+    """
+    Scrapes users from Bodybuilding.com. Each page is appended to
+    the csv files as soon as it's scraped and the number of pages
+    saved is kept in a progress file, so a run that crashed carries
+    on from the page after the last one saved.
+
+    Args:
+        gender_id (gender_id): Id for target gender
+        min_age (int): Minimum age.
+        max_age (int): Maximum age.
+        output_path (str): Path to save csv file.
+    """
+    progress_path = os.path.join(
+        output_path,
+        f"progress_{gender_name(gender_id)}_{min_age}_{max_age}.json",
+    )
+    progress = read_progress(progress_path)
+    if progress["completed"]:
+        LOGGER.info("Search already completed, see %s", progress_path)
+        return
+
+    saved_users: SavedUsers = {}
+    driver = init_webdriver()
+    try:
+        for results in iter_user_pages(
+            driver, gender_id, min_age, max_age, progress["pages_done"]
+        ):
+            append_users(
+                results, min_age, max_age, gender_id, output_path, saved_users
+            )
+            progress["pages_done"] += 1
+            write_progress(progress_path, progress)
+        progress["completed"] = True
+        write_progress(progress_path, progress)
+    finally:
+        driver.close()
+    LOGGER.info("Saved %s pages", progress["pages_done"])
 
 
 if __name__ == "__main__":
@@ -1,22 +1,49 @@
-# pylint: disable=all
-# mypy: ignore-errors
-
+"""
+Parser for workout pages. The parsing is written against
+WorkoutNode, a small adapter over the tags of a page, so the
+BeautifulSoup engine here and the lxml engine in
+workout_lxml_parser share it and give exactly the same Workout.
+"""
+
+import html
 import re
 from enum import Enum
 from itertools import cycle
-from typing import Dict, List, Optional, Tuple, TypedDict
+from typing import (
+    Dict,
+    Iterator,
+    List,
+    Optional,
+    Protocol,
+    Sequence,
+    Tuple,
+    TypedDict,
+    Union,
+)
 
 from bs4 import BeautifulSoup, element
 
+from kuda.scrapers.highrise import tokenizers
+
 # When a workout is inaccessible the full div error message is:
 WORKOUT_INACCESSIBLE_MESSAGE = (
     "notice:somethinghasgonewrong!asystemerrororpermission"
     "issuehasoccurred.weapologizefortheinconvenience.please"
     "visitthebodyspacehometonavigatetothepageyourequested."
 )
+# Finds the error message in the raw html, for checking the
+# page before it's parsed.
+ERROR_MESSAGE_PATTERN = re.compile(
+    r"<div[^>]*\bmessage-box-message\b[^>]*>(.*?)</div>", re.DOTALL
+)
+TAG_PATTERN = re.compile(r"<[^>]*>")
 
 
 class BBSetType(Enum):
+    """
+    Set component types given in the set component titles.
+    """
+
     WEIGHT_REPS = "WEIGHT/REPS"
     REPS = "REPS"
     TIME = "TIME"
@@ -26,225 +53,401 @@ class BBSetType(Enum):
 
 
 class SetTypes(Enum):
+    """
+    Types of set.
+    """
+
     STRAIGHT_SET = "STRAIGHT_SET"
     SUPER_SET = "SUPER_SET"
     DROP_SET = "DROP_SET"
 
 
-class SetComponent(TypedDict):
+class Query(Enum):
+    """
+    Tags the parser looks for in a page: the tag name, an attribute
+    and the values it can have. A class matches any of the values,
+    other attributes have to be equal to the value.
+    """
+
+    ERROR_BOX = ("div", "class", ("message-box-message",))
+    WORKOUT_NAME = ("div", "class", ("rowSectionHeader",))
+    MONTH = ("span", "class", ("month-abbr",))
+    MONTH_DATE = ("span", "class", ("month-date",))
+    YEAR = ("span", "class", ("year",))
+    MUSCLES_WORKED = ("div", "class", ("musclesWorked",))
+    MUSCLES_WORKED_VALUE = ("span", "class", ("class", "value"))
+    TOTAL_WORKOUT_TIME = (
+        "span",
+        "wicketpath",
+        ("logResultsPanel_workoutSummary_totalWorkoutTime",),
+    )
+    TOTAL_CARDIO_TIME = (
+        "span",
+        "wicketpath",
+        ("logResultsPanel_workoutSummary_totalCardioTime",),
+    )
+    WORKOUT_FOOTER = ("div", "class", ("workout-footer",))
+    HIGH_ENERGY = ("div", "class", ("high",))
+    MID_HIGH_ENERGY = ("div", "class", ("mid-high",))
+    MID_LOW_ENERGY = ("div", "class", ("mid-low",))
+    LOW_ENERGY = ("div", "class", ("low",))
+    BIG_RATING = ("span", "class", ("bigRating",))
+    EXERCISE_OVERVIEW = ("div", "class", ("exercise-overview",))
+    EXERCISE_DETAILS = ("div", "class", ("exercise-details",))
+    EXERCISE_REST = ("div", "class", ("exercise-rest",))
+    SET = ("div", "class", ("set",))
+    EXERCISE_INFO = ("div", "class", ("exercise-info",))
+    MUSCLES_AND_EQUIPMENT = ("ul", "class", ("muscles-and-equipment",))
+    EXERCISE_NAV = ("p", "class", ("exercise-nav",))
+    SET_TITLE = ("div", "class", ("set-title",))
+    SET_BODY = ("div", "class", ("set-body",))
+    SET_ROW = ("div", "class", ("set-row",))
+    SET_COMPONENT_TITLE = ("label", "class", ("left-label",))
+    SET_COMPONENT_PERFORMANCE = ("div", "class", ("inputWrapper",))
+    LI = ("li", None, ())
+    A = ("a", None, ())
+    H3 = ("h3", None, ())
+    SPAN = ("span", None, ())
+
+
+ENERGY_LEVELS = [
+    (Query.HIGH_ENERGY, 4),
+    (Query.MID_HIGH_ENERGY, 3),
+    (Query.MID_LOW_ENERGY, 2),
+    (Query.LOW_ENERGY, 1),
+]
+
+
+class SetComponent(TypedDict, total=False):
+    """
+    A single exercise performed in a set.
+    """
+
     sequence: int
-    weight_metric: str
-    weight: str
-    target: str
-    reps: str
-    rest_time: str
+    weight_metric: Optional[str]
+    weight: Optional[str]
+    target: Optional[str]
+    reps: Optional[str]
+    rest_time: Optional[str]
     exercise_name: str
-    exercise_link: str
-    exercise_equipment: str
-    exercise_type: str
-    exercise_muscle: str
+    exercise_link: Optional[str]
+    exercise_equipment: Optional[str]
+    exercise_type: Optional[str]
+    exercise_muscle: Optional[str]
+
 
+class Set(TypedDict, total=False):
+    """
+    A set of a workout component, type is a SetTypes value.
+    """
 
-class Set(TypedDict):
-    type: SetTypes
+    type: str
     sequence: int
-    rest_time: str
+    rest_time: Optional[str]
     set_components: List[SetComponent]
 
 
-class WorkoutComponent(TypedDict):
+class WorkoutComponent(TypedDict, total=False):
+    """
+    The sets of an exercise section of a workout.
+    """
+
     sequence: int
-    rest_time: str
+    rest_time: Optional[str]
     sets: List[Set]
 
 
-class Workout(TypedDict):
+class Workout(TypedDict, total=False):
+    """
+    A parsed workout page, empty if the workout is inaccessible.
+    """
+
     created_by: str
     name: str
-    month: str
-    month_date: str
-    year: str
+    url: str
+    month: Optional[str]
+    month_date: Optional[str]
+    year: Optional[str]
     muscles_used: List[str]
     duration: str
     cardio_duration: str
+    energy_level: int
+    self_rating: str
     rating: str
     workout_components: List[WorkoutComponent]
     username: str
 
 
-request_agent = "Mozilla/5.0 Chrome/47.0.2526.106 Safari/537.36"
-
+class ExerciseData(TypedDict):
+    """
+    Exercise of a set component, from the exercise overview.
+    """
 
-def get_rest_time(string: str) -> str:
-    if string is None:
-        return None
-    string = re.sub(
-        ("Rest Between Exercises|" "Rest Between Sets|\s|\n"),
-        "",
-        string,
-    ).lower()
-    min = string.split("min")[0]
-    secs = string.split("min")[1].split("sec")[0]
-    return str(int(min) * 60 + int(secs))
+    exercise_name: str
+    exercise_link: Optional[str]
+    exercise_muscle: Optional[str]
+    exercise_type: Optional[str]
+    exercise_equipment: Optional[str]
+
+
+class WorkoutNode(Protocol):
+    """
+    A tag of a workout page, everything the parser needs from the
+    tree it's parsed into.
+    """
+
+    @property
+    def text(self) -> str:
+        """
+        All the text in the tag, as bs4's Tag.text.
+        """
+
+    def get(self, attribute: str) -> Optional[str]:
+        """
+        Value of an attribute, None if the tag doesn't have it.
+        """
+
+    def has_class(self, class_name: str) -> bool:
+        """
+        Whether class_name is one of the classes of the tag.
+        """
+
+    def parent(self) -> Optional["WorkoutNode"]:
+        """
+        The parent tag, None for the root of the page.
+        """
+
+    def next_divs(self) -> Iterator["WorkoutNode"]:
+        """
+        The div tags after this one with the same parent.
+        """
+
+    def find(self, query: Query) -> Optional["WorkoutNode"]:
+        """
+        The first tag inside this one matching query.
+        """
+
+    def find_all(self, query: Query) -> Sequence["WorkoutNode"]:
+        """
+        Every tag inside this one matching query.
+        """
+
+
+def soup_filter(query: Query) -> Tuple[str, Dict[str, Union[str, list]]]:
+    """
+    Name and attrs to search for a query with in BeautifulSoup.
+    Args:
+        query (Query): Query to search for.
+    Returns:
+        Tuple[str, Dict[str, Union[str, list]]]: (name, attrs).
+    """
+    tag, attribute, values = query.value
+    if attribute is None:
+        return tag, {}
+    return tag, {attribute: values[0] if len(values) == 1 else list(values)}
+
+
+SOUP_FILTERS = {query: soup_filter(query) for query in Query}
+
+
+class SoupNode:
+    """
+    WorkoutNode of a BeautifulSoup tag.
+    """
+
+    __slots__ = ("tag",)
+
+    def __init__(self, tag: element.Tag):
+        self.tag = tag
+
+    @property
+    def text(self) -> str:
+        """
+        All the text in the tag.
+        """
+        return self.tag.text
+
+    def get(self, attribute: str) -> Optional[str]:
+        """
+        Value of an attribute, None if the tag doesn't have it.
+        """
+        return self.tag.get(attribute)
+
+    def has_class(self, class_name: str) -> bool:
+        """
+        Whether class_name is one of the classes of the tag.
+        """
+        return class_name in self.tag.get("class", ())
+
+    def parent(self) -> Optional["SoupNode"]:
+        """
+        The parent tag, None for the root of the page.
+        """
+        parent = self.tag.find_parent()
+        return SoupNode(parent) if parent is not None else None
+
+    def next_divs(self) -> Iterator["SoupNode"]:
+        """
+        The div tags after this one with the same parent.
+        """
+        return map(SoupNode, self.tag.find_next_siblings("div"))
+
+    def find(self, query: Query) -> Optional["SoupNode"]:
+        """
+        The first tag inside this one matching query.
+        """
+        tag = self.tag.find(*SOUP_FILTERS[query])
+        return SoupNode(tag) if tag is not None else None
+
+    def find_all(self, query: Query) -> List["SoupNode"]:
+        """
+        Every tag inside this one matching query.
+        """
+        return [
+            SoupNode(tag) for tag in self.tag.find_all(*SOUP_FILTERS[query])
+        ]
+
+
+def get_rest_time(string: Optional[str]) -> Optional[str]:
+    """
+    Seconds of a rest like "Rest Between Sets 1 min 30 sec".
+    """
+    return tokenizers.rest_seconds(string)
 
 
 def get_weight_reps(
     set_component_performance: element.Tag,
-) -> Tuple[str, str, str]:
-    string = set_component_performance.text
-    if string is None:
-        return None
-    string = string.strip().replace("\n", "").lower()
+) -> Tuple[Optional[str], Optional[str], str]:
+    """
+    Metric, weight and reps of a set component performance tag.
+    """
+    return parse_weight_reps(set_component_performance.text)
 
-    weight_reps = string.split("x")
 
+def parse_weight_reps(string: str) -> Tuple[Optional[str], Optional[str], str]:
+    """
+    Metric, weight and reps of a field like "135 lbs x 10 reps".
+    """
     # BBSetType WEIGHT/REPS can also be the same
     # structure as REPS amazingly :(
-    if len(weight_reps) == 1:
-        reps = weight_reps[0]
-        weight = None
-        weight_metric = None
-    elif len(weight_reps) == 2:
-        weight, reps = weight_reps
-    else:
-        raise ValueError("Weight and Reps not found")
-
-    if weight:
-        if "lbs" in weight:
-            weight_metric = "lbs"
-            weight = re.sub("lbs.", "", weight)
-        elif "kg" in weight:
-            weight_metric = "kg"
-            weight = re.sub("kg.", "", weight)
-        else:
-            raise ValueError("Weight Metric not found")
-
-    reps = re.sub("reps|\.", "", reps)
-
-    return (weight_metric, weight, reps)
-
-
-def get_energy_level(workout_footer: element.Tag) -> int:
-    if workout_footer.find("div", {"class": "high"}):
-        return 4
-    elif workout_footer.find("div", {"class": "mid-high"}):
-        return 3
-    elif workout_footer.find("div", {"class": "mid-low"}):
-        return 2
-    elif workout_footer.find("div", {"class": "low"}):
-        return 1
-    else:
-        raise ValueError("Energy Level not found")
+    return tokenizers.weight_reps(string)
+
+
+def get_energy_level(workout_footer: WorkoutNode) -> int:
+    """
+    Energy level of a workout, from 1 (low) to 4 (high).
+    Args:
+        workout_footer (WorkoutNode): Footer of the workout page.
+    Returns:
+        int: The energy level.
+    Raises:
+        ValueError: If the footer has no energy level.
+    """
+    for query, energy_level in ENERGY_LEVELS:
+        if workout_footer.find(query) is not None:
+            return energy_level
+    raise ValueError("Energy Level not found")
+
+
+def parse_set_component_performance(
+    bb_set_type: str, set_type: Optional[str], performance: str
+) -> Tuple[Optional[str], Optional[str], Optional[str]]:
+    """
+    Metric, weight and reps of the performance of a set component.
+    Args:
+        bb_set_type (str): BBSetType value of the set component.
+        set_type (Optional[str]): SetTypes value of the set.
+        performance (str): Text of the performance.
+    Returns:
+        Tuple[Optional[str], Optional[str], Optional[str]]:
+            (weight_metric, weight, reps).
+    Raises:
+        ValueError: If the set component type isn't a BBSetType.
+    """
+    if (
+        bb_set_type == BBSetType.WEIGHT_REPS.value
+        or set_type == SetTypes.DROP_SET.value
+    ):
+        return parse_weight_reps(performance)
+    if bb_set_type == BBSetType.TIME.value:
+        return "seconds", tokenizers.time_seconds(performance), None
+    if bb_set_type == BBSetType.REPS.value:
+        # weight_metric could be "bodyweight"
+        return None, None, tokenizers.reps(tokenizers.clean(performance))
+    if bb_set_type == BBSetType.WEIGHT.value:
+        return (*tokenizers.weight(tokenizers.clean(performance)), None)
+    raise ValueError("BBSetType not found")
 
 
 def handle_double_set_component(
-    set_component_titles: List[element.Tag],
-    set_component_performances: List[element.Tag],
-    exercise: Dict,
+    set_component_titles: Sequence[WorkoutNode],
+    set_component_performances: Sequence[WorkoutNode],
+    exercise: ExerciseData,
     handle_type: str,
 ) -> SetComponent:
-    set_component: SetComponent = SetComponent()
-
-    set_component["exercise_link"] = exercise["exercise_link"]
-    set_component["exercise_name"] = exercise["exercise_name"]
-    set_component["exercise_muscle"] = exercise["exercise_muscle"]
-    set_component["exercise_type"] = exercise["exercise_type"]
-    set_component["exercise_equipment"] = exercise["exercise_equipment"]
+    """
+    Parse a set component given over two set rows, e.g. a cardio
+    time and distance or a weight and reps.
+    Args:
+        set_component_titles (Sequence[WorkoutNode]): Titles of the
+            rows.
+        set_component_performances (Sequence[WorkoutNode]): Performances
+            of the rows.
+        exercise (ExerciseData): Exercise of the set component.
+        handle_type (str): "cardio" or "weight".
+    Returns:
+        SetComponent: The set component, without a sequence.
+    """
+    set_component = SetComponent(
+        exercise_link=exercise["exercise_link"],
+        exercise_name=exercise["exercise_name"],
+        exercise_muscle=exercise["exercise_muscle"],
+        exercise_type=exercise["exercise_type"],
+        exercise_equipment=exercise["exercise_equipment"],
+    )
 
     for index, title in enumerate(set_component_titles):
         raw_title = title.text
+        performance = set_component_performances[index].text
 
-        if (
-            "time" in raw_title.strip().replace("\n", "").lower()
-            and handle_type == "cardio"
-        ):
-            performance = (
-                set_component_performances[index]
-                .text.strip()
-                .replace("\n", "")
-            )
-            performance = re.sub("hr|min|sec", "", performance)
-            hrs, mins, secs = performance.split(":")
-            weight = str(
-                int(hrs.replace("hr", "")) * 3600
-                + int(mins.replace("min", "")) * 60
-                + int(secs.replace("sec", ""))
+        if "time" in tokenizers.clean(raw_title) and handle_type == "cardio":
+            set_component["weight_metric"] = "seconds"
+            set_component["weight"] = tokenizers.time_seconds(performance)
+            set_component["reps"] = None
+            set_component["target"] = None
+            break
+        if handle_type == "weight":
+            bb_set_type, target = get_bb_set_type_and_target(raw_title)
+            (
+                set_component["weight_metric"],
+                set_component["weight"],
+                set_component["reps"],
+            ) = parse_set_component_performance(
+                bb_set_type=bb_set_type, set_type=None, performance=performance
             )
-            weight_metric = "seconds"
-            reps = None
-            target = None
+            set_component["target"] = target
             break
-        else:
-            if handle_type == "weight":
-                bb_set_type, target = get_bb_set_type_and_target(raw_title)
-                if bb_set_type == BBSetType.WEIGHT_REPS.value:
-                    weight_metric, weight, reps = get_weight_reps(
-                        set_component_performances[index]
-                    )
-                    break
-                elif bb_set_type == BBSetType.REPS.value:
-                    string = (
-                        set_component_performances[index]
-                        .text.strip()
-                        .replace("\n", "")
-                        .lower()
-                    )
-                    weight_metric = None  # Could be "bodyweight"
-                    weight = None
-                    reps = re.sub("reps|\.", "", string)
-                    break
-                elif bb_set_type == BBSetType.WEIGHT.value:
-                    string = (
-                        set_component_performances[index]
-                        .text.strip()
-                        .replace("\n", "")
-                        .lower()
-                    )
-                    if "lbs" in string:
-                        weight_metric = "lbs"
-                        weight = re.sub("lbs.", "", string)
-                    elif "kg" in string:
-                        weight_metric = "kg"
-                        weight = re.sub("kg.", "", string)
-                    reps = None
-                    break
-                elif bb_set_type == BBSetType.TIME.value:
-                    weight_metric = "seconds"
-                    time_string = (
-                        set_component_performances[index]
-                        .text.strip()
-                        .replace("\n", "")
-                    )
-                    hrs, mins, secs = time_string.split(":")
-                    weight = str(
-                        int(hrs.replace("hr", "")) * 3600
-                        + int(mins.replace("min", "")) * 60
-                        + int(secs.replace("sec", ""))
-                    )
-                    reps = None
-                    break
-                else:
-                    raise ValueError("BBSetType not found")
 
-            else:
-                continue
-
-    set_component["weight_metric"] = weight_metric
-    set_component["weight"] = weight
-    set_component["reps"] = reps
-    set_component["target"] = target
-
-    rest_time = find_rest_for_set_component(
+    set_component["rest_time"] = find_rest_for_set_component(
         set_title=set_component_titles[-1],
         set_type=SetTypes.STRAIGHT_SET.value,
     )
-    set_component["rest_time"] = rest_time
     return set_component
 
 
 def get_bb_set_type_and_target(
     set_component_title: str,
 ) -> Tuple[str, Optional[str]]:
+    """
+    Set component type and target of a set component title,
+    e.g. "WEIGHT/REPS - TARGET 10 REPS".
+    Args:
+        set_component_title (str): Text of the title.
+    Returns:
+        Tuple[str, Optional[str]]: (bb_set_type, target).
+    Raises:
+        ValueError: If a target time isn't in a known format.
+    """
     atts: List[str] = (
         set_component_title.strip()
         .replace(" ", "")
@@ -262,10 +465,9 @@ def get_bb_set_type_and_target(
         )
 
     if target_string:
-        if "lbs" in target_string:
-            target_string = re.sub("lbs.", "", target_string)
-        elif "kg" in target_string:
-            target_string = re.sub("kg.", "", target_string)
+        weight_metric, target_weight = tokenizers.weight(target_string)
+        if weight_metric is not None and target_weight is not None:
+            target_string = target_weight
 
         # Can be '00:02:00-00:03:00'
         if "-" in target_string:
@@ -292,384 +494,405 @@ def get_bb_set_type_and_target(
 
 
 def find_rest_for_set_component(
-    set_title: element.Tag, set_type: SetTypes
-) -> str:
-    set_row = set_title.find_parent()
-    if set_type == SetTypes.SUPER_SET.value:
-        while "set-body" not in set_row.get("class"):
-            set_row = set_row.find_parent()
-    else:
-        while "set" not in set_row.get("class"):
-            set_row = set_row.find_parent()
-
-    divs = set_row.find_next_siblings("div")
-    for div in divs:
-        if "set-body" in div.get("class"):
+    set_title: WorkoutNode, set_type: str
+) -> Optional[str]:
+    """
+    Rest after a set component, given after its set row.
+    Args:
+        set_title (WorkoutNode): Title of the set component.
+        set_type (str): SetTypes value of the set.
+    Returns:
+        Optional[str]: Seconds of the rest, None if there isn't one.
+    Raises:
+        ValueError: If the title isn't in a set.
+    """
+    set_class = "set-body" if set_type == SetTypes.SUPER_SET.value else "set"
+    set_row = set_title.parent()
+    while set_row is not None and not set_row.has_class(set_class):
+        set_row = set_row.parent()
+    if set_row is None:
+        raise ValueError("Set of set component not found")
+
+    for div in set_row.next_divs():
+        if div.has_class("set-body"):
             return None
-        if "set-rest" in div.get("class"):
+        if div.has_class("set-rest"):
             return get_rest_time(div.text)
-
-
-def workout_inaccessible(html_page: element.Tag) -> bool:
-    error_box = html_page.find("div", {"class": "message-box-message"})
-    if error_box:
-        error_message = re.sub("\n| ", "", error_box.text.lower())
+    return None
+
+
+def workout_inaccessible(html_page: WorkoutNode) -> bool:
+    """
+    Whether a parsed page is the error page of an inaccessible
+    workout.
+    Args:
+        html_page (WorkoutNode): The workout page.
+    Returns:
+        bool: True if the workout is inaccessible.
+    """
+    error_box = html_page.find(Query.ERROR_BOX)
+    if error_box is not None:
+        error_message = tokenizers.SPACES_AND_NEWLINES.sub(
+            "", error_box.text.lower()
+        )
         return WORKOUT_INACCESSIBLE_MESSAGE == error_message
     return False
 
 
-def parse_workout_html(url: str, html_text: element.Tag) -> Dict[str, str]:
-    username = url.split("viewworkoutlog")[1].split("/")[1]
-    html_page: element.Tag = BeautifulSoup(
-        html_text,
-        "lxml",
+def page_inaccessible(html_text: str) -> bool:
+    """
+    Same check as workout_inaccessible but on the raw html, so
+    the many dead pages in a crawl skip building the tree.
+    Args:
+        html_text (str): Html of the workout page.
+    Returns:
+        bool: True if the workout is inaccessible.
+    """
+    index = html_text.find("message-box-message")
+    if index == -1:
+        return False
+    # Only the tag the class is in has to be matched
+    match = ERROR_MESSAGE_PATTERN.match(
+        html_text, html_text.rfind("<", 0, index)
+    )
+    if match is None:
+        return False
+    error_message = html.unescape(TAG_PATTERN.sub("", match.group(1)))
+    return WORKOUT_INACCESSIBLE_MESSAGE == (
+        tokenizers.SPACES_AND_NEWLINES.sub("", error_message.lower())
     )
-    workout: Workout = dict()
 
-    # Check workout exists
-    if workout_inaccessible(html_page):
-        return {}
 
-    # Get the Workout Name
-    workout_name: element.Tag = html_page.find(
-        "div", {"class": "rowSectionHeader"}
-    ).text
+def stripped_text(node: Optional[WorkoutNode]) -> Optional[str]:
+    """
+    Stripped text of a tag that might not be on the page.
+    """
+    return node.text.strip() if node is not None else None
+
+
+def get_exercise_data(exercise_overview: WorkoutNode) -> List[ExerciseData]:
+    """
+    Name, link, muscle, type and equipment of every exercise in
+    an exercise overview.
+    Args:
+        exercise_overview (WorkoutNode): The exercise overview.
+    Returns:
+        List[ExerciseData]: The exercises in order.
+    """
+    exercise_muscle_and_equipment = exercise_overview.find_all(
+        Query.MUSCLES_AND_EQUIPMENT
+    )
+    exercise_data = []
+    for index, exercise_tag in enumerate(
+        exercise_overview.find_all(Query.EXERCISE_INFO)
+    ):
+        details = exercise_muscle_and_equipment[index].find_all(Query.LI)
+        exercise_nav = exercise_tag.find(Query.EXERCISE_NAV)
+        exercise_name = exercise_tag.find(Query.H3)
+        if exercise_nav is None or exercise_name is None:
+            raise ValueError("Exercise name or link not found")
+        exercise_link = exercise_nav.find(Query.A)
+        exercise_data.append(
+            ExerciseData(
+                exercise_name=exercise_name.text,
+                exercise_link=exercise_link.get("href")
+                if exercise_link is not None
+                else None,
+                exercise_muscle=stripped_text(details[0].find(Query.A)),
+                exercise_type=stripped_text(details[1].find(Query.A)),
+                exercise_equipment=stripped_text(details[2].find(Query.A)),
+            )
+        )
+    return exercise_data
+
+
+def find_text(node: Optional[WorkoutNode], query: Query) -> str:
+    """
+    Text of the first tag matching query inside node.
+    Args:
+        node (Optional[WorkoutNode]): Tag to search in.
+        query (Query): Query of the tag.
+    Returns:
+        str: The text of the tag.
+    Raises:
+        ValueError: If node or the tag isn't on the page.
+    """
+    found = node.find(query) if node is not None else None
+    if found is None:
+        raise ValueError(f"{query.name} not found")
+    return found.text
+
+
+def parse_workout_page(url: str, html_page: WorkoutNode) -> Workout:
+    """
+    Parse a workout page, whichever engine it was parsed with.
+    Args:
+        url (str): Link of the workout page.
+        html_page (WorkoutNode): Root of the page.
+    Returns:
+        Workout: The workout, empty if it's inaccessible.
+    """
+    # pylint: disable=too-many-locals
+    username = url.split("viewworkoutlog")[1].split("/")[1]
 
-    workout["name"] = workout_name
-    workout["username"] = username
-    workout["url"] = url
+    # Check workout exists
+    if workout_inaccessible(html_page):
+        return Workout()
 
-    month = html_page.find("span", {"class": "month-abbr"})
-    month_date = html_page.find("span", {"class": "month-date"})
-    year = html_page.find("span", {"class": "year"})
+    workout = Workout(
+        name=find_text(html_page, Query.WORKOUT_NAME),
+        username=username,
+        url=url,
+    )
 
-    workout["month"] = month.text.strip().lower() if month else None
+    month = html_page.find(Query.MONTH)
+    month_date = html_page.find(Query.MONTH_DATE)
+    year = html_page.find(Query.YEAR)
+    workout["month"] = (
+        month.text.strip().lower() if month is not None else None
+    )
     workout["month_date"] = (
-        month_date.text.strip().lower() if month_date else None
+        month_date.text.strip().lower() if month_date is not None else None
     )
-    workout["year"] = year.text.strip().lower() if year else None
+    workout["year"] = year.text.strip().lower() if year is not None else None
 
     # Get the Muslces worked according to the App
-    muscles_used_tag: element.Tag = html_page.find(
-        "div", {"class": "musclesWorked"}
-    ).find("span", {"class", "value"})
-    muscles_used: List[str] = [
-        m.strip() for m in muscles_used_tag.text.split(",")
-    ]
-    workout["muscles_used"] = muscles_used
-
-    # Get the Workout Time (seconds) looks like "00:00" hr:min
-    workout_time = html_page.find(
-        "span",
-        {"wicketpath": "logResultsPanel_workoutSummary_totalWorkoutTime"},
-    ).text.strip()
-    hrs, mins = workout_time.split(":")
-    workout["duration"] = str(int(hrs) * 3600 + int(mins) * 60)
+    muscles_used = find_text(
+        html_page.find(Query.MUSCLES_WORKED), Query.MUSCLES_WORKED_VALUE
+    )
+    workout["muscles_used"] = [m.strip() for m in muscles_used.split(",")]
 
-    cardio_time = html_page.find(
-        "span",
-        {"wicketpath": "logResultsPanel_workoutSummary_totalCardioTime"},
-    ).text.strip()
-    hrs, mins = cardio_time.split(":")
+    # Workout Time (seconds) looks like "00:00" hr:min
+    hrs, mins = (
+        find_text(html_page, Query.TOTAL_WORKOUT_TIME).strip().split(":")
+    )
+    workout["duration"] = str(int(hrs) * 3600 + int(mins) * 60)
+    hrs, mins = (
+        find_text(html_page, Query.TOTAL_CARDIO_TIME).strip().split(":")
+    )
     workout["cardio_duration"] = str(int(hrs) * 3600 + int(mins) * 60)
 
-    workout_footer = html_page.find("div", {"class": "workout-footer"})
+    workout_footer = html_page.find(Query.WORKOUT_FOOTER)
+    if workout_footer is None:
+        raise ValueError("Workout footer not found")
     workout["energy_level"] = get_energy_level(workout_footer)
-    rating = workout_footer.find("span", {"class": "bigRating"}).text.strip()
-    workout["self_rating"] = rating
+    workout["self_rating"] = find_text(
+        workout_footer, Query.BIG_RATING
+    ).strip()
 
     # From exercise overiew we want the Name and Link to the exercise page.
-    exercise_overview: List[element.Tag] = html_page.findAll(
-        "div", {"class": "exercise-overview"}
-    )
-
+    exercise_overview = html_page.find_all(Query.EXERCISE_OVERVIEW)
     # Exercise Details contains the sets and reps, weight, rest time etc.
-    exercise_details: List[element.Tag] = html_page.findAll(
-        "div", {"class": "exercise-details"}
-    )
-
-    workout_component_rests: List[element.Tag] = html_page.findAll(
-        "div", {"class": "exercise-rest"}
-    )
+    exercise_details = html_page.find_all(Query.EXERCISE_DETAILS)
+    workout_component_rests = html_page.find_all(Query.EXERCISE_REST)
 
     # The exercise BB.com details/overview sections are our Workout Components
-    number_workout_components: int = len(exercise_overview)
-
-    workout["workout_components"]: List[WorkoutComponent] = []
-    for workout_component_index in range(number_workout_components):
-        workout_component: WorkoutComponent = WorkoutComponent()
-        workout_component["sequence"]: int = workout_component_index + 1
-        workout_component["sets"]: List[Set] = []
+    workout["workout_components"] = []
+    for workout_component_index, overview in enumerate(exercise_overview):
+        workout_component = WorkoutComponent(
+            sequence=workout_component_index + 1, sets=[]
+        )
         if workout_component_index < len(workout_component_rests):
-            workout_component["rest_time"]: str = get_rest_time(
-                string=workout_component_rests[workout_component_index].text,
+            workout_component["rest_time"] = get_rest_time(
+                string=workout_component_rests[workout_component_index].text
             )
         else:
-            workout_component["rest_time"]: str = None
+            workout_component["rest_time"] = None
 
         # The BB.com set tags are our Set Objects
-        set_tags: List[element.Tag] = exercise_details[
-            workout_component_index
-        ].findAll("div", {"class": "set"})
+        set_tags = exercise_details[workout_component_index].find_all(
+            Query.SET
+        )
 
         # Set with no data (Not completed)
         if len(set_tags) == 0:
             continue
 
-        exercise_tags: List[element.Tag] = exercise_overview[
-            workout_component_index
-        ].findAll("div", {"class": "exercise-info"})
-
-        exercise_muscle_and_equipment = exercise_overview[
-            workout_component_index
-        ].findAll("ul", {"class": "muscles-and-equipment"})
-
-        exercise_data: Dict = []
-        for index, exercise_tag in enumerate(exercise_tags):
-            muscle = (
-                exercise_muscle_and_equipment[index].findAll("li")[0].find("a")
-            )
-            exercise_type = (
-                exercise_muscle_and_equipment[index].findAll("li")[1].find("a")
-            )
-            exercise_equipment = (
-                exercise_muscle_and_equipment[index].findAll("li")[2].find("a")
-            )
-            exercise_link = exercise_tag.find(
-                "p", {"class": "exercise-nav"}
-            ).find("a")
-            exercise_data.append(
-                {
-                    "exercise_name": exercise_tag.find("h3").text,
-                    "exercise_link": exercise_link.get("href")
-                    if exercise_link is not None
-                    else None,
-                    "exercise_muscle": muscle.text.strip()
-                    if muscle is not None
-                    else None,
-                    "exercise_type": exercise_type.text.strip()
-                    if exercise_type is not None
-                    else None,
-                    "exercise_equipment": exercise_equipment.text.strip()
-                    if exercise_equipment
-                    else None,
-                }
-            )
-        exercise_data: Dict = cycle(exercise_data)
+        exercise_data = get_exercise_data(overview)
+        number_exercises = len(exercise_data)
+        exercises = cycle(exercise_data)
 
         for set_index, set_tag in enumerate(set_tags):
-            set_: Set = Set()
-            set_["set_components"]: List[SetComponent] = []
-            set_["sequence"] = set_index + 1
-
-            # Our Set components are within the set tags
-            # For a straight set there will be one set component
-            # For a super set there will be more than one
-            # Will be more than one if it's a super set. If exercise
-            # name isn't here it's also indicative of a Straight, Cardio, Dropset
-            set_titles: List[element.Tag] = set_tag.findAll(
-                "div", {"class": "set-title"}
+            workout_component["sets"].append(
+                parse_set(
+                    set_tag=set_tag,
+                    set_index=set_index,
+                    is_last_set=set_index == len(set_tags) - 1,
+                    number_exercises=number_exercises,
+                    exercises=exercises,
+                    workout_component=workout_component,
+                )
             )
+        workout["workout_components"].append(workout_component)
+    return workout
 
-            set_bodies: List[element.Tag] = set_tag.findAll(
-                "div", {"class": "set-body"}
-            )
 
-            set_component_titles: List[element.Tag] = set_tag.findAll(
-                "label", {"class": "left-label"}
-            )
-            set_component_performances: List[element.Tag] = set_tag.findAll(
-                "div", {"class": "inputWrapper"}
+# pylint: disable=too-many-arguments, too-many-locals
+# pylint: disable=too-many-branches, too-many-statements
+def parse_set(
+    set_tag: WorkoutNode,
+    set_index: int,
+    is_last_set: bool,
+    number_exercises: int,
+    exercises: Iterator[ExerciseData],
+    workout_component: WorkoutComponent,
+) -> Set:
+    """
+    Parse a set of a workout component.
+    Args:
+        set_tag (WorkoutNode): The set.
+        set_index (int): Index of the set in the workout component.
+        is_last_set (bool): Whether it's the last set of the
+            workout component, which takes its rest time.
+        number_exercises (int): Exercises in the workout component.
+        exercises (Iterator[ExerciseData]): Cycle of the exercises
+            of the workout component, one is taken per set component.
+        workout_component (WorkoutComponent): Workout component of
+            the set.
+    Returns:
+        Set: The set.
+    """
+    set_ = Set(set_components=[], sequence=set_index + 1)
+
+    # Our Set components are within the set tags
+    # For a straight set there will be one set component
+    # For a super set there will be more than one
+    set_titles = set_tag.find_all(Query.SET_TITLE)
+    set_bodies = set_tag.find_all(Query.SET_BODY)
+    set_component_titles = set_tag.find_all(Query.SET_COMPONENT_TITLE)
+    set_component_performances = set_tag.find_all(
+        Query.SET_COMPONENT_PERFORMANCE
+    )
+    title_texts = [title.text for title in set_component_titles]
+    number_set_components = len(set_component_titles)
+
+    if len(set_titles) == 1:
+        set_["type"] = SetTypes.STRAIGHT_SET.value
+        if "Cardio" in set_titles[0].text and number_set_components != 1:
+            # complicated cardio
+            double_set_component = handle_double_set_component(
+                set_component_titles=set_component_titles,
+                set_component_performances=set_component_performances,
+                exercise=next(exercises),
+                handle_type="cardio",
             )
+            if is_last_set:
+                # Last set in a workout component should
+                # take the rest time of the workout component
+                double_set_component["rest_time"] = workout_component[
+                    "rest_time"
+                ]
+            double_set_component["sequence"] = 1
+            set_["set_components"].append(double_set_component)
+            set_["rest_time"] = double_set_component["rest_time"]
+            return set_
+    else:
+        set_["type"] = SetTypes.SUPER_SET.value
 
-            number_set_components: int = len(set_component_titles)
-
-            # Look for more cases than the below
-            if len(set_titles) > 0 and len(set_titles) < 2:
-                set_["type"] = SetTypes.STRAIGHT_SET.value
-                if "Cardio" in set_titles[0].text:
-                    if len(set_component_titles) == 1:
-                        pass
-                    # complicated cardio
-                    else:
-                        double_set_component = handle_double_set_component(
-                            set_component_titles=set_component_titles,
-                            set_component_performances=set_component_performances,
-                            exercise=next(exercise_data),
-                            handle_type="cardio",
-                        )
-                        if set_index == len(set_tags) - 1:
-                            # Last set in a workout component should
-                            # take the rest time of the workout component
-                            double_set_component[
-                                "rest_time"
-                            ] = workout_component["rest_time"]
-                        double_set_component["sequence"] = 1
-                        set_["set_components"].append(double_set_component)
-                        set_["rest_time"] = double_set_component["rest_time"]
-                        workout_component["sets"].append(set_)
-                        continue
-            else:
-                set_["type"] = SetTypes.SUPER_SET.value
-
-            for set_component_index in range(number_set_components):
-                if (
-                    set_component_index < len(set_bodies)
-                    and len(
-                        set_bodies[set_component_index].findAll(
-                            "div", {"class": "set-row"}
-                        )
-                    )
-                    > 1
-                ):
-                    if (
-                        len(set_component_titles) > 1
-                        and "drop" not in set_component_titles[0].text.lower()
-                        and "drop" not in set_component_titles[1].text.lower()
-                    ):
-                        double_set_component = handle_double_set_component(
-                            set_component_titles=set_component_titles
-                            if len(exercise_tags) == 1
-                            else set_component_titles[set_component_index:],
-                            set_component_performances=set_component_performances
-                            if len(exercise_tags) == 1
-                            else set_component_performances[
-                                set_component_index:
-                            ],
-                            exercise=next(exercise_data),
-                            handle_type="weight",
-                        )
-                        if set_index == len(set_tags) - 1:
-                            # Last set in a workout component should
-                            # take the rest time of the workout component
-                            double_set_component[
-                                "rest_time"
-                            ] = workout_component["rest_time"]
-                        double_set_component["sequence"] = (
-                            set_component_index + 1
-                        )
-                        set_["set_components"].append(double_set_component)
-                        set_["rest_time"] = double_set_component["rest_time"]
-                        break
-
-                set_component: SetComponent = SetComponent()
-                set_component["sequence"] = set_component_index + 1
-
-                # The set component type here is interesting
-                # It can also give a target. e.g. "TARGET 300 REPS"
-                # Some users don't fill in completed reps and weight
-                # so we'll track this in case it's useful
-                bb_set_type, target = get_bb_set_type_and_target(
-                    set_component_title=set_component_titles[
-                        set_component_index
-                    ].text
+    for set_component_index in range(number_set_components):
+        if (
+            set_component_index < len(set_bodies)
+            and len(set_bodies[set_component_index].find_all(Query.SET_ROW))
+            > 1
+        ):
+            if (
+                number_set_components > 1
+                and "drop" not in title_texts[0].lower()
+                and "drop" not in title_texts[1].lower()
+            ):
+                double_set_component = handle_double_set_component(
+                    set_component_titles=set_component_titles
+                    if number_exercises == 1
+                    else set_component_titles[set_component_index:],
+                    set_component_performances=set_component_performances
+                    if number_exercises == 1
+                    else set_component_performances[set_component_index:],
+                    exercise=next(exercises),
+                    handle_type="weight",
                 )
+                if is_last_set:
+                    # Last set in a workout component should
+                    # take the rest time of the workout component
+                    double_set_component["rest_time"] = workout_component[
+                        "rest_time"
+                    ]
+                double_set_component["sequence"] = set_component_index + 1
+                set_["set_components"].append(double_set_component)
+                set_["rest_time"] = double_set_component["rest_time"]
+                break
+
+        set_component = SetComponent(sequence=set_component_index + 1)
+
+        # The set component type can also give a target
+        # e.g. "TARGET 300 REPS"
+        bb_set_type, target = get_bb_set_type_and_target(
+            set_component_title=title_texts[set_component_index]
+        )
 
-                # Can be a span containing dropset info e.g. "DROP 1"
-                if set_component_titles[set_component_index].find("span"):
-                    title_info = (
-                        set_component_titles[set_component_index]
-                        .find("span")
-                        .text
-                    )
-                    # We only find out in the set components that the "set" is a drop set
-                    if "drop" in title_info.lower():
-                        set_["type"] = SetTypes.DROP_SET.value
-
-                if (
-                    bb_set_type == BBSetType.WEIGHT_REPS.value
-                    or set_["type"] == SetTypes.DROP_SET.value
-                ):
-                    weight_metric, weight, reps = get_weight_reps(
-                        set_component_performances[set_component_index]
-                    )
-                elif bb_set_type == BBSetType.TIME.value:
-                    weight_metric = "seconds"
-                    time_string = (
-                        set_component_performances[set_component_index]
-                        .text.strip()
-                        .replace("\n", "")
-                    )
-                    hrs, mins, secs = time_string.split(":")
-                    weight = str(
-                        int(hrs.replace("hr", "")) * 3600
-                        + int(mins.replace("min", "")) * 60
-                        + int(secs.replace("sec", ""))
-                    )
-                    reps = None
-                elif bb_set_type == BBSetType.REPS.value:
-                    string = (
-                        set_component_performances[set_component_index]
-                        .text.strip()
-                        .replace("\n", "")
-                        .lower()
-                    )
-                    weight_metric = None  # Could be "bodyweight"
-                    weight = None
-                    reps = re.sub("reps|\.", "", string)
-                elif bb_set_type == BBSetType.WEIGHT.value:
-                    string = (
-                        set_component_performances[set_component_index]
-                        .text.strip()
-                        .replace("\n", "")
-                        .lower()
-                    )
-                    if "lbs" in string:
-                        weight_metric = "lbs"
-                        weight = re.sub("lbs.", "", string)
-                    elif "kg" in string:
-                        weight_metric = "kg"
-                        weight = re.sub("kg.", "", string)
-                    reps = None
-                else:
-                    raise ValueError("BBSetType not found")
-
-                # Populate the set component
-                set_component["weight_metric"] = weight_metric
-                set_component["weight"] = weight
-                set_component["reps"] = reps
-
-                if target is not None:
-                    set_component["target"] = target
-
-                exercise = next(exercise_data)
-                set_component["exercise_link"] = exercise["exercise_link"]
-                set_component["exercise_name"] = exercise["exercise_name"]
-                set_component["exercise_muscle"] = exercise["exercise_muscle"]
-                set_component["exercise_type"] = exercise["exercise_type"]
-                set_component["exercise_equipment"] = exercise[
-                    "exercise_equipment"
-                ]
+        # Can be a span containing dropset info e.g. "DROP 1", we only
+        # find out in the set components that the "set" is a drop set
+        title_info = set_component_titles[set_component_index].find(Query.SPAN)
+        if title_info is not None and "drop" in title_info.text.lower():
+            set_["type"] = SetTypes.DROP_SET.value
+
+        (
+            set_component["weight_metric"],
+            set_component["weight"],
+            set_component["reps"],
+        ) = parse_set_component_performance(
+            bb_set_type=bb_set_type,
+            set_type=set_["type"],
+            performance=set_component_performances[set_component_index].text,
+        )
 
-                # Finding the rest time for the set component
-                rest_time = find_rest_for_set_component(
-                    set_title=set_component_titles[set_component_index],
-                    set_type=set_["type"],
-                )
+        if target is not None:
+            set_component["target"] = target
 
-                # print(rest_time)
-
-                if set_["type"] == SetTypes.DROP_SET.value:
-                    # Last set component in a drop set should take the rest time of the set
-                    if set_component_index == number_set_components - 1:
-                        set_component["rest_time"] = rest_time
-                    else:
-                        set_component["rest_time"] = "0"
-                        if set_component_index == 1:
-                            # We only know if a set is a drop set in the second set component
-                            set_["set_components"][0]["rest_time"] = "0"
-                else:
-                    set_component["rest_time"] = rest_time
-
-                if (
-                    set_index == len(set_tags) - 1
-                    and set_component_index == number_set_components - 1
-                ):
-                    # Last set in a workout component should take the rest time of the workout component
-                    set_component["rest_time"] = workout_component["rest_time"]
-
-                set_["set_components"].append(set_component)
-                set_["rest_time"] = set_component["rest_time"]
-            workout_component["sets"].append(set_)
-        workout["workout_components"].append(workout_component)
-    return workout
+        exercise = next(exercises)
+        set_component["exercise_link"] = exercise["exercise_link"]
+        set_component["exercise_name"] = exercise["exercise_name"]
+        set_component["exercise_muscle"] = exercise["exercise_muscle"]
+        set_component["exercise_type"] = exercise["exercise_type"]
+        set_component["exercise_equipment"] = exercise["exercise_equipment"]
+
+        rest_time = find_rest_for_set_component(
+            set_title=set_component_titles[set_component_index],
+            set_type=set_["type"],
+        )
+
+        if set_["type"] == SetTypes.DROP_SET.value:
+            # Last set component in a drop set should
+            # take the rest time of the set
+            if set_component_index == number_set_components - 1:
+                set_component["rest_time"] = rest_time
+            else:
+                set_component["rest_time"] = "0"
+                if set_component_index == 1:
+                    # We only know if a set is a drop
+                    # set in the second set component
+                    set_["set_components"][0]["rest_time"] = "0"
+        else:
+            set_component["rest_time"] = rest_time
+
+        if is_last_set and set_component_index == number_set_components - 1:
+            # Last set in a workout component should
+            # take the rest time of the workout component
+            set_component["rest_time"] = workout_component["rest_time"]
+
+        set_["set_components"].append(set_component)
+        set_["rest_time"] = set_component["rest_time"]
+    return set_
+
+
+def parse_workout_html(url: str, html_text: str) -> Workout:
+    """
+    Parse the html of a single workout page with BeautifulSoup.
+    Args:
+        url (str): Link of the workout page.
+        html_text (str): Html of the page.
+    Returns:
+        Workout: The workout, empty if it's inaccessible.
+    """
+    if page_inaccessible(html_text):
+        return Workout()
+    return parse_workout_page(url, SoupNode(BeautifulSoup(html_text, "lxml")))
@@ -0,0 +1,124 @@
+"""
+lxml engine for parsing workout pages. Produces exactly the same
+Workout as parse_workout_html, but works on the lxml tree directly
+with precompiled XPath queries instead of building a BeautifulSoup
+tree and scanning it with find/findAll.
+"""
+
+from typing import Iterator, List, Optional
+
+from lxml import etree
+
+from kuda.scrapers.highrise.workout_html_parser import (
+    Query,
+    Workout,
+    page_inaccessible,
+    parse_workout_page,
+)
+
+# Plain strings so results don't keep a reference to the whole tree
+TEXT_NODES = etree.XPath(".//text()", smart_strings=False)
+WHITESPACE = " \t\n\r\x0c"
+
+
+def query_xpath(query: Query) -> str:
+    """
+    XPath of every tag matching a query, in document order.
+    Args:
+        query (Query): Query to search for.
+    Returns:
+        str: The XPath.
+    """
+    tag, attribute, values = query.value
+    if attribute is None:
+        return f".//{tag}"
+    if attribute == "class":
+        # Matches a class token the same way bs4's class_ search does
+        condition = " or ".join(
+            f"contains(concat(' ', normalize-space(@class), ' '), ' {value} ')"
+            for value in values
+        )
+    else:
+        condition = " or ".join(f"@{attribute}='{value}'" for value in values)
+    return f".//{tag}[{condition}]"
+
+
+FIND_ALL = {query: etree.XPath(query_xpath(query)) for query in Query}
+FIND = {query: etree.XPath(f"({query_xpath(query)})[1]") for query in Query}
+
+
+class LxmlNode:
+    """
+    WorkoutNode of an lxml element.
+    """
+
+    __slots__ = ("element",)
+
+    def __init__(self, element: etree._Element):
+        self.element = element
+
+    @property
+    def text(self) -> str:
+        """
+        All the text in the tag, the same as bs4's .text. bs4
+        collapses whitespace only strings to a newline (or a space
+        if there isn't one) when it builds the tree, and the parsed
+        values depend on it.
+        """
+        return "".join(
+            text if text.strip(WHITESPACE) else "\n" if "\n" in text else " "
+            for text in TEXT_NODES(self.element)
+        )
+
+    def get(self, attribute: str) -> Optional[str]:
+        """
+        Value of an attribute, None if the tag doesn't have it.
+        """
+        return self.element.get(attribute)
+
+    def has_class(self, class_name: str) -> bool:
+        """
+        Whether class_name is one of the classes of the tag.
+        """
+        return class_name in self.element.get("class", "").split()
+
+    def parent(self) -> Optional["LxmlNode"]:
+        """
+        The parent tag, None for the root of the page.
+        """
+        parent = self.element.getparent()
+        return LxmlNode(parent) if parent is not None else None
+
+    def next_divs(self) -> Iterator["LxmlNode"]:
+        """
+        The div tags after this one with the same parent.
+        """
+        return map(LxmlNode, self.element.itersiblings("div"))
+
+    def find(self, query: Query) -> Optional["LxmlNode"]:
+        """
+        The first tag inside this one matching query.
+        """
+        found = FIND[query](self.element)
+        return LxmlNode(found[0]) if found else None
+
+    def find_all(self, query: Query) -> List["LxmlNode"]:
+        """
+        Every tag inside this one matching query.
+        """
+        return [LxmlNode(found) for found in FIND_ALL[query](self.element)]
+
+
+def parse_workout_html_lxml(url: str, html_text: str) -> Workout:
+    """
+    Parse the html of a single workout page with lxml.
+    Drop in replacement for parse_workout_html.
+    Args:
+        url (str): Link of the workout page.
+        html_text (str): Html of the page.
+    Returns:
+        Workout: The workout, empty if it's inaccessible.
+    """
+    if page_inaccessible(html_text):
+        return Workout()
+    return parse_workout_page(url, LxmlNode(etree.HTML(html_text)))
@@ -0,0 +1,130 @@
+"""
+Module for caching scraped pages on disk so re-runs
+can replay them instead of going to the network.
+"""
+
+import gzip
+import hashlib
+import json
+import os
+from typing import List, Optional, Tuple, TypedDict
+
+
+class CachedResponse(TypedDict):
+    """
+    A cached page and the validators needed to revalidate it.
+    """
+
+    url: str
+    html: str
+    etag: Optional[str]
+    last_modified: Optional[str]
+
+
+class ResponseCache:
+    """
+    Compressed on-disk cache of page html keyed by a hash of the
+    url. Each page is a single gzipped json file so writes are
+    atomic and eviction is just deleting files. Reading a page
+    marks it as used, and once the cache grows past max_bytes the
+    least recently used pages are evicted.
+    """
+
+    def __init__(
+        self,
+        directory: str,
+        max_bytes: int = 5 * 1024**3,
+        revalidate: bool = False,
+    ) -> None:
+        """
+        Args:
+            directory (str): Folder the cache lives in.
+            max_bytes (int): Size the cache is kept under.
+            revalidate (bool): If True, cached pages are revalidated
+                with the server using their ETag/Last-Modified. If
+                False they're replayed without any request at all.
+        """
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.revalidate = revalidate
+        os.makedirs(directory, exist_ok=True)
+        self.size = sum(os.path.getsize(path) for path, _ in self._entries())
+
+    def _path(self, url: str) -> str:
+        key = hashlib.sha256(url.encode("utf-8")).hexdigest()
+        return os.path.join(self.directory, key[:2], f"{key}.json.gz")
+
+    def _entries(self) -> List[Tuple[str, float]]:
+        entries = []
+        for root, _, files in os.walk(self.directory):
+            for file in files:
+                if file.endswith(".json.gz"):
+                    path = os.path.join(root, file)
+                    entries.append((path, os.path.getmtime(path)))
+        return entries
+
+    def get(self, url: str) -> Optional[CachedResponse]:
+        """
+        Get a page from the cache.
+        Args:
+            url (str): Url of the page.
+        Returns:
+            Optional[CachedResponse]: The cached page, None on a miss.
+        """
+        path = self._path(url)
+        try:
+            with gzip.open(path, "rt", encoding="utf-8") as f:
+                cached: CachedResponse = json.load(f)
+        except (FileNotFoundError, EOFError, OSError, ValueError):
+            return None
+        # Url hashes could collide, very unlikely but cheap to check
+        if cached["url"] != url:
+            return None
+        # Mark as recently used for eviction
+        os.utime(path)
+        return cached
+
+    def put(
+        self,
+        url: str,
+        html: str,
+        etag: Optional[str] = None,
+        last_modified: Optional[str] = None,
+    ) -> None:
+        """
+        Add a page to the cache, evicting old pages if it's full.
+        Args:
+            url (str): Url of the page.
+            html (str): Html of the page.
+            etag (Optional[str]): ETag header of the response.
+            last_modified (Optional[str]): Last-Modified header
+                of the response.
+        """
+        path = self._path(url)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        old_size = os.path.getsize(path) if os.path.exists(path) else 0
+        cached = CachedResponse(
+            url=url, html=html, etag=etag, last_modified=last_modified
+        )
+        # Written to a temporary file first so a crash can't
+        # leave a half written page in the cache.
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with gzip.open(tmp_path, "wt", encoding="utf-8") as f:
+            json.dump(cached, f)
+        os.replace(tmp_path, path)
+        self.size += os.path.getsize(path) - old_size
+        if self.size > self.max_bytes:
+            self.evict()
+
+    def evict(self) -> None:
+        """
+        Delete the least recently used pages until the cache is
+        under 90% of max_bytes, leaving room so the next few puts
+        don't each trigger an eviction.
+        """
+        target = self.max_bytes * 0.9
+        for path, _ in sorted(self._entries(), key=lambda entry: entry[1]):
+            if self.size <= target:
+                break
+            self.size -= os.path.getsize(path)
+            os.remove(path)
@@ -0,0 +1,170 @@
+"""
+Module for archiving the raw html of scraped pages so they
+can be re-parsed later without crawling them again.
+"""
+
+import gzip
+import json
+import os
+import re
+import uuid
+from datetime import datetime, timezone
+from typing import Dict, Iterator, Optional, Tuple, TypedDict
+
+INDEX_NAME = "index.jsonl"
+SEGMENT_NAME = "segment-{:05d}.warc.gz"
+SEGMENT_PATTERN = re.compile(r"^segment-(\d{5})\.warc\.gz$")
+
+
+class ArchiveRecord(TypedDict):
+    """
+    Where a page is stored in the archive.
+    """
+
+    url: str
+    segment: str
+    offset: int
+    length: int
+    fetched_at: str
+
+
+class PageArchive:
+    """
+    Append-only archive of raw pages in WARC format. Every page is
+    written as a WARC resource record in its own gzip member, so
+    any single page can be read by seeking to its offset and
+    decompressing just that member. Segments are rotated once they
+    reach segment_max_bytes, and an index of json lines records the
+    segment, offset and length of each page. Segments are standard
+    .warc.gz files and can be read by any WARC tooling.
+    """
+
+    def __init__(
+        self, directory: str, segment_max_bytes: int = 1024**3
+    ) -> None:
+        """
+        Args:
+            directory (str): Folder the segments and index live in.
+                Writing to an existing archive appends to it.
+            segment_max_bytes (int): Size at which a new segment
+                is started.
+        """
+        self.directory = directory
+        self.segment_max_bytes = segment_max_bytes
+        os.makedirs(directory, exist_ok=True)
+
+        # Later records for a url replace earlier ones
+        self.index: Dict[str, ArchiveRecord] = {}
+        index_path = os.path.join(directory, INDEX_NAME)
+        if os.path.exists(index_path):
+            with open(index_path, "r", encoding="utf-8") as f:
+                for line in f:
+                    if line.strip():
+                        record: ArchiveRecord = json.loads(line)
+                        self.index[record["url"]] = record
+        self._index_file = open(  # pylint: disable=consider-using-with
+            index_path, "a", encoding="utf-8"
+        )
+
+        segment_numbers = [
+            int(match.group(1))
+            for match in map(SEGMENT_PATTERN.match, os.listdir(directory))
+            if match
+        ]
+        self._segment_number = max(segment_numbers, default=0)
+        self._segment = self._open_segment()
+
+    def __enter__(self) -> "PageArchive":
+        return self
+
+    def __exit__(self, *_) -> None:
+        self.close()
+
+    def _open_segment(self):
+        return open(  # pylint: disable=consider-using-with
+            os.path.join(
+                self.directory, SEGMENT_NAME.format(self._segment_number)
+            ),
+            "ab",
+        )
+
+    def write(self, url: str, html: str) -> ArchiveRecord:
+        """
+        Append a page to the archive.
+        Args:
+            url (str): Url the page was scraped from.
+            html (str): Html of the page.
+        Returns:
+            ArchiveRecord: Where the page was written.
+        """
+        fetched_at = datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
+        payload = html.encode("utf-8")
+        header = (
+            "WARC/1.0\r\n"
+            "WARC-Type: resource\r\n"
+            f"WARC-Record-ID: <urn:uuid:{uuid.uuid4()}>\r\n"
+            f"WARC-Target-URI: {url}\r\n"
+            f"WARC-Date: {fetched_at}\r\n"
+            "Content-Type: text/html; charset=utf-8\r\n"
+            f"Content-Length: {len(payload)}\r\n"
+            "\r\n"
+        ).encode("utf-8")
+        member = gzip.compress(header + payload + b"\r\n\r\n")
+
+        offset = self._segment.tell()
+        if offset and offset + len(member) > self.segment_max_bytes:
+            self._segment.close()
+            self._segment_number += 1
+            self._segment = self._open_segment()
+            offset = 0
+        self._segment.write(member)
+        self._segment.flush()
+
+        record = ArchiveRecord(
+            url=url,
+            segment=SEGMENT_NAME.format(self._segment_number),
+            offset=offset,
+            length=len(member),
+            fetched_at=fetched_at,
+        )
+        # The index is written after the page so it never
+        # points at a record that isn't on disk.
+        self._index_file.write(json.dumps(record) + "\n")
+        self._index_file.flush()
+        self.index[url] = record
+        return record
+
+    def read(self, url: str) -> Optional[str]:
+        """
+        Read a single page without decompressing anything else.
+        Args:
+            url (str): Url of the page.
+        Returns:
+            Optional[str]: The html, None if the url isn't archived.
+        """
+        record = self.index.get(url)
+        if record is None:
+            return None
+        with open(os.path.join(self.directory, record["segment"]), "rb") as f:
+            f.seek(record["offset"])
+            data = gzip.decompress(f.read(record["length"]))
+        header, _, body = data.partition(b"\r\n\r\n")
+        length = re.search(rb"Content-Length: (\d+)", header)
+        return body[: int(length.group(1))].decode("utf-8")  # type: ignore
+
+    def iter_pages(self) -> Iterator[Tuple[str, str]]:
+        """
+        Read every page in the archive, the latest copy of each url.
+        Yields:
+            Tuple[str, str]: The url and html of each page.
+        """
+        self._segment.flush()
+        for url in self.index:
+            yield url, self.read(url)  # type: ignore
+
+    def close(self) -> None:
+        """
+        Close the current segment and the index.
+        """
+        self._segment.close()
+        self._index_file.close()
@@ -0,0 +1,156 @@
+"""
+Module for pacing requests per host, adapting the
+rate to how the host is coping.
+"""
+
+import asyncio
+import time
+from typing import Callable, Dict, Optional
+from urllib.parse import urlsplit
+
+
+class HostBucket:
+    """
+    Rate and pacing state for a single host.
+    """
+
+    def __init__(self, rate: float) -> None:
+        self.rate = rate
+        # Monotonic time the next request is allowed to start at
+        self.next_slot = 0.0
+        # Monotonic time of the last rate decrease
+        self.last_decrease = 0.0
+        self.latency_ewma: Optional[float] = None
+
+
+# pylint: disable=too-many-arguments
+class AdaptiveRateLimiter:
+    """
+    Paces requests to each host and tunes the rate with AIMD:
+    while responses are healthy the rate creeps up by roughly
+    `increase` requests/sec every second, and it's cut by
+    `decrease_factor` whenever the host throttles us, errors,
+    slows down sharply or serves an error page. The rate settles
+    just under what the host will sustain, so the number of
+    requests in flight can be set generously rather than tuned.
+    """
+
+    def __init__(
+        self,
+        initial_rate: float = 5.0,
+        min_rate: float = 0.5,
+        max_rate: float = 100.0,
+        increase: float = 1.0,
+        decrease_factor: float = 0.5,
+        latency_spike_factor: float = 3.0,
+        throttle_detector: Optional[Callable[[str], bool]] = None,
+    ) -> None:
+        """
+        Args:
+            initial_rate (float): Requests/sec to start each host at.
+            min_rate (float): Lowest requests/sec a host can drop to.
+            max_rate (float): Highest requests/sec a host can reach.
+            increase (float): Requests/sec added per second of
+                healthy responses.
+            decrease_factor (float): Multiplier applied to the rate
+                when the host is struggling.
+            latency_spike_factor (float): A response this many times
+                slower than the host's average counts as struggling.
+            throttle_detector (Optional[Callable[[str], bool]]):
+                Returns True if the html of a successful response is
+                really an error page, e.g. page_inaccessible for
+                bodyspace.
+        """
+        self.initial_rate = initial_rate
+        self.min_rate = min_rate
+        self.max_rate = max_rate
+        self.increase = increase
+        self.decrease_factor = decrease_factor
+        self.latency_spike_factor = latency_spike_factor
+        self.throttle_detector = throttle_detector
+        self._buckets: Dict[str, HostBucket] = {}
+
+    def _get_bucket(self, url: str) -> HostBucket:
+        host = urlsplit(url).netloc
+        if host not in self._buckets:
+            self._buckets[host] = HostBucket(self.initial_rate)
+        return self._buckets[host]
+
+    def get_rate(self, url: str) -> float:
+        """
+        Current requests/sec allowed for the url's host.
+        Args:
+            url (str): Any url on the host.
+        Returns:
+            float: The rate.
+        """
+        return self._get_bucket(url).rate
+
+    async def acquire(self, url: str) -> None:
+        """
+        Wait until a request to the url's host is allowed.
+        Each caller reserves the next free slot, so waiters
+        are let through in order, 1 / rate seconds apart.
+        Args:
+            url (str): Url about to be requested.
+        """
+        bucket = self._get_bucket(url)
+        now = time.monotonic()
+        slot = max(now, bucket.next_slot)
+        bucket.next_slot = slot + 1 / bucket.rate
+        if slot > now:
+            await asyncio.sleep(slot - now)
+
+    def record(
+        self,
+        url: str,
+        status: Optional[int],
+        latency: float,
+        html: Optional[str] = None,
+    ) -> None:
+        """
+        Feed the outcome of a request back into its host's rate.
+        Args:
+            url (str): Url that was requested.
+            status (Optional[int]): Response status, None if the
+                request failed without a response.
+            latency (float): Seconds the request took.
+            html (Optional[str]): Body of the response, checked with
+                the throttle_detector.
+        """
+        bucket = self._get_bucket(url)
+        now = time.monotonic()
+        spike = (
+            bucket.latency_ewma is not None
+            and latency > bucket.latency_ewma * self.latency_spike_factor
+        )
+        bucket.latency_ewma = (
+            latency
+            if bucket.latency_ewma is None
+            else 0.8 * bucket.latency_ewma + 0.2 * latency
+        )
+        struggling = (
+            status is None
+            or status == 429
+            or status >= 500
+            or spike
+            or bool(
+                html
+                and self.throttle_detector
+                and self.throttle_detector(html)
+            )
+        )
+        if struggling:
+            # Requests sent before the last decrease were sent at
+            # the old rate, they don't warrant cutting it again.
+            if now - latency < bucket.last_decrease:
+                return
+            bucket.rate = max(
+                self.min_rate, bucket.rate * self.decrease_factor
+            )
+            bucket.last_decrease = now
+            bucket.next_slot = max(bucket.next_slot, now + 1 / bucket.rate)
+        else:
+            bucket.rate = min(
+                self.max_rate, bucket.rate + self.increase / bucket.rate
+            )
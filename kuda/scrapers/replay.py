@@ -0,0 +1,223 @@
+"""
+Module for re-parsing saved html pages offline, in
+parallel across all cores, without going to the network.
+"""
+
+import argparse
+import gzip
+import json
+import os
+import tarfile
+import zipfile
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from typing import Callable, Dict, Iterator, List, Optional, Tuple, Union
+
+from kuda.scrapers.highrise.exercise_html_parser import parse_exericse_html
+from kuda.scrapers.highrise.workout_html_parser import parse_workout_html
+from kuda.scrapers.page_archive import INDEX_NAME, PageArchive
+
+# Lines of {"url": ..., "path": ...} mapping each saved
+# page to the url it was scraped from.
+MANIFEST_NAME = "manifest.jsonl"
+
+HTML_PARSERS: Dict[str, Callable] = {
+    "workout": parse_workout_html,
+    "exercise": parse_exericse_html,
+}
+
+
+def read_manifest(lines: List[str]) -> List[Tuple[str, str]]:
+    """
+    Parse the lines of a manifest.
+    Args:
+        lines (List[str]): Json lines of the manifest.
+    Returns:
+        List[Tuple[str, str]]: (url, path) of each page.
+    """
+    entries = [json.loads(line) for line in lines if line.strip()]
+    return [(entry["url"], entry["path"]) for entry in entries]
+
+
+def decode_page(path: str, data: bytes) -> str:
+    """
+    Decode a saved page, decompressing it if it's gzipped.
+    Args:
+        path (str): Path of the page, used for its extension.
+        data (bytes): Raw contents of the file.
+    Returns:
+        str: The html.
+    """
+    if path.endswith(".gz"):
+        data = gzip.decompress(data)
+    return data.decode("utf-8", errors="replace")
+
+
+def _match_pages(
+    names: List[str],
+    read: Callable[[str], bytes],
+    url_for_path: Optional[Callable[[str], str]],
+) -> List[Tuple[str, str]]:
+    if MANIFEST_NAME in names:
+        return read_manifest(read(MANIFEST_NAME).decode("utf-8").splitlines())
+    if url_for_path is None:
+        raise ValueError(f"No {MANIFEST_NAME} and no url_for_path given")
+    return [
+        (url_for_path(name), name)
+        for name in sorted(names)
+        if name.endswith((".html", ".html.gz"))
+    ]
+
+
+def iter_saved_pages(
+    source: str, url_for_path: Optional[Callable[[str], str]] = None
+) -> Iterator[Tuple[str, str]]:
+    """
+    Read saved pages from a PageArchive, directory, tar or zip file.
+    Pages are matched to their urls with the MANIFEST_NAME file, or
+    if there isn't one, by calling url_for_path on every .html/.html.gz
+    file. A PageArchive already knows the url of each page.
+    Args:
+        source (str): PageArchive directory, directory, tar (optionally
+            compressed) or zip.
+        url_for_path (Optional[Callable[[str], str]]): Gives the url
+            of a page from its path relative to the source.
+    Yields:
+        Tuple[str, str]: The url and html of each page.
+    """
+
+    if os.path.exists(os.path.join(source, INDEX_NAME)):
+        with PageArchive(source) as warc:
+            yield from warc.iter_pages()
+        return
+
+    # Each source type gives a list of its files and a way to read one
+    if os.path.isdir(source):
+        names = [
+            os.path.relpath(os.path.join(root, file), source)
+            for root, _, files in os.walk(source)
+            for file in files
+        ]
+
+        def read(name: str) -> bytes:
+            with open(os.path.join(source, name), "rb") as f:
+                return f.read()
+
+        pages = _match_pages(names, read, url_for_path)
+        yield from ((url, decode_page(n, read(n))) for url, n in pages)
+    elif zipfile.is_zipfile(source):
+        with zipfile.ZipFile(source) as zip_file:
+            pages = _match_pages(
+                zip_file.namelist(), zip_file.read, url_for_path
+            )
+            yield from (
+                (url, decode_page(n, zip_file.read(n))) for url, n in pages
+            )
+    elif tarfile.is_tarfile(source):
+        with tarfile.open(source) as tar_file:
+            # Tar files made from a directory list it as "./name"
+            members = {
+                os.path.normpath(member.name): member
+                for member in tar_file.getmembers()
+                if member.isfile()
+            }
+
+            def read_member(name: str) -> bytes:
+                member = tar_file.extractfile(members[name])
+                return member.read() if member else b""
+
+            pages = _match_pages(list(members), read_member, url_for_path)
+            yield from (
+                (url, decode_page(n, read_member(n))) for url, n in pages
+            )
+    else:
+        raise ValueError(f"Unsupported source: {source}")
+
+
+def parse_saved_page(
+    html_parser: Callable, url: str, html: str
+) -> Union[Dict, str]:
+    """
+    Parse a single saved page, the same way scrape_page does.
+    Args:
+        html_parser (Callable): Function to parse the data.
+        url (str): Url the page was scraped from.
+        html (str): Html of the page.
+    Returns:
+        Union[Dict, str]: Parsed data, or the url if parsing failed.
+    """
+    try:
+        return html_parser(url, html)
+    # pylint: disable=broad-except
+    except Exception as exp:
+        print(f"Error parsing {url}. {exp}")
+        return url
+
+
+def replay_pages(
+    pages: Iterator[Tuple[str, str]],
+    html_parser: Callable,
+    output_path: str,
+    processes: Optional[int] = None,
+) -> List[str]:
+    """
+    Parse saved pages across a pool of processes, streaming each
+    result to a json lines file as it completes. Only a few pages
+    per process are held in memory at any time.
+    Args:
+        pages (Iterator[Tuple[str, str]]): (url, html) of each page,
+            e.g. from iter_saved_pages.
+        html_parser (Callable): Module level function to parse the data.
+        output_path (str): Json lines file to write the results to.
+        processes (Optional[int]): Number of processes, defaults to
+            the number of cores.
+    Returns:
+        List[str]: Urls of the pages that failed to parse.
+    """
+
+    failed: List[str] = []
+    processes = processes or os.cpu_count() or 1
+    # Keeps every process busy without reading the whole source
+    max_in_flight = processes * 4
+    with ProcessPoolExecutor(processes) as executor, open(
+        output_path, "w", encoding="utf-8"
+    ) as f:
+        in_flight: set = set()
+
+        def write_results(done: set) -> None:
+            for future in done:
+                result = future.result()
+                if isinstance(result, str):
+                    failed.append(result)
+                else:
+                    f.write(json.dumps(result) + "\n")
+
+        for url, html in pages:
+            in_flight.add(
+                executor.submit(parse_saved_page, html_parser, url, html)
+            )
+            if len(in_flight) >= max_in_flight:
+                done, in_flight = wait(in_flight, return_when=FIRST_COMPLETED)
+                write_results(done)
+        write_results(wait(in_flight).done)
+    return failed
+
+
+if __name__ == "__main__":
+    arg_parser = argparse.ArgumentParser(
+        description="Re-parse saved html pages into a json lines file."
+    )
+    arg_parser.add_argument("source", help="Directory, tar or zip of pages")
+    arg_parser.add_argument("output_path", help="Json lines file to write")
+    arg_parser.add_argument(
+        "--parser", choices=list(HTML_PARSERS), default="workout"
+    )
+    arg_parser.add_argument("--processes", type=int, default=None)
+    args = arg_parser.parse_args()
+
+    failed_urls = replay_pages(
+        pages=iter_saved_pages(args.source),
+        html_parser=HTML_PARSERS[args.parser],
+        output_path=args.output_path,
+        processes=args.processes,
+    )
+    print(f"Done! {len(failed_urls)} pages failed to parse.")
@@ -7,6 +7,8 @@ import aiohttp
 import pandas as pd
 from bs4 import BeautifulSoup
 
+from kuda.scrapers.strainers import class_strainer
+
 # Configure logging
 logging.basicConfig(
     level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s"
@@ -16,6 +18,10 @@ LOGGER = logging.getLogger(__name__)
 FAILED_URLS = []
 SCRAPED_URLS = []
 
+SIDEBAR_CLASS = "my-3 mx-0 p-2 pt-1 bg-white rounded shadow-sm"
+# The workouts are in the tab-panes and the plan details in the sidebar
+PLAN_STRAINER = class_strainer("tab-pane", SIDEBAR_CLASS, name="div")
+
 
 def scrape_workout(workout: BeautifulSoup) -> Dict:
     """
@@ -94,9 +100,7 @@ def scrape_plan_details(soup: BeautifulSoup) -> Dict:
     Returns:
         Dict: Dictionary containing the plan details
     """
-    sidebar = soup.find(
-        "div", class_="my-3 mx-0 p-2 pt-1 bg-white rounded shadow-sm"
-    )
+    sidebar = soup.find("div", class_=SIDEBAR_CLASS)
     plan_info = sidebar.find("div", class_="scroll-bar-mod")
     info_divs = plan_info.find_all("div")
 
@@ -128,13 +132,39 @@ def scrape_plan_details(soup: BeautifulSoup) -> Dict:
     }
 
 
-async def scrape_plan(plan_url: str, session: aiohttp.ClientSession):
+def parse_plan(html: str, parser_backend: str = "lxml") -> Dict:
+    """
+    Extracts the plan details and workouts from the HTML of a plan
+    page, only parsing the tab-panes and sidebar
+
+    Args:
+        html (str): HTML of the plan page
+        parser_backend (str): BeautifulSoup parser, "lxml" or the
+            slower pure python "html.parser"
+
+    Returns:
+        Dict: Dictionary containing the plan details and workouts
+    """
+    soup = BeautifulSoup(html, parser_backend, parse_only=PLAN_STRAINER)
+    workouts = list(scrape_workouts(soup))
+    plan_data = scrape_plan_details(soup)
+    plan_data["workouts"] = workouts
+    return plan_data
+
+
+async def scrape_plan(
+    plan_url: str,
+    session: aiohttp.ClientSession,
+    parser_backend: str = "lxml",
+):
     """
     Extracts the plan details from the provided HTML snippet
 
     Args:
         plan_url (str): URL of the plan to scrape
         session (aiohttp.ClientSession): aiohttp session object
+        parser_backend (str): BeautifulSoup parser, "lxml" or the
+            slower pure python "html.parser"
 
     Returns:
         Dict: Dictionary containing the plan details
@@ -142,10 +172,8 @@ async def scrape_plan(plan_url: str, session: aiohttp.ClientSession):
     async with session.get(plan_url) as response:
         try:
             html = await response.text()
-            soup = BeautifulSoup(html, "html.parser")
-            workouts = list(scrape_workouts(soup))
-            plan_data = scrape_plan_details(soup)
-            plan_data["workouts"] = workouts
+            plan_data = parse_plan(html, parser_backend=parser_backend)
+            workouts = plan_data["workouts"]
             plan_data["url"] = plan_url
             plan_data["num_workouts"] = len(workouts)
             plan_data["workout_titles"] = [
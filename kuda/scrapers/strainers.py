@@ -0,0 +1,35 @@
+"""
+Module for parsing only the parts of a page a parser needs.
+"""
+
+from typing import Optional, Union
+
+from bs4 import SoupStrainer
+
+
+def class_strainer(*class_names: str, name: Optional[str] = None):
+    """
+    Strainer keeping only the tags with one of the classes, and
+    everything inside them. Works like find's class_ search, a
+    class name can be one of the tag's classes or the whole class
+    attribute. bs4 matches a strainer against the unsplit class
+    attribute, so a plain class_ strainer would miss tags that
+    have more than one class.
+    Args:
+        class_names (str): Classes to keep.
+        name (Optional[str]): Only keep tags with this name.
+    Returns:
+        SoupStrainer: Pass to BeautifulSoup as parse_only.
+    """
+    names = set(class_names)
+
+    def has_class(class_attr: Optional[Union[str, list]]) -> bool:
+        if class_attr is None:
+            return False
+        if isinstance(class_attr, str):
+            if class_attr in names:
+                return True
+            class_attr = class_attr.split()
+        return not names.isdisjoint(class_attr)
+
+    return SoupStrainer(name, class_=has_class)
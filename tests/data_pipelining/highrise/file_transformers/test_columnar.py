@@ -0,0 +1,136 @@
+import json
+import re
+
+import pandas as pd
+
+from kuda.data_pipelining.highrise.file_transformers import (
+    flatten_workout_tree,
+    parse_workout_tree,
+)
+from kuda.data_pipelining.highrise.file_transformers.columnar import (
+    uuid4_column,
+)
+from kuda.data_pipelining.highrise.file_transformers.functions import (
+    decrypt_string,
+)
+from kuda.data_pipelining.highrise.file_transformers.ids import (
+    IdGenerator,
+    IdStrategies,
+)
+
+PRIMARY_KEYS = {
+    "workouts": "workout_id",
+    "workout_components": "workout_component_id",
+    "sets": "set_id",
+    "set_components": "set_component_id",
+}
+LEVELS = list(PRIMARY_KEYS)
+FOREIGN_KEYS = {
+    "workout_components": "workout_id",
+    "sets": "workout_component_id",
+    "set_components": "set_id",
+}
+
+
+def test_flatten_workout_tree() -> None:
+    """
+    Test the columnar tables hold the same data and
+    key linkage as the parsed workout tree components.
+    """
+
+    with open(
+        "tests/files/workout_links/parsed/workouts.json", "r", encoding="utf-8"
+    ) as f:
+        workouts = [workout for workout in json.load(f) if workout]
+
+    components = parse_workout_tree(workouts=workouts)
+    tables = flatten_workout_tree(workouts=workouts)
+
+    for level, primary_key in PRIMARY_KEYS.items():
+        expected = pd.DataFrame(components[level])
+        table = tables[level]
+        assert list(table.columns) == list(expected.columns)
+        assert table[primary_key].is_unique
+
+        # Ids are random, so the keys are compared by which row they
+        # point to and everything else is compared directly.
+        exclude = [primary_key, FOREIGN_KEYS.get(level), "created_by"]
+        columns = [column for column in table.columns if column not in exclude]
+        records = table[columns].astype(object)
+        assert records.where(records.notna(), None).to_dict("records") == [
+            {column: component[column] for column in columns}
+            for component in components[level]
+        ]
+        if level in FOREIGN_KEYS:
+            foreign_key = FOREIGN_KEYS[level]
+            parent_level = LEVELS[LEVELS.index(level) - 1]
+            parent_rows = pd.Index(tables[parent_level][foreign_key])
+            expected_parent_rows = pd.Index(
+                [parent[foreign_key] for parent in components[parent_level]]
+            )
+            assert list(parent_rows.get_indexer(table[foreign_key])) == list(
+                expected_parent_rows.get_indexer(expected[foreign_key])
+            )
+
+    assert [
+        decrypt_string(created_by)
+        for created_by in tables["workouts"]["created_by"]
+    ] == [workout["username"] for workout in workouts]
+
+
+def test_uuid4_column() -> None:
+    """
+    Test the vectorised uuids are valid version 4 uuids
+    """
+
+    uuids = uuid4_column(1000)
+    assert len(set(uuids)) == 1000
+    assert all(
+        re.fullmatch(
+            "[0-9a-f]{8}-[0-9a-f]{4}-4[0-9a-f]{3}-"
+            "[89ab][0-9a-f]{3}-[0-9a-f]{12}",
+            uuid,
+        )
+        for uuid in uuids
+    )
+
+
+def test_flatten_workout_tree_ids() -> None:
+    """
+    Test hashed ids are the same on every run and the same as
+    parse_workout_tree's, and sequence ids count up per level.
+    """
+
+    with open(
+        "tests/files/workout_links/parsed/workouts.json", "r", encoding="utf-8"
+    ) as f:
+        workouts = [workout for workout in json.load(f) if workout]
+
+    hashed = flatten_workout_tree(workouts, id_strategy=IdStrategies.hashed)
+    rerun = flatten_workout_tree(workouts, id_strategy=IdStrategies.hashed)
+    components = parse_workout_tree(workouts, id_strategy=IdStrategies.hashed)
+    sequence = flatten_workout_tree(
+        workouts, id_strategy=IdStrategies.sequence
+    )
+    # A shared generator keeps counting up across batches
+    id_generator = IdGenerator(IdStrategies.sequence, start=100)
+    first_batch = flatten_workout_tree(workouts[:2], id_generator=id_generator)
+    second_batch = parse_workout_tree(workouts[2:], id_generator=id_generator)
+    for level, primary_key in PRIMARY_KEYS.items():
+        ids = list(hashed[level][primary_key])
+        assert len(set(ids)) == len(ids)
+        assert ids == list(rerun[level][primary_key])
+        assert ids == [
+            component[primary_key] for component in components[level]
+        ]
+        assert list(sequence[level][primary_key]) == list(
+            range(1, len(ids) + 1)
+        )
+        assert list(first_batch[level][primary_key]) + [
+            component[primary_key] for component in second_batch[level]
+        ] == list(range(100, len(ids) + 100))
+        if level in FOREIGN_KEYS:
+            foreign_key = FOREIGN_KEYS[level]
+            assert list(hashed[level][foreign_key]) == [
+                component[foreign_key] for component in components[level]
+            ]
@@ -1,3 +1,6 @@
+import hashlib
+import hmac
+
 from kuda.data_pipelining.highrise.file_transformers import functions
 from kuda.data_pipelining.highrise.file_transformers.components import (
     SetComponentParser,
@@ -22,7 +25,7 @@ def test_workout_parser():
 
     workout_parser = WorkoutParser(HIGHRISE_SCRAPED_WORKOUT)
     dict_comparsion(
-        dict_a=workout_parser.__dict__,
+        dict_a=dict(workout_parser),
         dict_b={
             "name": "Bi's,Tri's,Cardio!",
             "created_at": "2017-09-16 00:00:00",
@@ -59,7 +62,7 @@ def test_workout_component_parser():
         raw_dict=HIGHRISE_SCRAPED_WORKOUT_COMPONENT,
     )
     dict_comparsion(
-        dict_a=workout_component_parser.__dict__,
+        dict_a=dict(workout_component_parser),
         dict_b={
             "workout_id": 1,
             "sequence": 1,
@@ -81,7 +84,7 @@ def test_set_parser():
         raw_dict=HIGHRISE_SCRAPED_WORKOUT_SET,
     )
     dict_comparsion(
-        dict_a=set_parser.__dict__,
+        dict_a=dict(set_parser),
         dict_b={
             "workout_component_id": 1,
             "sequence": 1,
@@ -105,7 +108,7 @@ def test_set_component_parser():
     )
 
     dict_comparsion(
-        dict_a=set_component_parser.__dict__,
+        dict_a=dict(set_component_parser),
         dict_b={
             "set_id": 1,
             "created_at": "2017-09-16 00:00:00",
@@ -123,3 +126,66 @@ def test_set_component_parser():
         exclude_keys=["set_component_id"],
     )
     assert set_component_parser.set_component_id is not None
+
+
+def test_workout_parser_pseudonyms():
+    """
+    Test the same username always gets the same
+    created_by, in both pseudonym modes.
+    """
+
+    username = HIGHRISE_SCRAPED_WORKOUT["username"]
+    encrypted = [WorkoutParser(HIGHRISE_SCRAPED_WORKOUT) for _ in range(2)]
+    assert encrypted[0].created_by == encrypted[1].created_by
+    assert functions.decrypt_string(encrypted[0].created_by) == username
+
+    hashed = WorkoutParser(
+        HIGHRISE_SCRAPED_WORKOUT,
+        pseudonym_mode=functions.PseudonymModes.hashed,
+    )
+    assert hashed.created_by == functions.hash_string(username)
+    assert hashed.created_by != functions.hash_string(f"{username}_")
+    assert len(hashed.created_by) == 64
+    # The hash isn't keyed with the encryption key itself
+    assert (
+        hashed.created_by
+        != hmac.new(
+            functions.ENCRYPTION_KEY.encode("utf-8"),
+            username.encode("utf-8"),
+            hashlib.sha256,
+        ).hexdigest()
+    )
+    assert (
+        functions.pseudonymize.cache_info().maxsize
+        == functions.PSEUDONYM_CACHE_SIZE
+    )
+
+
+def test_interned_strings():
+    """
+    Test repeated strings of the parsed
+    components share one object.
+    """
+
+    raw_sets = [
+        {**HIGHRISE_SCRAPED_WORKOUT_SET, "type": "".join(["STRAIGHT", "_SET"])}
+        for _ in range(2)
+    ]
+    first_set, second_set = (SetParser(raw_set) for raw_set in raw_sets)
+    assert raw_sets[0]["type"] is not raw_sets[1]["type"]
+    assert first_set.type is second_set.type
+
+
+def test_postgres_timestamps():
+    """
+    Test the memoized date conversion and its batch form
+    """
+
+    assert (
+        WorkoutParser(HIGHRISE_SCRAPED_WORKOUT).created_at
+        == functions.postgres_timestamp("Sep", "16", "2017")
+        == "2017-09-16 00:00:00"
+    )
+    assert functions.postgres_timestamps(
+        ["sep", "Jan"], ["16", "3"], ["2017", "2018"]
+    ) == ["2017-09-16 00:00:00", "2018-01-03 00:00:00"]
@@ -1,6 +1,8 @@
 import json
 import os
 
+import pandas as pd
+
 from kuda.data_pipelining.highrise.file_transformers import parse_workout_tree
 from tests.utils.functions import dict_comparsion
 
@@ -151,3 +153,34 @@ def test_workout_tree_parser():
             },
             exclude_keys=["set_component_id"],
         )
+
+
+def test_workout_tree_records():
+    """
+    Test the components are slotted records that share their
+    workout's created_at object, read like dicts, and become
+    DataFrame rows in their field order.
+    """
+
+    with open(
+        "tests/files/workout_links/parsed/single_workout.json",
+        "r",
+        encoding="utf-8",
+    ) as f:
+        components = parse_workout_tree(workouts=[json.load(f)])
+
+    workout = components["workouts"][0]
+    for level in ("workout_components", "sets", "set_components"):
+        for component in components[level]:
+            assert not hasattr(component, "__dict__")
+            assert component["created_at"] is workout["created_at"]
+    assert json.loads(json.dumps(dict(workout))) == dict(workout)
+
+    set_components = pd.DataFrame(components["set_components"])
+    assert list(set_components.columns) == list(
+        components["set_components"][0]
+    )
+    assert list(set_components.set_component_id) == [
+        component["set_component_id"]
+        for component in components["set_components"]
+    ]
@@ -0,0 +1,31 @@
+from kuda.scrapers import parse_exericse_html
+
+EXERCISE_FILE_PATH = "tests/files/exercise_pages"
+
+
+def test_exercise_html_parser() -> None:
+    """
+    Test the exercise page is parsed the same
+    with either parser backend
+    """
+
+    url = "https://www.bodybuilding.com/exercises/barbell-full-squat"
+    with open(
+        f"{EXERCISE_FILE_PATH}/barbell-full-squat.html", "r", encoding="utf-8"
+    ) as f:
+        html = f.read()
+
+    exercise = parse_exericse_html(url, html)
+    assert exercise == parse_exericse_html(
+        url, html, parser_backend="html.parser"
+    )
+    assert exercise["exercise_link"] == url
+    assert exercise["exercise_name"] == "barbell full squat"
+    assert exercise["exercise_type"] == "strength"
+    assert exercise["main_muscle_worked"] == "quadriceps"
+    assert exercise["equipment"] == "barbell"
+    assert exercise["equipment_link"] == "/exercises/equipment/barbell"
+    assert exercise["level"] == "intermediate"
+    assert exercise["rating"] == "9.4"
+    assert len(exercise["benefits"]) == 3
+    assert len(exercise["instructions"]) == 5
@@ -0,0 +1,36 @@
+import pytest
+
+from kuda.scrapers.highrise import tokenizers
+
+
+def test_durations() -> None:
+    """
+    Test rest times and hr:min:sec times are turned into seconds
+    """
+
+    assert tokenizers.rest_seconds("Rest Between Sets\n 1 min 30 sec") == "90"
+    assert tokenizers.rest_seconds("Rest Between Exercises 0 min 0 sec") == "0"
+    assert tokenizers.rest_seconds(None) is None
+    assert tokenizers.time_seconds("\n01\nhr\n:\n05\nmin\n:\n10\nsec\n") == (
+        "3910"
+    )
+    assert tokenizers.time_seconds("00:02:00") == "120"
+
+
+def test_weights_and_reps() -> None:
+    """
+    Test weights and reps are split from their metrics
+    """
+
+    assert tokenizers.weight_reps("\n135\nlbs.\nx\n10\nreps.\n") == (
+        "lbs",
+        "135",
+        "10",
+    )
+    assert tokenizers.weight_reps("60 kg x 8 reps") == ("kg", "60 ", " 8 ")
+    assert tokenizers.weight_reps("12 reps.") == (None, None, "12 ")
+    assert tokenizers.weight("40 lbs.") == ("lbs", "40 ")
+    assert tokenizers.weight("bodyweight") == (None, None)
+
+    with pytest.raises(ValueError):
+        tokenizers.weight_reps("135 stone x 10 reps")
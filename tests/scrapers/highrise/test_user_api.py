@@ -0,0 +1,174 @@
+import asyncio
+import json
+
+import pytest
+from aiohttp import web
+
+from kuda.scrapers.highrise.user_api import (
+    MemberSearchApi,
+    find_json_requests,
+    find_page_param,
+    find_records,
+    page_url,
+    scrape_search_api,
+)
+from tests.utils.server import local_server
+
+PAGES = 5
+PAGE_SIZE = 3
+
+
+def log_entry(method: str, params: dict) -> dict:
+    """
+    Entry of a performance log, as given by driver.get_log.
+    """
+    return {
+        "message": json.dumps(
+            {"message": {"method": method, "params": params}}
+        )
+    }
+
+
+async def search_handler(request: web.Request) -> web.Response:
+    """
+    Serves PAGES pages of members, only to the captured cookie.
+    """
+    if request.cookies.get("session") != "abc":
+        return web.Response(status=403)
+    page = int(request.query["pageNumber"])
+    members = [
+        {"url": f"/{page}/{index}", "gender": request.query["gender"]}
+        for index in range(PAGE_SIZE)
+    ]
+    return web.json_response(
+        {"data": {"members": members if page <= PAGES else []}}
+    )
+
+
+async def broken_search_handler(request: web.Request) -> web.Response:
+    """
+    Serves the first page for every page number, and html
+    instead of json for the fourth page of the second search.
+    """
+    if request.query["search"] == "html" and request.query["page"] == "4":
+        return web.Response(text="<html>Log in</html>")
+    page = 1 if request.query["search"] == "repeat" else request.query["page"]
+    return web.json_response(
+        {"members": [{"url": f"/{page}/{index}"} for index in range(2)]}
+    )
+
+
+def test_find_json_requests() -> None:
+    """
+    Test json search requests and their headers are
+    found in a performance log.
+    """
+
+    url = "https://example.com/api/member-search?gender=2&pageNumber=1"
+    log = [
+        log_entry(
+            "Network.requestWillBeSent",
+            {
+                "requestId": "1",
+                "request": {"headers": {"Accept": "json", "Host": "x"}},
+            },
+        ),
+        log_entry(
+            "Network.responseReceived",
+            {
+                "requestId": "2",
+                "response": {
+                    "url": "https://example.com/a.css",
+                    "mimeType": "text/css",
+                },
+            },
+        ),
+        log_entry(
+            "Network.responseReceived",
+            {
+                "requestId": "1",
+                "response": {"url": url, "mimeType": "application/json"},
+            },
+        ),
+    ]
+    assert find_json_requests(log) == [
+        {"url": url, "headers": {"Accept": "json"}}
+    ]
+    assert find_page_param(url) == "pageNumber"
+    with pytest.raises(ValueError):
+        find_page_param("https://example.com/api/member-search?size=20")
+
+
+def test_find_records() -> None:
+    """
+    Test the records are found wherever they are in the response.
+    """
+
+    records = [{"url": "/a"}, {"url": "/b"}]
+    assert (
+        find_records({"total": 2, "data": {"tags": ["a"], "results": records}})
+        == records
+    )
+    assert find_records(records) == records
+    assert find_records({"data": []}) == []
+
+
+def test_scrape_search_api() -> None:
+    """
+    Test every page of a search is requested with the captured
+    cookies until a page comes back empty.
+    """
+
+    with local_server([web.get("/search", search_handler)]) as base_url:
+        api = MemberSearchApi(
+            url=f"{base_url}/search?gender=2&pageNumber=1",
+            headers={"Accept": "application/json"},
+            cookies={"session": "abc"},
+            page_param="pageNumber",
+        )
+        assert page_url(api, 3) == f"{base_url}/search?gender=2&pageNumber=3"
+        records = asyncio.run(scrape_search_api(api, concurrency=2))
+        limited = asyncio.run(scrape_search_api(api, max_pages=2))
+
+    assert [record["url"] for record in records] == [
+        f"/{page}/{index}"
+        for page in range(1, PAGES + 1)
+        for index in range(PAGE_SIZE)
+    ]
+    assert len(limited) == 2 * PAGE_SIZE
+
+
+def test_scrape_search_api_stops() -> None:
+    """
+    Test the scrape stops at a page that repeats the one before
+    it or isn't json, keeping the records found until then.
+    """
+
+    with local_server([web.get("/search", broken_search_handler)]) as url:
+        repeated = asyncio.run(
+            scrape_search_api(
+                MemberSearchApi(
+                    url=f"{url}/search?search=repeat&page=1",
+                    headers={},
+                    cookies={},
+                    page_param="page",
+                ),
+                concurrency=3,
+            )
+        )
+        not_json = asyncio.run(
+            scrape_search_api(
+                MemberSearchApi(
+                    url=f"{url}/search?search=html&page=1",
+                    headers={},
+                    cookies={},
+                    page_param="page",
+                ),
+                concurrency=2,
+            )
+        )
+
+    assert [record["url"] for record in repeated] == ["/1/0", "/1/1"]
+    assert [record["url"] for record in not_json] == [
+        f"/{page}/{index}" for page in range(1, 4) for index in range(2)
+    ]
@@ -0,0 +1,81 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+from kuda.scrapers.highrise import user_census
+from kuda.scrapers.highrise.user_census import make_shards, merge_users
+
+
+class FakeDriver:
+    """
+    Records when it's quit by appending to a file.
+    """
+
+    def __init__(self, quit_log: str) -> None:
+        self.quit_log = quit_log
+
+    def quit(self) -> None:
+        """
+        Append a line to the quit log.
+        """
+        with open(self.quit_log, "a", encoding="utf-8") as f:
+            f.write(f"{os.getpid()}\n")
+
+
+def init_fake_worker(quit_log: str) -> None:
+    """
+    Pool initializer that gives the worker a fake browser.
+    Args:
+        quit_log (str): File the browser records its quit in.
+    """
+    # pylint: disable=protected-access
+    user_census._init_worker()
+    user_census._DRIVER = FakeDriver(quit_log)  # type: ignore
+
+
+def worker_pid(_: int) -> int:
+    """
+    Task that reports which worker ran it.
+    Returns:
+        int: Process id of the worker.
+    """
+    return os.getpid()
+
+
+def test_make_shards() -> None:
+    """
+    Test the shards cover every gender and age exactly once.
+    """
+
+    assert make_shards(18, 22, ages_per_shard=2) == [
+        (1, 18, 19),
+        (1, 20, 21),
+        (1, 22, 22),
+        (2, 18, 19),
+        (2, 20, 21),
+        (2, 22, 22),
+    ]
+    assert make_shards(30, 30, gender_ids=[2]) == [(2, 30, 30)]
+
+
+def test_merge_users() -> None:
+    """
+    Test users found by more than one shard are only kept once.
+    """
+
+    users = [{"url": f"/users/{index}", "age": "20"} for index in range(3)]
+    assert merge_users([users[:2], users[1:], []]) == users
+
+
+def test_workers_quit_their_browsers(tmp_path) -> None:
+    """
+    Test every pool worker quits its browser when the pool shuts down.
+    """
+
+    quit_log = str(tmp_path / "quit.log")
+    with ProcessPoolExecutor(
+        2, initializer=init_fake_worker, initargs=(quit_log,)
+    ) as pool:
+        pids = set(pool.map(worker_pid, range(4)))
+
+    with open(quit_log, encoding="utf-8") as f:
+        assert set(map(int, f.read().split())) >= pids
@@ -0,0 +1,80 @@
+import pandas as pd
+
+from kuda.scrapers.highrise.user_scraper import (
+    Progress,
+    append_users,
+    read_progress,
+    save_users,
+    write_progress,
+)
+
+
+def make_users(ages: list, **fields) -> list:
+    """
+    Minimal scraped users with the given ages.
+    """
+    return [
+        {"url": f"/{index}", "age": age, **fields}
+        for index, age in enumerate(ages)
+    ]
+
+
+def test_append_users(tmp_path) -> None:
+    """
+    Test pages appended one at a time give the same
+    files as saving every user at the end, even if a
+    page is appended again.
+    """
+
+    pages = [
+        make_users(["20", "21", None, "40"]),
+        make_users(["21", "22"], height="180"),
+        make_users([]),
+    ]
+    appended = tmp_path / "appended"
+    saved = tmp_path / "saved"
+    appended.mkdir()
+    saved.mkdir()
+    saved_users: dict = {}
+    for page in pages:
+        append_users(page, 18, 25, 2, str(appended), saved_users)
+    append_users(pages[1], 18, 25, 2, str(appended), saved_users)
+    # A page scraped again after a crash isn't saved twice
+    append_users(pages[1], 18, 25, 2, str(appended))
+    save_users(make_users(["20", "21", None, "40"]), 18, 25, 2, str(saved))
+
+    assert sorted(path.name for path in appended.iterdir()) == [
+        "users_female_20.csv",
+        "users_female_21.csv",
+        "users_female_22.csv",
+    ]
+    assert pd.read_csv(appended / "users_female_20.csv").equals(
+        pd.read_csv(saved / "users_female_20.csv")
+    )
+    # Columns that first show up on a later page follow the header
+    age_21 = pd.read_csv(appended / "users_female_21.csv")
+    assert list(age_21.columns) == ["url", "age"]
+    assert list(age_21.url) == ["/1", "/0"]
+    assert saved_users[str(appended / "users_female_21.csv")] == (
+        ["url", "age"],
+        {"/0", "/1"},
+    )
+    assert list(pd.read_csv(appended / "users_female_22.csv").columns) == [
+        "url",
+        "age",
+        "height",
+    ]
+
+
+def test_progress(tmp_path) -> None:
+    """
+    Test the progress of a search is kept between runs.
+    """
+
+    progress_path = str(tmp_path / "progress.json")
+    assert read_progress(progress_path) == {
+        "pages_done": 0,
+        "completed": False,
+    }
+    write_progress(progress_path, Progress(pages_done=3, completed=False))
+    assert read_progress(progress_path)["pages_done"] == 3
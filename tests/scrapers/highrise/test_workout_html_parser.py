@@ -4,6 +4,7 @@ import pytest
 from deepdiff import DeepDiff
 
 from kuda.scrapers import parse_workout_html
+from kuda.scrapers.highrise.workout_html_parser import page_inaccessible
 from tests.scrapers import FILE_PATH
 from tests.vars import WORKOUT_VARIANTS
 
@@ -37,3 +38,23 @@ def test_workout_link_html_parser() -> None:
             parsed_workouts[index].pop("muscles_used")
         )
         assert DeepDiff(parsed_workouts[index], parsed_page) == {}
+
+
+def test_page_inaccessible() -> None:
+    """
+    Test the raw html check finds the same
+    inaccessible pages as the parsed data
+    """
+
+    with open(
+        f"{FILE_PATH}/html/workouts.json", "r", encoding="utf-8"
+    ) as f:
+        raw_html = json.load(f)
+
+    with open(
+        f"{FILE_PATH}/parsed/workouts.json", "r", encoding="utf-8"
+    ) as f:
+        parsed_workouts = json.load(f)
+
+    for index, html_page in enumerate(raw_html):
+        assert page_inaccessible(html_page) == (not parsed_workouts[index])
@@ -0,0 +1,35 @@
+import json
+
+from deepdiff import DeepDiff
+
+from kuda.scrapers import parse_workout_html, parse_workout_html_lxml
+from tests.scrapers import FILE_PATH
+from tests.vars import WORKOUT_VARIANTS
+
+
+def test_workout_lxml_parser() -> None:
+    """
+    Test that the lxml engine gives exactly the same
+    data as the parsed files and the bs4 engine
+    """
+
+    with open(f"{FILE_PATH}/html/workouts.json", "r", encoding="utf-8") as f:
+        raw_html = json.load(f)
+
+    with open(f"{FILE_PATH}/parsed/workouts.json", "r", encoding="utf-8") as f:
+        parsed_workouts = json.load(f)
+
+    for index, html_page in enumerate(raw_html):
+        url = WORKOUT_VARIANTS[index]["link"]
+        parsed_page = parse_workout_html_lxml(url=url, html_text=html_page)
+        assert parsed_page == parse_workout_html(url=url, html_text=html_page)
+
+        # Inaccessible Workout will just be an empty dict
+        if not parsed_page:
+            assert parsed_page == parsed_workouts[index]
+            continue
+
+        assert set(parsed_page.pop("muscles_used")) == set(
+            parsed_workouts[index].pop("muscles_used")
+        )
+        assert DeepDiff(parsed_workouts[index], parsed_page) == {}
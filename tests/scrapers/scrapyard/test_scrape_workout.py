@@ -0,0 +1,30 @@
+from bs4 import BeautifulSoup
+
+from kuda.scrapers.scrapyard.scrape_workout import (
+    parse_plan,
+    scrape_plan_details,
+    scrape_workouts,
+)
+
+JEFIT_FILE_PATH = "tests/files/jefit_plans"
+
+
+def test_parse_plan_strainer() -> None:
+    """
+    Test that only parsing the tab-panes and sidebar gives
+    the same plan as parsing the whole page, with both parsers
+    """
+
+    with open(
+        f"{JEFIT_FILE_PATH}/4-day-muscle-builder.html", "r", encoding="utf-8"
+    ) as f:
+        html = f.read()
+
+    for backend in ("lxml", "html.parser"):
+        soup = BeautifulSoup(html, backend)
+        plan = scrape_plan_details(soup)
+        plan["workouts"] = list(scrape_workouts(soup))
+
+        assert plan["title"]
+        assert len(plan["workouts"]) == 4
+        assert parse_plan(html, parser_backend=backend) == plan
@@ -1,12 +1,51 @@
+import asyncio
 import json
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Union
 
+from aiohttp import web
 from deepdiff import DeepDiff
 
-from kuda.scrapers import parse_workout_html, scrape_urls
+from kuda.scrapers import (
+    ScrapeOptions,
+    iter_scrape_urls,
+    parse_workout_html,
+    scrape_urls,
+)
+from kuda.scrapers.crawl_state import CrawlState, CrawlStatuses
+from kuda.scrapers.http_cache import ResponseCache
+from kuda.scrapers.page_archive import INDEX_NAME, PageArchive
+from kuda.scrapers.replay import iter_saved_pages
 from tests.scrapers import FILE_PATH
+from tests.utils.server import local_server
 from tests.vars import WORKOUT_VARIANTS
 
 
+def page_parser(url: str, html: str) -> Dict[str, str]:
+    """
+    Minimal html parser used against the local server.
+    """
+    return {"url": url, "html": html}
+
+
+def parsed(result: Union[Dict, str]) -> Dict[str, str]:
+    """
+    A result of page_parser, failing if the url failed instead.
+    """
+    assert isinstance(result, dict), f"{result} wasn't parsed"
+    return result
+
+
+async def page_handler(request: web.Request) -> web.Response:
+    """
+    Serves the page number back, sleeping for the
+    number of seconds given in the `delay` query param.
+    """
+    await asyncio.sleep(float(request.query.get("delay", 0)))
+    return web.Response(text=request.match_info["page"])
+
+
 def test_workout_scraper() -> None:
     """
     Test that the scraped links are the same as the ones
@@ -30,3 +69,308 @@ def test_workout_scraper() -> None:
             )
             assert DeepDiff(tested_links[index], response) == {}
             print("Test passed!")
+
+
+def test_scrape_urls_sliding_window() -> None:
+    """
+    Test that a slow page only holds up its own slot
+    and the results come back in the order of the urls.
+    """
+
+    # The first page is held until every other page has been
+    # requested, lock-step batches of 3 would never get past it.
+    gate = threading.Event()
+    released = []
+    served = set()
+
+    async def gated_handler(request: web.Request) -> web.Response:
+        page = request.match_info["page"]
+        if page == "0":
+            released.append(await asyncio.to_thread(gate.wait, 5))
+        else:
+            served.add(page)
+            if len(served) == 8:
+                gate.set()
+        return web.Response(text=page)
+
+    with local_server([web.get("/{page}", gated_handler)]) as base_url:
+        urls = [f"{base_url}/{page}" for page in range(9)]
+        results = scrape_urls(
+            urls=urls, html_parser=page_parser, concurrency=3
+        )
+
+    assert [parsed(result)["html"] for result in results] == [
+        str(page) for page in range(9)
+    ]
+    assert released == [True]
+
+
+def test_scrape_urls_process_pool_parsing() -> None:
+    """
+    Test that parsing in a process pool gives the same
+    results as parsing on the event loop.
+    """
+
+    with local_server([web.get("/{page}", page_handler)]) as base_url:
+        urls = [f"{base_url}/{page}" for page in range(6)]
+        with ProcessPoolExecutor(max_workers=2) as executor:
+            pooled_results = scrape_urls(
+                urls=urls,
+                html_parser=page_parser,
+                concurrency=3,
+                options=ScrapeOptions(executor=executor),
+            )
+        results = scrape_urls(urls=urls, html_parser=page_parser)
+
+    assert pooled_results == results
+    assert [parsed(result)["url"] for result in results] == urls
+
+
+def test_iter_scrape_urls() -> None:
+    """
+    Test that the streamed results are yielded as they
+    complete and that every url is scraped once.
+    """
+
+    # The first page is held until the others have been yielded
+    gate = threading.Event()
+
+    async def gated_handler(request: web.Request) -> web.Response:
+        if request.match_info["page"] == "0":
+            await asyncio.to_thread(gate.wait, 5)
+        return web.Response(text=request.match_info["page"])
+
+    with local_server([web.get("/{page}", gated_handler)]) as base_url:
+        urls = [f"{base_url}/{page}" for page in range(5)]
+        results = []
+        for result in iter_scrape_urls(
+            urls=iter(urls), html_parser=page_parser, concurrency=2
+        ):
+            results.append(parsed(result))
+            if len(results) == len(urls) - 1:
+                gate.set()
+
+    assert sorted(result["url"] for result in results) == sorted(urls)
+    # The held first page is yielded after the ones that completed
+    assert results[-1]["url"] == urls[0]
+
+
+def test_scrape_urls_connection_pooling() -> None:
+    """
+    Test that the connector config is applied and
+    connections are reused between requests.
+    """
+
+    peers = set()
+
+    async def peer_handler(request: web.Request) -> web.Response:
+        assert request.transport is not None
+        peers.add(request.transport.get_extra_info("peername"))
+        return web.Response(text="ok")
+
+    with local_server([web.get("/{page}", peer_handler)]) as base_url:
+        results = scrape_urls(
+            urls=[f"{base_url}/{page}" for page in range(6)],
+            html_parser=page_parser,
+            concurrency=3,
+            options=ScrapeOptions(
+                connector_config={"limit_per_host": 1, "compress": False}
+            ),
+        )
+
+    assert [parsed(result)["html"] for result in results] == ["ok"] * 6
+    assert len(peers) == 1
+
+
+def test_scrape_urls_retries() -> None:
+    """
+    Test that throttled and server error responses are retried,
+    client errors and timeouts fail the url without parsing.
+    """
+
+    attempts: Dict[str, int] = {}
+
+    async def flaky_handler(request: web.Request) -> web.Response:
+        page = request.match_info["page"]
+        attempts[page] = attempts.get(page, 0) + 1
+        if page == "throttled" and attempts[page] == 1:
+            return web.Response(status=429, headers={"Retry-After": "0"})
+        if page == "unavailable" and attempts[page] < 3:
+            return web.Response(status=503)
+        if page == "missing":
+            return web.Response(status=404, text="Not found")
+        if page == "slow":
+            await asyncio.sleep(1)
+        return web.Response(text=page)
+
+    with local_server([web.get("/{page}", flaky_handler)]) as base_url:
+        urls = [
+            f"{base_url}/{page}"
+            for page in ("throttled", "unavailable", "missing", "slow")
+        ]
+        results = scrape_urls(
+            urls=urls,
+            html_parser=page_parser,
+            concurrency=4,
+            options=ScrapeOptions(
+                retry_config={
+                    "attempts": 3,
+                    "backoff_base": 0.01,
+                    "read_timeout": 0.2,
+                }
+            ),
+        )
+
+    assert parsed(results[0])["html"] == "throttled"
+    assert parsed(results[1])["html"] == "unavailable"
+    assert results[2:] == urls[2:]
+    assert attempts == {
+        "throttled": 2,
+        "unavailable": 3,
+        "missing": 1,
+        "slow": 3,
+    }
+
+
+def test_scrape_urls_cache(tmp_path) -> None:
+    """
+    Test that cached pages are replayed without a request,
+    or revalidated with their ETag when asked to.
+    """
+
+    requests = []
+
+    async def etag_handler(request: web.Request) -> web.Response:
+        requests.append(request.headers.get("If-None-Match"))
+        if request.headers.get("If-None-Match") == '"v1"':
+            return web.Response(status=304)
+        return web.Response(text="page", headers={"ETag": '"v1"'})
+
+    with local_server([web.get("/{page}", etag_handler)]) as base_url:
+        urls = [f"{base_url}/1", f"{base_url}/2"]
+        cache = ResponseCache(str(tmp_path))
+        first_run = scrape_urls(
+            urls=urls,
+            html_parser=page_parser,
+            options=ScrapeOptions(cache=cache),
+        )
+        replay = scrape_urls(
+            urls=urls,
+            html_parser=page_parser,
+            options=ScrapeOptions(cache=cache),
+        )
+        assert requests == [None, None]
+
+        cache.revalidate = True
+        revalidated = scrape_urls(
+            urls=urls,
+            html_parser=page_parser,
+            options=ScrapeOptions(cache=cache),
+        )
+        assert requests == [None, None, '"v1"', '"v1"']
+
+    assert first_run == replay == revalidated
+    assert [parsed(result)["html"] for result in first_run] == ["page"] * 2
+
+
+def test_scrape_urls_crawl_state(tmp_path) -> None:
+    """
+    Test that finished urls are journaled and skipped
+    when the crawl is run again.
+    """
+
+    with local_server([web.get("/{page}", page_handler)]) as base_url:
+        urls = [f"{base_url}/{page}" for page in range(4)]
+        with CrawlState(str(tmp_path / "crawl.sqlite")) as crawl_state:
+            crawl_state.mark(urls[0], CrawlStatuses.completed)
+            first_run = scrape_urls(
+                urls=urls,
+                html_parser=page_parser,
+                concurrency=2,
+                options=ScrapeOptions(crawl_state=crawl_state),
+            )
+        with CrawlState(str(tmp_path / "crawl.sqlite")) as crawl_state:
+            resumed = list(
+                iter_scrape_urls(
+                    urls=urls,
+                    html_parser=page_parser,
+                    options=ScrapeOptions(crawl_state=crawl_state),
+                )
+            )
+
+    assert [parsed(result)["url"] for result in first_run] == urls[1:]
+    assert not resumed
+
+
+def test_scrape_urls_retry_failed(tmp_path) -> None:
+    """
+    Test that urls that failed in an earlier run are only
+    scraped again when asked to.
+    """
+
+    with local_server([web.get("/{page}", page_handler)]) as base_url:
+        urls = [f"{base_url}/{page}" for page in range(3)]
+        with CrawlState(str(tmp_path / "crawl.sqlite")) as crawl_state:
+            crawl_state.mark(urls[0], CrawlStatuses.completed)
+            crawl_state.mark(urls[1], CrawlStatuses.failed)
+            skipped = scrape_urls(
+                urls=urls,
+                html_parser=page_parser,
+                options=ScrapeOptions(crawl_state=crawl_state),
+            )
+            retried = list(
+                iter_scrape_urls(
+                    urls=[urls[1]],
+                    html_parser=page_parser,
+                    options=ScrapeOptions(
+                        crawl_state=crawl_state, retry_failed=True
+                    ),
+                )
+            )
+            status = crawl_state.get_status(urls[1])
+
+    assert [parsed(result)["url"] for result in skipped] == urls[2:]
+    assert [parsed(result)["url"] for result in retried] == [urls[1]]
+    assert status == CrawlStatuses.completed
+
+
+def test_scrape_urls_archive(tmp_path) -> None:
+    """
+    Test that the raw pages are archived as they're
+    scraped and can be replayed from the archive.
+    """
+
+    with local_server([web.get("/{page}", page_handler)]) as base_url:
+        urls = [f"{base_url}/{page}" for page in range(3)]
+        with PageArchive(str(tmp_path)) as archive:
+            results = scrape_urls(
+                urls=urls,
+                html_parser=page_parser,
+                options=ScrapeOptions(archive=archive),
+            )
+
+    assert dict(iter_saved_pages(str(tmp_path))) == {
+        parsed(result)["url"]: parsed(result)["html"] for result in results
+    }
+
+
+def test_scrape_urls_archive_cache_hits(tmp_path) -> None:
+    """
+    Test that pages replayed from the cache aren't archived again.
+    """
+
+    cache = ResponseCache(str(tmp_path / "cache"))
+    with local_server([web.get("/{page}", page_handler)]) as base_url:
+        urls = [f"{base_url}/{page}" for page in range(3)]
+        with PageArchive(str(tmp_path / "archive")) as archive:
+            for _ in range(2):
+                scrape_urls(
+                    urls=urls,
+                    html_parser=page_parser,
+                    options=ScrapeOptions(cache=cache, archive=archive),
+                )
+
+    with open(
+        tmp_path / "archive" / INDEX_NAME, encoding="utf-8"
+    ) as index_file:
+        assert len(index_file.readlines()) == len(urls)
@@ -0,0 +1,150 @@
+from typing import cast
+
+import pytest
+from selenium.common.exceptions import (
+    ElementClickInterceptedException,
+    NoSuchElementException,
+    TimeoutException,
+)
+from selenium.webdriver.remote.webdriver import WebDriver
+
+from kuda.scrapers import browser
+
+LOCATOR = ("css selector", "button")
+
+
+class FakeElement:
+    """
+    Element that fails to click a set number of times.
+    """
+
+    def __init__(self, failed_clicks: int = 0) -> None:
+        self.failed_clicks = failed_clicks
+        self.clicks = 0
+
+    def is_displayed(self) -> bool:
+        """
+        Returns:
+            bool: Always shown.
+        """
+        return True
+
+    def is_enabled(self) -> bool:
+        """
+        Returns:
+            bool: Always enabled.
+        """
+        return True
+
+    def click(self) -> None:
+        """
+        Count the click, failing while failed_clicks are left.
+        Raises:
+            ElementClickInterceptedException: For the first
+                failed_clicks clicks.
+        """
+        self.clicks += 1
+        if self.clicks <= self.failed_clicks:
+            raise ElementClickInterceptedException("covered")
+
+
+class FakeDriver:
+    """
+    Driver whose elements show up after a set number of lookups.
+    """
+
+    def __init__(self, elements: list, missing_lookups: int = 0) -> None:
+        self.elements = elements
+        self.missing_lookups = missing_lookups
+        self.lookups = 0
+
+    def find_elements(self, *_) -> list:
+        """
+        Returns:
+            list: No elements until missing_lookups have been made.
+        """
+        self.lookups += 1
+        return self.elements if self.lookups > self.missing_lookups else []
+
+    def find_element(self, *locator) -> FakeElement:
+        """
+        Args:
+            *locator: (By, value) of the element.
+        Returns:
+            FakeElement: The first element.
+        Raises:
+            NoSuchElementException: If there are no elements yet.
+        """
+        elements = self.find_elements(*locator)
+        if not elements:
+            raise NoSuchElementException(str(locator))
+        return elements[0]
+
+
+def fake_driver(elements: list, missing_lookups: int = 0) -> WebDriver:
+    """
+    A FakeDriver typed as the driver the browser functions take.
+    Args:
+        elements (list): Elements found once they show up.
+        missing_lookups (int): Lookups that find nothing first.
+    Returns:
+        WebDriver: The fake driver.
+    """
+    return cast(WebDriver, FakeDriver(elements, missing_lookups))
+
+
+def test_click() -> None:
+    """
+    Test a click waits for the element and its
+    retries and timeouts are bounded.
+    """
+
+    element = FakeElement(failed_clicks=1)
+    driver = fake_driver([element], missing_lookups=2)
+    assert browser.click(driver, LOCATOR, timeout=1) is element
+    assert element.clicks == 2
+
+    element = FakeElement(failed_clicks=5)
+    with pytest.raises(ElementClickInterceptedException):
+        browser.click(fake_driver([element]), LOCATOR, timeout=1, attempts=3)
+    assert element.clicks == 3
+
+    with pytest.raises(TimeoutException):
+        browser.click(fake_driver([]), LOCATOR, timeout=0.2)
+
+
+def test_wait_for_more() -> None:
+    """
+    Test waiting for elements to be added to the page.
+    """
+
+    driver = fake_driver([FakeElement()] * 3, missing_lookups=2)
+    assert browser.wait_for_more(driver, LOCATOR, 0, timeout=1) == 3
+    with pytest.raises(TimeoutException):
+        browser.wait_for_more(driver, LOCATOR, 3, timeout=0.2)
+    assert browser.find_optional(fake_driver([]), LOCATOR) is None
+
+
+def test_chrome_options() -> None:
+    """
+    Test the scraping profile keeps every pref
+    and only blocks css when asked to.
+    """
+
+    capabilities = browser.chrome_options(cache_dir="cache").to_capabilities()
+    chrome = capabilities["goog:chromeOptions"]
+    assert capabilities["pageLoadStrategy"] == "eager"
+    assert "--headless=new" in chrome["args"]
+    assert "--disk-cache-dir=cache" in chrome["args"]
+    assert chrome["prefs"] == {
+        "profile.managed_default_content_settings.images": 2,
+        "profile.managed_default_content_settings.stylesheets": 2,
+    }
+    assert "*.css" in browser.blocked_url_patterns()
+
+    capabilities = browser.chrome_options(
+        headless=False, block_stylesheets=False, performance_log=True
+    ).to_capabilities()
+    assert "--headless=new" not in capabilities["goog:chromeOptions"]["args"]
+    assert capabilities["goog:loggingPrefs"] == {"performance": "ALL"}
+    assert "*.css" not in browser.blocked_url_patterns(block_stylesheets=False)
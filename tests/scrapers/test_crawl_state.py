@@ -0,0 +1,29 @@
+from kuda.scrapers.crawl_state import CrawlState, CrawlStatuses
+
+
+def test_crawl_state_resumes(tmp_path) -> None:
+    """
+    Test that finished urls survive reopening the
+    state file and are filtered out of the crawl.
+    """
+
+    path = str(tmp_path / "crawl.sqlite")
+    urls = [f"https://a.com/{page}" for page in range(5)]
+
+    with CrawlState(path, commit_every=2) as crawl_state:
+        crawl_state.mark(urls[0], CrawlStatuses.completed)
+        crawl_state.mark(urls[1], CrawlStatuses.failed)
+        crawl_state.mark(urls[2], CrawlStatuses.failed)
+        # A retried url moves to its new status
+        crawl_state.mark(urls[2], CrawlStatuses.completed)
+
+    with CrawlState(path) as crawl_state:
+        assert crawl_state.get_status(urls[0]) == CrawlStatuses.completed
+        assert crawl_state.get_status(urls[1]) == CrawlStatuses.failed
+        assert crawl_state.get_status(urls[3]) is None
+        assert crawl_state.counts() == {"completed": 2, "failed": 1}
+        assert list(crawl_state.pending(urls)) == urls[3:]
+        assert list(crawl_state.pending(urls, retry_failed=True)) == [
+            urls[1],
+            *urls[3:],
+        ]
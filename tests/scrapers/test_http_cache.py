@@ -0,0 +1,43 @@
+import os
+
+from kuda.scrapers.http_cache import ResponseCache
+
+
+def test_response_cache(tmp_path) -> None:
+    """
+    Test that pages round trip through the cache and the
+    least recently used pages are evicted once it's full.
+    """
+
+    cache = ResponseCache(str(tmp_path), max_bytes=10**6)
+    assert cache.get("https://a.com/1") is None
+
+    cache.put("https://a.com/1", "<html>1</html>", etag='"abc"')
+    assert cache.get("https://a.com/1") == {
+        "url": "https://a.com/1",
+        "html": "<html>1</html>",
+        "etag": '"abc"',
+        "last_modified": None,
+    }
+
+    # Random html doesn't compress so the sizes are predictable
+    pages = [os.urandom(3000).hex() for _ in range(4)]
+    cache = ResponseCache(str(tmp_path), max_bytes=14000)
+    for index, page in enumerate(pages[:2]):
+        cache.put(f"https://a.com/page/{index}", page)
+    # File mtimes are too coarse to order pages written back to
+    # back, so the eviction order is set on the files directly
+    # pylint: disable=protected-access
+    os.utime(cache._path("https://a.com/1"), (0, 0))
+    os.utime(cache._path("https://a.com/page/0"), (1, 1))
+    # pylint: enable=protected-access
+    for index, page in enumerate(pages[2:], 2):
+        cache.put(f"https://a.com/page/{index}", page)
+
+    assert cache.size <= 14000
+    assert cache.get("https://a.com/1") is None
+    assert cache.get("https://a.com/page/0") is None
+    cached = cache.get("https://a.com/page/3")
+    assert cached is not None and cached["html"] == pages[3]
+    # The size is rebuilt from disk
+    assert ResponseCache(str(tmp_path)).size == cache.size
@@ -0,0 +1,36 @@
+import gzip
+import os
+
+from kuda.scrapers.page_archive import PageArchive
+
+
+def test_page_archive(tmp_path) -> None:
+    """
+    Test that pages can be read back individually, segments
+    rotate, and reopening the archive appends to it.
+    """
+
+    pages = {
+        f"https://a.com/{page}": f"<p>{page}</p>" * 50 for page in range(5)
+    }
+    with PageArchive(str(tmp_path), segment_max_bytes=300) as archive:
+        for url, html in list(pages.items())[:3]:
+            archive.write(url, html)
+
+    with PageArchive(str(tmp_path), segment_max_bytes=300) as archive:
+        for url, html in list(pages.items())[3:]:
+            archive.write(url, html)
+        pages["https://a.com/0"] = "<p>rescraped</p>"
+        archive.write("https://a.com/0", "<p>rescraped</p>")
+
+        assert archive.read("https://a.com/2") == pages["https://a.com/2"]
+        assert archive.read("https://a.com/missing") is None
+        assert dict(archive.iter_pages()) == pages
+
+    segments = sorted(
+        file for file in os.listdir(tmp_path) if file.endswith(".warc.gz")
+    )
+    assert len(segments) == 6
+    # Segments are valid gzip files of WARC records
+    with gzip.open(tmp_path / segments[0], "rb") as f:
+        assert f.read().startswith(b"WARC/1.0\r\nWARC-Type: resource\r\n")
@@ -0,0 +1,65 @@
+import asyncio
+import time
+
+from kuda.scrapers.highrise.workout_html_parser import (
+    WORKOUT_INACCESSIBLE_MESSAGE,
+    page_inaccessible,
+)
+from kuda.scrapers.rate_limiter import AdaptiveRateLimiter
+
+URL = "https://bodyspace.bodybuilding.com/workouts/viewworkoutlog/a/1"
+
+
+def test_acquire_paces_requests() -> None:
+    """
+    Test that requests to a host are spaced 1 / rate apart
+    and other hosts aren't held up.
+    """
+
+    rate_limiter = AdaptiveRateLimiter(initial_rate=20)
+
+    async def acquire_all() -> None:
+        await asyncio.gather(
+            *[rate_limiter.acquire(URL) for _ in range(5)],
+            rate_limiter.acquire("https://www.bodybuilding.com/exercises"),
+        )
+
+    start = time.time()
+    asyncio.run(acquire_all())
+    # 4 waits of 0.05s, the other host goes straight away
+    assert 0.18 < time.time() - start < 0.4
+
+
+def test_rate_adapts_to_responses() -> None:
+    """
+    Test that healthy responses raise the rate and throttled
+    responses, latency spikes and error pages cut it.
+    """
+
+    rate_limiter = AdaptiveRateLimiter(
+        initial_rate=4, increase=2, throttle_detector=page_inaccessible
+    )
+    rate_limiter.record(URL, 200, 0.1)
+    assert rate_limiter.get_rate(URL) == 4.5
+
+    rate_limiter.record(URL, 429, 0.1)
+    assert rate_limiter.get_rate(URL) == 2.25
+    # Sent before the decrease, so it doesn't cut the rate again
+    rate_limiter.record(URL, 503, 0.2)
+    assert rate_limiter.get_rate(URL) == 2.25
+
+    time.sleep(0.01)
+    rate_limiter.record(
+        URL,
+        200,
+        0.001,
+        html=(
+            '<div class="message-box-message">'
+            f"{WORKOUT_INACCESSIBLE_MESSAGE}</div>"
+        ),
+    )
+    assert rate_limiter.get_rate(URL) == 1.125
+
+    time.sleep(0.45)
+    rate_limiter.record(URL, 200, 0.4)
+    assert rate_limiter.get_rate(URL) == 0.5625
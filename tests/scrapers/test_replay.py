@@ -0,0 +1,63 @@
+import gzip
+import json
+import os
+import shutil
+
+from kuda.scrapers import parse_workout_html
+from kuda.scrapers.replay import MANIFEST_NAME, iter_saved_pages, replay_pages
+from tests.scrapers import FILE_PATH
+from tests.vars import WORKOUT_VARIANTS
+
+
+def test_replay_pages(tmp_path) -> None:
+    """
+    Test that saved pages replayed from a directory and
+    from archives of it parse the same as the test file.
+    """
+
+    with open(f"{FILE_PATH}/html/workouts.json", "r", encoding="utf-8") as f:
+        raw_html = json.load(f)
+    with open(f"{FILE_PATH}/parsed/workouts.json", "r", encoding="utf-8") as f:
+        parsed_workouts = json.load(f)
+
+    pages_dir = tmp_path / "pages"
+    os.makedirs(pages_dir)
+    with open(pages_dir / MANIFEST_NAME, "w", encoding="utf-8") as f:
+        for index, html_page in enumerate(raw_html[:4]):
+            # Gzipped and plain pages can be mixed
+            path = f"{index}.html.gz" if index % 2 else f"{index}.html"
+            with open(pages_dir / path, "wb") as page_file:
+                data = html_page.encode("utf-8")
+                page_file.write(gzip.compress(data) if index % 2 else data)
+            url = WORKOUT_VARIANTS[index]["link"]
+            f.write(json.dumps({"url": url, "path": path}) + "\n")
+    sources = [
+        str(pages_dir),
+        shutil.make_archive(str(tmp_path / "pages"), "zip", pages_dir),
+        shutil.make_archive(str(tmp_path / "pages"), "gztar", pages_dir),
+    ]
+
+    for source in sources:
+        output_path = str(tmp_path / "parsed.jsonl")
+        failed = replay_pages(
+            pages=iter_saved_pages(source),
+            html_parser=parse_workout_html,
+            output_path=output_path,
+            processes=2,
+        )
+        with open(output_path, "r", encoding="utf-8") as f:
+            workouts = {
+                workout["url"]: workout for workout in map(json.loads, f)
+            }
+
+        assert not failed
+        for index in range(4):
+            workout = workouts[WORKOUT_VARIANTS[index]["link"]]
+            assert set(workout.pop("muscles_used")) == set(
+                parsed_workouts[index]["muscles_used"]
+            )
+            assert workout == {
+                key: value
+                for key, value in parsed_workouts[index].items()
+                if key != "muscles_used"
+            }
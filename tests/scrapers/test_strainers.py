@@ -0,0 +1,27 @@
+from bs4 import BeautifulSoup
+
+from kuda.scrapers.strainers import class_strainer
+
+
+def test_class_strainer() -> None:
+    """
+    Test only tags with one of the classes are parsed,
+    including tags with more than one class
+    """
+
+    html = (
+        '<div class="tab-pane active" id="a"><p>1</p></div>'
+        '<div class="tab-pane" id="b"></div>'
+        '<div class="other" id="c"></div>'
+        '<span class="tab-pane" id="d"></span>'
+        '<div class="x y" id="e"></div>'
+    )
+    strainer = class_strainer("tab-pane", "x y", name="div")
+    for backend in ("lxml", "html.parser"):
+        soup = BeautifulSoup(html, backend, parse_only=strainer)
+        assert [tag["id"] for tag in soup.find_all(True, id=True)] == [
+            "a",
+            "b",
+            "e",
+        ]
+        assert soup.find("p").text == "1"
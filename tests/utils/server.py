@@ -0,0 +1,41 @@
+"""
+Module for running a local http server in tests.
+"""
+
+import asyncio
+import threading
+from contextlib import contextmanager
+from typing import Iterator, List
+
+from aiohttp import web
+
+
+@contextmanager
+def local_server(routes: List[web.RouteDef]) -> Iterator[str]:
+    """
+    Run an aiohttp server on a background thread so the
+    scrapers can be tested without going to the network.
+
+    Args:
+        routes (List[web.RouteDef]): Routes the server should handle.
+
+    Yields:
+        str: Base url of the running server.
+    """
+    loop = asyncio.new_event_loop()
+    app = web.Application()
+    app.add_routes(routes)
+    runner = web.AppRunner(app)
+    loop.run_until_complete(runner.setup())
+    site = web.TCPSite(runner, "127.0.0.1", 0)
+    loop.run_until_complete(site.start())
+    port = runner.addresses[0][1]
+    thread = threading.Thread(target=loop.run_forever, daemon=True)
+    thread.start()
+    try:
+        yield f"http://127.0.0.1:{port}"
+    finally:
+        loop.call_soon_threadsafe(loop.stop)
+        thread.join()
+        loop.run_until_complete(runner.cleanup())
+        loop.close()